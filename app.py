@@ -1,16 +1,22 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
-from database import engine, SessionLocal
-from models import Base, Usuario, Leitura
-from apscheduler.schedulers.background import BackgroundScheduler
-from gtts import gTTS
-from datetime import datetime, timedelta, date
+from database import SessionLocal, estatisticas_pool
+from models import Usuario, Leitura, horario_para_minuto
+from datetime import datetime, timedelta, date, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
-import jwt, os, re, requests, time
+import json, jwt, os, re, requests, time
 from dotenv import load_dotenv
 from bible_service import biblia_service, obter_trecho_do_dia
 from auth_service import auth_service
 from database_manager import db_manager, initialize_database
+from audio_cache import audio_cache, gerar_audio_versiculo
+from message_queue import fila_mensagens
+from prerender import pre_renderizador, dia_do_plano
+from reading_cache import cache_leituras
+from http_cache import resposta_cacheavel
+from verse_store import numero_do_livro
+from scheduler import iniciar_scheduler, acordar_fila, lease_envio, planejador_envios
+from whatsapp_sender import disparador_whatsapp
 from logging_system import versozap_logger, LogCategory, log_info, log_error, log_success
 
 # ---------------------------------------------------------------------------
@@ -22,12 +28,34 @@ load_dotenv()
 app_start_time = time.time()
 
 SENDER_URL = os.getenv("SENDER_URL")
-DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY", "versozap-dev")  # troque em produção
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 app = Flask(__name__)
 
+# ---------------------------------------------------------------------------
+# Sessão do banco por request
+# ---------------------------------------------------------------------------
+def obter_sessao():
+    """Sessão do request atual; encerrada no teardown do contexto da aplicação"""
+    if "db" not in g:
+        g.db = SessionLocal()
+    return g.db
+
+@app.teardown_appcontext
+def encerrar_sessao(erro):
+    db = g.pop("db", None)
+    if db is None:
+        return
+    try:
+        if erro is None:
+            db.commit()
+        else:
+            db.rollback()
+    finally:
+        # Devolve a conexão ao pool mesmo em retornos antecipados e exceções
+        db.close()
+
 # CORS detalhado — apenas rotas /api/* precisam e-mail/telefone
 CORS(
     app,
@@ -58,72 +86,6 @@ def apply_cors_headers(resp):
             resp.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
     return resp
 
-# ---------------------------------------------------------------------------
-# Utilidades
-# ---------------------------------------------------------------------------
-
-def gerar_audio_versiculo(texto: str, nome_arquivo: str) -> str:
-    tts = gTTS(text=texto, lang="pt")
-    os.makedirs("audios", exist_ok=True)
-    caminho = f"audios/{nome_arquivo}.mp3"
-    tts.save(caminho)
-    return caminho
-
-# ---------------------------------------------------------------------------
-# Jobs de agendamento
-# ---------------------------------------------------------------------------
-
-def enviar_leitura_diaria():
-    db = SessionLocal()
-    usuarios = db.query(Usuario).all()
-
-    for usuario in usuarios:
-        agora = datetime.now().strftime("%H:%M")
-        if usuario.horario_envio == agora:
-            # Usa as preferências do usuário para obter a leitura personalizada
-            plano_leitura = usuario.plano_leitura or "cronologico"
-            versao_biblia = usuario.versao_biblia or "ARC"
-            
-            # Obtém leitura do dia baseada nas preferências do usuário
-            leitura_info = biblia_service.obter_leitura_do_dia(
-                plano_leitura=plano_leitura,
-                versao_biblia=versao_biblia
-            )
-            
-            nova_leitura = Leitura(
-                usuario_id=usuario.id, 
-                trecho=leitura_info["referencia"], 
-                concluido=False
-            )
-            db.add(nova_leitura)
-            db.commit()
-            db.refresh(nova_leitura)
-
-            # Gera áudio com o texto da leitura
-            caminho_audio = gerar_audio_versiculo(
-                leitura_info["texto"], 
-                f"audio_{usuario.id}_{nova_leitura.id}"
-            )
-
-            try:
-                mensagem = f"🙏 Olá {usuario.nome}, sua leitura bíblica de hoje:\n\n{leitura_info['texto']}"
-                requests.post(
-                    SENDER_URL,
-                    json={
-                        "telefone": usuario.telefone,
-                        "mensagem": mensagem,
-                        "audio": caminho_audio,
-                    },
-                )
-            except Exception as e:
-                print(f"[Erro WhatsApp] {usuario.nome}: {e}")
-    
-    db.close()
-
-scheduler = BackgroundScheduler()
-scheduler.add_job(enviar_leitura_diaria, "interval", minutes=1)
-scheduler.start()
-
 # ---------------------------------------------------------------------------
 # Rotas públicas
 # ---------------------------------------------------------------------------
@@ -149,7 +111,7 @@ def register_email():
     if len(password) < 6:
         return jsonify(error="Senha deve ter 6+ caracteres"), 400
 
-    db = SessionLocal()
+    db = obter_sessao()
     if db.query(Usuario).filter_by(email=email).first():
         return jsonify(error="E-mail já cadastrado"), 409
 
@@ -167,7 +129,7 @@ def login_email():
     email = data.get("email", "").lower().strip()
     password = data.get("password", "")
 
-    db = SessionLocal()
+    db = obter_sessao()
     user = db.query(Usuario).filter_by(email=email).first()
     if not user or not check_password_hash(user.password_hash, password):
         return jsonify(error="Credenciais inválidas"), 401
@@ -183,7 +145,11 @@ def login_email():
 @app.post("/api/register-phone")
 def cadastrar_usuario_telefone():
     data = request.get_json() or {}
-    db = SessionLocal()
+
+    if data.get("horario_envio") and horario_para_minuto(data["horario_envio"]) is None:
+        return jsonify({"erro": "Horário de envio inválido (use HH:MM)"}), 400
+
+    db = obter_sessao()
 
     if db.query(Usuario).filter_by(telefone=data.get("telefone")).first():
         return jsonify({"erro": "Usuário já cadastrado"}), 400
@@ -211,7 +177,7 @@ def enviar_leitura():
     data = request.get_json() or {}
     telefone = data.get("telefone")
 
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(telefone=telefone).first()
     if not usuario:
         return jsonify({"erro": "Usuário não encontrado"}), 404
@@ -222,48 +188,51 @@ def enviar_leitura():
         Leitura.data >= datetime.now() - timedelta(days=2),
     ).first()
 
-    if leitura_pendente:
+    if leitura_pendente and leitura_pendente.intervalos:
+        id_leitura = leitura_pendente.id
+        # Reenvio: os intervalos gravados reconstroem a mesma passagem (e a mesma chave de áudio)
+        leitura_info = biblia_service.obter_leitura_dos_intervalos(
+            json.loads(leitura_pendente.intervalos), leitura_pendente.versao or "ARC", leitura_pendente.trecho
+        )
+        caminho_audio = gerar_audio_versiculo(leitura_info["texto"])
+    elif leitura_pendente and leitura_pendente.dia_plano:
+        id_leitura = leitura_pendente.id
+        # Leituras registradas antes dos intervalos: localiza pelo dia do plano
+        leitura_info, caminho_audio = pre_renderizador.leitura_com_audio(
+            leitura_pendente.plano, leitura_pendente.versao, leitura_pendente.dia_plano
+        )
+    elif leitura_pendente:
+        # Leituras registradas antes das referências estruturadas só têm o trecho
         referencia = leitura_pendente.trecho
         id_leitura = leitura_pendente.id
-        # Para leitura pendente, precisamos buscar o texto completo
         leitura_info = {
             "referencia": referencia,
             "texto": f"📖 {referencia}\n\nConsulte sua Bíblia para ler esta passagem."
         }
+        caminho_audio = gerar_audio_versiculo(leitura_info["texto"])
     else:
-        # Usa as preferências do usuário
+        # Usa as preferências e o progresso do usuário (leitura e áudio pré-renderizados)
         plano_leitura = usuario.plano_leitura or "cronologico"
         versao_biblia = usuario.versao_biblia or "ARC"
         
-        leitura_info = biblia_service.obter_leitura_do_dia(
-            plano_leitura=plano_leitura,
-            versao_biblia=versao_biblia
+        leitura_info, caminho_audio = pre_renderizador.leitura_com_audio(
+            plano_leitura, versao_biblia, usuario.proximo_dia_plano or 1
         )
         
-        nova_leitura = Leitura(
-            usuario_id=usuario.id, 
-            trecho=leitura_info["referencia"], 
-            concluido=False
-        )
+        nova_leitura = Leitura.registrar(usuario.id, leitura_info)
         db.add(nova_leitura)
-        db.commit()
-        db.refresh(nova_leitura)
+        db.flush()
         id_leitura = nova_leitura.id
 
-    caminho_audio = gerar_audio_versiculo(
-        leitura_info["texto"], 
-        f"audio_{usuario.id}_{id_leitura}"
-    )
-
-    try:
-        mensagem = f"🙏 Olá {usuario.nome}, sua leitura bíblica:\n\n{leitura_info['texto']}"
-        requests.post(SENDER_URL, json={
-            "telefone": usuario.telefone,
-            "mensagem": mensagem,
-            "audio": caminho_audio,
-        })
-    except Exception as e:
-        print("Erro ao enviar mensagem via WhatsApp:", e)
+    # A mensagem entra na mesma transação da leitura (outbox): as duas ou nenhuma
+    fila_mensagens.enfileirar([{
+        "usuario_id": usuario.id,
+        "telefone": usuario.telefone,
+        "mensagem": f"🙏 Olá {usuario.nome}, sua leitura bíblica:\n\n{leitura_info['texto']}",
+        "audio_path": caminho_audio,
+    }], conexao=db.connection())
+    db.commit()
+    acordar_fila()
 
     return jsonify({
         "mensagem": "Leitura enviada com sucesso", 
@@ -277,19 +246,19 @@ def confirmar_leitura():
     data = request.get_json() or {}
     id_leitura = data.get("id_leitura")
 
-    db = SessionLocal()
-    leitura = db.query(Leitura).filter_by(id=id_leitura).first()
-    if not leitura:
+    db = obter_sessao()
+    usuario_id = Leitura.confirmar(db, id_leitura)
+    if usuario_id is None:
         return jsonify({"erro": "Leitura não encontrada"}), 404
-
-    leitura.concluido = True
     db.commit()
 
-    return jsonify({"mensagem": "Leitura marcada como concluída"}), 200
+    proximo_dia = db.query(Usuario.proximo_dia_plano).filter(Usuario.id == usuario_id).scalar()
+
+    return jsonify({"mensagem": "Leitura marcada como concluída", "proximo_dia_plano": proximo_dia}), 200
 
 @app.get("/usuarios")
 def listar_usuarios():
-    db = SessionLocal()
+    db = obter_sessao()
     usuarios = db.query(Usuario).all()
     resultado = [
         {
@@ -300,10 +269,10 @@ def listar_usuarios():
             "versao_biblia": u.versao_biblia,
             "plano_leitura": u.plano_leitura,
             "horario_envio": u.horario_envio,
+            "proximo_dia_plano": u.proximo_dia_plano,
         }
         for u in usuarios
     ]
-    db.close()
     return jsonify(resultado)
 
 # ---------------------------------------------------------------------------
@@ -314,13 +283,13 @@ def listar_usuarios():
 def obter_versoes_biblia():
     """Retorna as versões da Bíblia disponíveis"""
     versoes = biblia_service.obter_versoes_disponiveis()
-    return jsonify({"versoes": versoes})
+    return resposta_cacheavel(app.json.dumps({"versoes": versoes}).encode("utf-8"))
 
 @app.get("/api/planos-leitura") 
 def obter_planos_leitura():
     """Retorna os planos de leitura disponíveis"""
     planos = biblia_service.obter_planos_disponiveis()
-    return jsonify({"planos": planos})
+    return resposta_cacheavel(app.json.dumps({"planos": planos}).encode("utf-8"))
 
 @app.get("/api/leitura-hoje")
 def obter_leitura_hoje():
@@ -328,20 +297,19 @@ def obter_leitura_hoje():
     versao = request.args.get("versao", "ARC")
     plano = request.args.get("plano", "cronologico")
     
-    # Valida a configuração
-    validacao = biblia_service.validar_configuracao(versao, plano)
-    if not validacao["versao_valida"] or not validacao["plano_valido"]:
+    # Resposta já serializada em cache; None indica configuração inválida
+    entrada = cache_leituras.obter_entrada(dia_do_plano(date.today()), plano, versao)
+    if entrada is None:
+        validacao = biblia_service.validar_configuracao(versao, plano)
         return jsonify({
             "erro": "Configuração inválida",
             "detalhes": validacao
         }), 400
     
-    leitura = biblia_service.obter_leitura_do_dia(
-        plano_leitura=plano,
-        versao_biblia=versao
-    )
-    
-    return jsonify({"leitura": leitura})
+    # A leitura de hoje só existe a partir da meia-noite
+    corpo, etag, gerado_em = entrada
+    meia_noite = datetime.combine(date.today(), datetime.min.time()).astimezone(timezone.utc)
+    return resposta_cacheavel(corpo, etag=etag, ultima_modificacao=max(gerado_em, meia_noite))
 
 @app.get("/api/leitura-dia/<int:dia>")
 def obter_leitura_dia_especifico(dia):
@@ -352,6 +320,12 @@ def obter_leitura_dia_especifico(dia):
     versao = request.args.get("versao", "ARC")
     plano = request.args.get("plano", "cronologico")
     
+    entrada = cache_leituras.obter_entrada(dia, plano, versao)
+    if entrada is not None:
+        corpo, etag, gerado_em = entrada
+        return resposta_cacheavel(corpo, etag=etag, ultima_modificacao=gerado_em)
+    
+    # Configurações fora do cache (ex: versão desconhecida) são montadas na hora
     leitura = biblia_service.obter_leitura_do_dia(
         dia_do_ano=dia,
         plano_leitura=plano,
@@ -360,6 +334,70 @@ def obter_leitura_dia_especifico(dia):
     
     return jsonify({"leitura": leitura})
 
+@app.get("/api/busca")
+def buscar_versiculos():
+    """Busca versículos por palavras, "frase exata" ou prefixo* (sem diferenciar acentos)"""
+    consulta = (request.args.get("q") or "").strip()
+    versao = request.args.get("versao") or None
+    livro = request.args.get("livro") or None
+    
+    if len(consulta) < 2:
+        return jsonify({"erro": "Informe ao menos 2 caracteres em 'q'"}), 400
+    if versao and versao not in biblia_service.versoes_disponiveis:
+        return jsonify({"erro": "Versão inválida"}), 400
+    if livro:
+        livro = numero_do_livro(livro)
+        if livro is None:
+            return jsonify({"erro": "Livro inválido"}), 400
+    
+    try:
+        limite = min(max(int(request.args.get("limite", 20)), 1), 100)
+        deslocamento = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"erro": "limite e offset devem ser números"}), 400
+    
+    resultados = biblia_service.buscar(
+        consulta, versao_biblia=versao, livro=livro, limite=limite, deslocamento=deslocamento
+    )
+    return jsonify({
+        "consulta": consulta,
+        "resultados": resultados,
+        "limite": limite,
+        "offset": deslocamento
+    })
+
+@app.get("/api/comparar")
+def comparar_versoes():
+    """Compara uma passagem (referencia=) ou a leitura de um dia (dia=, plano=) em várias versões"""
+    referencia = request.args.get("referencia")
+    plano = request.args.get("plano", "cronologico")
+    versoes = [v.strip() for v in request.args.get("versoes", "").split(",") if v.strip()]
+    versoes = list(dict.fromkeys(versoes)) or list(biblia_service.versoes_disponiveis.keys())
+    
+    validacao = biblia_service.validar_configuracao(versoes[0], plano)
+    invalidas = [v for v in versoes if v not in biblia_service.versoes_disponiveis]
+    if invalidas or not validacao["plano_valido"]:
+        return jsonify({
+            "erro": "Configuração inválida",
+            "versoes_invalidas": invalidas,
+            "detalhes": validacao
+        }), 400
+    
+    dia = None
+    if not referencia:
+        try:
+            dia = int(request.args.get("dia", dia_do_plano(date.today())))
+        except ValueError:
+            dia = 0
+        if dia < 1 or dia > 365:
+            return jsonify({"erro": "Dia deve estar entre 1 e 365"}), 400
+    
+    comparacao = biblia_service.comparar(versoes, referencia=referencia, dia_do_ano=dia, plano_leitura=plano)
+    if comparacao is None:
+        return jsonify({"erro": "Referência inválida"}), 400
+    
+    return resposta_cacheavel(app.json.dumps(comparacao).encode("utf-8"))
+
 @app.post("/api/atualizar-preferencias")
 def atualizar_preferencias_usuario():
     """Atualiza as preferências bíblicas do usuário"""
@@ -379,7 +417,7 @@ def atualizar_preferencias_usuario():
             "detalhes": validacao
         }), 400
     
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(id=user_id).first()
     if not usuario:
         return jsonify({"erro": "Usuário não encontrado"}), 404
@@ -391,7 +429,6 @@ def atualizar_preferencias_usuario():
         usuario.plano_leitura = plano_leitura
     
     db.commit()
-    db.close()
     
     return jsonify({
         "mensagem": "Preferências atualizadas com sucesso",
@@ -424,7 +461,7 @@ def auth_google():
         return jsonify({"erro": "Token Google inválido"}), 401
     
     # Procura ou cria usuário
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(email=user_info["email"]).first()
     
     if not usuario:
@@ -447,8 +484,6 @@ def auth_google():
         "google"
     )
     
-    db.close()
-    
     return jsonify({
         "token": jwt_token,
         "user": {
@@ -474,7 +509,7 @@ def auth_facebook():
         return jsonify({"erro": "Token Facebook inválido"}), 401
     
     # Procura ou cria usuário
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(email=user_info["email"]).first()
     
     if not usuario:
@@ -497,8 +532,6 @@ def auth_facebook():
         "facebook"
     )
     
-    db.close()
-    
     return jsonify({
         "token": jwt_token,
         "user": {
@@ -529,7 +562,7 @@ def google_callback():
         return f"<script>window.location.href='{frontend_url}/login?error=auth_failed'</script>"
     
     # Processa usuário e redireciona para o frontend com token
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(email=user_info["email"]).first()
     
     if not usuario:
@@ -550,8 +583,6 @@ def google_callback():
         "google"
     )
     
-    db.close()
-    
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
     return f"<script>window.location.href='{frontend_url}/sucesso?token={jwt_token}'</script>"
 
@@ -575,7 +606,7 @@ def facebook_callback():
         return f"<script>window.location.href='{frontend_url}/login?error=auth_failed'</script>"
     
     # Processa usuário e redireciona para o frontend com token
-    db = SessionLocal()
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(email=user_info["email"]).first()
     
     if not usuario:
@@ -596,8 +627,6 @@ def facebook_callback():
         "facebook"
     )
     
-    db.close()
-    
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
     return f"<script>window.location.href='{frontend_url}/sucesso?token={jwt_token}'</script>"
 
@@ -632,7 +661,10 @@ def atualizar_perfil_usuario():
     data = request.get_json() or {}
     user_id = payload["sub"]
 
-    db = SessionLocal()
+    if data.get("horario_envio") and horario_para_minuto(data["horario_envio"]) is None:
+        return jsonify({"erro": "Horário de envio inválido (use HH:MM)"}), 400
+
+    db = obter_sessao()
     usuario = db.query(Usuario).filter_by(id=user_id).first()
     if not usuario:
         return jsonify({"erro": "Usuário não encontrado"}), 404
@@ -648,7 +680,6 @@ def atualizar_perfil_usuario():
         usuario.horario_envio = data["horario_envio"]
 
     db.commit()
-    db.close()
 
     return jsonify({
         "mensagem": "Perfil atualizado com sucesso",
@@ -667,30 +698,64 @@ def atualizar_perfil_usuario():
 # Rotas de Administração (Logs e Database)
 # ---------------------------------------------------------------------------
 
+def filtros_de_logs(args):
+    """Filtros de logs da query string (level, category, user_id, desde, ate); ValueError se inválidos"""
+    filtros = {"level": args.get('level'), "category": args.get('category'),
+               "user_id": args.get('user_id', type=int)}
+    if args.get('user_id') and filtros["user_id"] is None:
+        raise ValueError("user_id inválido")
+    for campo in ("desde", "ate"):
+        valor = args.get(campo)
+        # Normaliza para o formato ISO em que os timestamps são gravados
+        filtros[campo] = datetime.fromisoformat(valor).isoformat() if valor else None
+    return filtros
+
 @app.get("/admin/logs")
 def admin_get_logs():
-    """Retorna logs do sistema para o painel admin"""
+    """Retorna uma página de logs do sistema para o painel admin (próxima página via 'cursor')"""
     try:
-        limit = request.args.get('limit', 100, type=int)
-        level = request.args.get('level')
-        category = request.args.get('category')
-        
-        logs = versozap_logger.get_recent_logs(
-            limit=min(limit, 500),  # Máximo 500 logs
-            level=level,
-            category=category
-        )
+        limit = min(request.args.get('limit', 100, type=int), 500)  # Máximo 500 logs por página
+        try:
+            filtros = filtros_de_logs(request.args)
+            logs, proximo_cursor = versozap_logger.consultar_logs(
+                limite=limit, cursor=request.args.get('cursor'), **filtros
+            )
+        except ValueError as e:
+            return jsonify({"erro": str(e) or "Filtros inválidos"}), 400
         
         return jsonify({
             "logs": logs,
             "total": len(logs),
-            "filters": {"level": level, "category": category, "limit": limit}
+            "next_cursor": proximo_cursor,
+            "filters": {**filtros, "limit": limit}
         })
         
     except Exception as e:
         log_error(LogCategory.SYSTEM, "Erro ao buscar logs", error=e)
         return jsonify({"erro": "Erro ao buscar logs"}), 500
 
+@app.get("/admin/logs/export")
+def admin_export_logs():
+    """Exporta todos os logs dos filtros em NDJSON (um log por linha, em ordem cronológica)"""
+    try:
+        filtros = filtros_de_logs(request.args)
+    except ValueError as e:
+        return jsonify({"erro": str(e) or "Filtros inválidos"}), 400
+    
+    def gerar():
+        try:
+            for log in versozap_logger.iterar_logs(crescente=True, **filtros):
+                yield json.dumps(log, ensure_ascii=False, default=str) + "\n"
+        except Exception as e:
+            # O status 200 já foi enviado: a última linha avisa que a exportação está incompleta
+            log_error(LogCategory.SYSTEM, "Erro ao exportar logs", error=e)
+            yield json.dumps({"erro": "Exportação interrompida por erro no banco; o arquivo está incompleto"},
+                             ensure_ascii=False) + "\n"
+    
+    nome = f"versozap-logs-{datetime.now().strftime('%Y%m%d%H%M%S')}.ndjson"
+    return Response(stream_with_context(gerar()), mimetype="application/x-ndjson",
+                    headers={"Content-Disposition": f"attachment; filename={nome}"})
+
 @app.get("/admin/logs/stats")
 def admin_get_log_stats():
     """Retorna estatísticas dos logs"""
@@ -740,7 +805,8 @@ def admin_cleanup_database():
     """Limpa dados antigos do banco"""
     try:
         days_old = request.json.get('days_old', 90)
-        result = db_manager.cleanup_old_data(days_old)
+        # Limite de tempo opcional: o restante fica para a próxima chamada
+        result = db_manager.cleanup_old_data(days_old, tempo_maximo=request.json.get('max_seconds'))
         
         if result:
             log_success(LogCategory.DATABASE, f"Limpeza concluída: {result}")
@@ -774,6 +840,16 @@ def admin_optimize_database():
         log_error(LogCategory.DATABASE, "Erro na otimização do banco", error=e)
         return jsonify({"erro": "Erro na otimização"}), 500
 
+@app.get("/admin/scheduler/carga")
+def admin_get_scheduler_load():
+    """Retorna o histograma de envios por minuto (agendados x após espalhamento)"""
+    try:
+        return jsonify(planejador_envios.histograma())
+
+    except Exception as e:
+        log_error(LogCategory.SYSTEM, "Erro ao gerar histograma de carga", error=e)
+        return jsonify({"erro": "Erro ao gerar histograma de carga"}), 500
+
 @app.get("/admin/system/status")
 def admin_get_system_status():
     """Retorna status geral do sistema"""
@@ -798,12 +874,19 @@ def admin_get_system_status():
             "database": {
                 "status": "connected",
                 "tables": len(db_info.get("tables", [])),
-                "total_users": db_info.get("usuarios_count", 0)
+                "total_users": db_info.get("usuarios_count", 0),
+                "pool": estatisticas_pool()
             },
             "whatsapp": {
-                "status": whatsapp_status
+                "status": whatsapp_status,
+                "envio": disparador_whatsapp.obter_metricas()
             },
             "logs": log_stats,
+            "fila_logs": versozap_logger.gravador.obter_metricas(),
+            "audio_cache": audio_cache.estatisticas,
+            "cache_leituras": cache_leituras.obter_estatisticas(),
+            "message_queue": fila_mensagens.obter_estatisticas(),
+            "scheduler": lease_envio.obter_status(),
             "uptime": {
                 "seconds": time.time() - app_start_time if 'app_start_time' in globals() else 0
             },
@@ -821,13 +904,16 @@ def admin_get_system_status():
 # Inicializa sistema de logs
 log_info(LogCategory.SYSTEM, "Iniciando VersoZap Backend")
 
-# Inicializa banco de dados com migrations
+# Confere a versão do esquema (migrations: python database_manager.py migrate)
 if not initialize_database():
     log_error(LogCategory.DATABASE, "Falha na inicialização do banco de dados")
     exit(1)
 
-# Fallback para SQLAlchemy (compatibilidade)
-Base.metadata.create_all(bind=engine)
+# Jobs agendados: desative com RUN_SCHEDULER=false nos workers web quando o
+# scheduler rodar como processo separado (python scheduler.py). Mesmo com
+# vários processos agendando, o lease garante um único dono por tick.
+if os.getenv("RUN_SCHEDULER", "true").lower() in ("1", "true", "yes"):
+    iniciar_scheduler()
 
 log_success(LogCategory.SYSTEM, "VersoZap Backend inicializado com sucesso")
 
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de áudio endereçado por conteúdo para VersoZap
+Cada texto (+ idioma) é sintetizado uma única vez e o arquivo é compartilhado
+entre todos os usuários que recebem a mesma leitura
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from file_lock import LockArquivo
+
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+
+    # Locks em faixas: limita a memória usada independentemente do número de textos
+    NUM_LOCKS = 64
+
+    def __init__(self, diretorio=None, max_bytes=None, max_idade_segundos=None,
+                 intervalo_limpeza=None, sintetizador=None):
+        self.diretorio = diretorio or os.getenv("AUDIO_CACHE_DIR", "audios")
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.getenv("AUDIO_CACHE_MAX_MB", "500")) * 1024 * 1024
+        self.max_idade_segundos = max_idade_segundos if max_idade_segundos is not None else \
+            int(os.getenv("AUDIO_CACHE_MAX_DIAS", "7")) * 86400
+        self.intervalo_limpeza = intervalo_limpeza if intervalo_limpeza is not None else \
+            int(os.getenv("AUDIO_CACHE_INTERVALO_LIMPEZA", "600"))
+        self.sintetizador = sintetizador or self._sintetizar_gtts
+
+        self._locks = [threading.Lock() for _ in range(self.NUM_LOCKS)]
+        self._lock_limpeza = threading.Lock()
+        self._ultima_limpeza = time.time()
+        self.estatisticas = {"hits": 0, "misses": 0, "sinteses": 0, "removidos": 0}
+
+    @staticmethod
+    def chave(texto, idioma="pt"):
+        """Hash SHA-256 do idioma + texto, usado como nome do arquivo"""
+        return hashlib.sha256(f"{idioma}\0{texto}".encode("utf-8")).hexdigest()
+
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.mp3")
+
+    def obter_audio(self, texto, idioma="pt"):
+        """
+        Retorna o caminho do áudio para o texto, sintetizando apenas se ainda
+        não existir no cache
+
+        Args:
+            texto (str): Texto a ser convertido em áudio
+            idioma (str): Idioma do TTS
+
+        Returns:
+            str: Caminho do arquivo MP3
+        """
+        chave = self.chave(texto, idioma)
+        caminho = self.caminho(chave)
+
+        if self._tocar(caminho):
+            self.estatisticas["hits"] += 1
+            return caminho
+
+        # Evita que threads do mesmo processo gerem o mesmo áudio em paralelo
+        with self._locks[int(chave[:8], 16) % self.NUM_LOCKS]:
+            if self._tocar(caminho):
+                self.estatisticas["hits"] += 1
+                return caminho
+
+            self.estatisticas["misses"] += 1
+            os.makedirs(self.diretorio, exist_ok=True)
+            with self._lock_arquivo(caminho):
+                # Outro processo pode ter gerado enquanto aguardávamos o lock
+                if not os.path.exists(caminho):
+                    self._gerar(texto, idioma, caminho)
+
+        self._talvez_limpar()
+        return caminho
+
+    def _tocar(self, caminho):
+        """Marca o arquivo como usado recentemente (para a expiração por idade)"""
+        try:
+            os.utime(caminho)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _gerar(self, texto, idioma, caminho):
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            self.sintetizador(texto, idioma, temporario)
+            # Rename atômico: leitores nunca veem um arquivo parcial
+            os.replace(temporario, caminho)
+            self.estatisticas["sinteses"] += 1
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def _lock_arquivo(self, caminho, timeout=120):
+        """Lock entre processos baseado em arquivo criado com O_EXCL"""
+        return LockArquivo(f"{caminho}.lock", timeout)
+
+    @staticmethod
+    def _sintetizar_gtts(texto, idioma, destino):
+        # Importado só na primeira síntese: não pesa no boot dos workers
+        from gtts import gTTS
+        gTTS(text=texto, lang=idioma).save(destino)
+
+    def _talvez_limpar(self):
+        if time.time() - self._ultima_limpeza < self.intervalo_limpeza:
+            return
+        if not self._lock_limpeza.acquire(blocking=False):
+            return
+        try:
+            self._ultima_limpeza = time.time()
+            self.limpar()
+        finally:
+            self._lock_limpeza.release()
+
+    def limpar(self):
+        """
+        Remove áudios expirados por idade e, se o cache exceder o tamanho
+        máximo, os menos usados recentemente
+
+        Returns:
+            int: Quantidade de arquivos removidos
+        """
+        if not os.path.isdir(self.diretorio):
+            return 0
+
+        agora = time.time()
+        arquivos = []
+        removidos = 0
+
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.is_file() or not entrada.name.endswith(".mp3"):
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            if agora - info.st_mtime > self.max_idade_segundos:
+                removidos += self._remover(entrada.path)
+            else:
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        if total > self.max_bytes:
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= self.max_bytes:
+                    break
+                removidos += self._remover(caminho)
+                total -= tamanho
+
+        self.estatisticas["removidos"] += removidos
+        if removidos:
+            logger.info(f"🧹 Cache de áudio: {removidos} arquivo(s) removido(s)")
+        return removidos
+
+    def _remover(self, caminho):
+        try:
+            os.remove(caminho)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+# Instância global do cache
+audio_cache = AudioCache()
+
+def gerar_audio_versiculo(texto: str, idioma: str = "pt") -> str:
+    """Retorna o áudio (compartilhado) do texto, gerando-o apenas uma vez"""
+    return audio_cache.obter_audio(texto, idioma)
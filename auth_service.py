@@ -8,8 +8,6 @@ import os
 import requests
 import jwt
 from datetime import datetime, timedelta
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,6 +31,10 @@ class AuthService:
             dict: Informações do usuário ou None se inválido
         """
         try:
+            # google-auth é pesado de importar e só é usado no login com Google
+            from google.auth.transport import requests as google_requests
+            from google.oauth2 import id_token
+
             # Verifica o token com o Google
             idinfo = id_token.verify_oauth2_token(
                 token, 
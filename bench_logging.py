@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do custo de um log para quem loga (request ou job do scheduler)
+Mede o tempo de cada chamada de versozap_logger.log com as saídas configuradas
+(arquivo e console), sem a gravação no banco, que já é assíncrona. Entre um
+log e outro há um intervalo, como nos requests; sem intervalo a medição inclui
+a disputa pelo GIL com a thread que escreve os logs.
+
+Uso: python bench_logging.py [--logs 2000] [--intervalo-ms 1] 2>/dev/null
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a latência de emissão dos logs do VersoZap")
+    parser.add_argument("--logs", type=int, default=2000, help="Logs emitidos (padrão: 2000)")
+    parser.add_argument("--intervalo-ms", type=float, default=1, help="Pausa entre logs (padrão: 1 ms)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from logging_system import versozap_logger, LogLevel, LogCategory
+    versozap_logger.db_logging_enabled = False
+
+    tempos = []
+    for i in range(args.logs):
+        inicio = time.perf_counter()
+        versozap_logger.log(LogLevel.INFO, LogCategory.MESSAGE, f"Leitura enviada {i}", details={"usuario": i})
+        tempos.append((time.perf_counter() - inicio) * 1_000_000)
+        time.sleep(args.intervalo_ms / 1000)
+    tempos.sort()
+
+    print("BENCHMARK DE EMISSÃO DE LOGS VERSOZAP")
+    print("=" * 50)
+    print(f"Logs: {args.logs} (intervalo de {args.intervalo_ms} ms)")
+    print(f"Por chamada: mediana {statistics.median(tempos):.1f} µs, "
+          f"p99 {tempos[int(len(tempos) * 0.99)]:.1f} µs, max {tempos[-1]:.1f} µs")
+
+if __name__ == "__main__":
+    main()
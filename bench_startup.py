@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do tempo de boot de um worker do VersoZap
+Cada execução importa app.py num processo novo (como um worker do gunicorn,
+sem scheduler) e mede o import completo, a conferência do esquema e quais
+módulos pesados foram carregados sem necessidade.
+
+Uso: python bench_startup.py [--execucoes 5]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Módulos que só deveriam ser carregados quando usados
+MODULOS_PESADOS = ["gtts", "google.auth", "google.oauth2", "apscheduler"]
+
+CODIGO_FILHO = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+total = time.perf_counter() - inicio
+from database_manager import db_manager
+inicio = time.perf_counter()
+db_manager.esquema_atualizado()
+esquema = time.perf_counter() - inicio
+print(json.dumps({
+    "import_s": total,
+    "esquema_s": esquema,
+    "pesados": [m for m in %r if m in sys.modules],
+}))
+""" % (MODULOS_PESADOS,)
+
+def medir_execucao(diretorio):
+    ambiente = dict(os.environ, RUN_SCHEDULER="false")
+    resultado = subprocess.run(
+        [sys.executable, "-c", CODIGO_FILHO],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True, check=True
+    )
+    # A última linha da saída é o JSON (antes dela vêm os logs do boot)
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de boot de um worker do VersoZap")
+    parser.add_argument("--execucoes", type=int, default=5, help="Processos medidos (padrão: 5)")
+    args = parser.parse_args()
+
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    # A primeira execução aplica migrations pendentes e aquece o cache do sistema de arquivos
+    medir_execucao(diretorio)
+
+    medicoes = [medir_execucao(diretorio) for _ in range(args.execucoes)]
+    imports = [m["import_s"] * 1000 for m in medicoes]
+    esquemas = [m["esquema_s"] * 1000 for m in medicoes]
+
+    print("BENCHMARK DE BOOT VERSOZAP")
+    print("=" * 50)
+    print(f"Execuções: {args.execucoes}")
+    print(f"Import de app.py: mediana {statistics.median(imports):.1f} ms "
+          f"(min {min(imports):.1f}, max {max(imports):.1f})")
+    print(f"Conferência do esquema: mediana {statistics.median(esquemas):.2f} ms")
+    pesados = sorted({m for medicao in medicoes for m in medicao["pesados"]})
+    print(f"Módulos pesados carregados no boot: {', '.join(pesados) or 'nenhum'}")
+
+if __name__ == "__main__":
+    main()
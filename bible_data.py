@@ -4,61 +4,34 @@ Sistema de conteúdo bíblico para VersoZap
 Contém planos de leitura e versões da Bíblia
 """
 
-# Plano de Leitura Anual (365 dias) - Cronológico
-PLANO_CRONOLOGICO = {
-    1: {"livro": "Gênesis", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 31},
-    2: {"livro": "Gênesis", "capitulo": 2, "versiculo_inicio": 1, "versiculo_fim": 25},
-    3: {"livro": "Gênesis", "capitulo": 3, "versiculo_inicio": 1, "versiculo_fim": 24},
-    4: {"livro": "Gênesis", "capitulo": 4, "versiculo_inicio": 1, "versiculo_fim": 26},
-    5: {"livro": "Gênesis", "capitulo": 5, "versiculo_inicio": 1, "versiculo_fim": 32},
-    6: {"livro": "Gênesis", "capitulo": 6, "versiculo_inicio": 1, "versiculo_fim": 22},
-    7: {"livro": "Gênesis", "capitulo": 7, "versiculo_inicio": 1, "versiculo_fim": 24},
-    8: {"livro": "Gênesis", "capitulo": 8, "versiculo_inicio": 1, "versiculo_fim": 22},
-    9: {"livro": "Gênesis", "capitulo": 9, "versiculo_inicio": 1, "versiculo_fim": 29},
-    10: {"livro": "Gênesis", "capitulo": 10, "versiculo_inicio": 1, "versiculo_fim": 32},
-    11: {"livro": "Gênesis", "capitulo": 11, "versiculo_inicio": 1, "versiculo_fim": 32},
-    12: {"livro": "Gênesis", "capitulo": 12, "versiculo_inicio": 1, "versiculo_fim": 20},
-    13: {"livro": "Gênesis", "capitulo": 13, "versiculo_inicio": 1, "versiculo_fim": 18},
-    14: {"livro": "Gênesis", "capitulo": 14, "versiculo_inicio": 1, "versiculo_fim": 24},
-    15: {"livro": "Gênesis", "capitulo": 15, "versiculo_inicio": 1, "versiculo_fim": 21},
-    16: {"livro": "Gênesis", "capitulo": 16, "versiculo_inicio": 1, "versiculo_fim": 16},
-    17: {"livro": "Gênesis", "capitulo": 17, "versiculo_inicio": 1, "versiculo_fim": 27},
-    18: {"livro": "Gênesis", "capitulo": 18, "versiculo_inicio": 1, "versiculo_fim": 33},
-    19: {"livro": "Gênesis", "capitulo": 19, "versiculo_inicio": 1, "versiculo_fim": 38},
-    20: {"livro": "Gênesis", "capitulo": 20, "versiculo_inicio": 1, "versiculo_fim": 18},
-    21: {"livro": "Gênesis", "capitulo": 21, "versiculo_inicio": 1, "versiculo_fim": 34},
-    22: {"livro": "Gênesis", "capitulo": 22, "versiculo_inicio": 1, "versiculo_fim": 24},
-    23: {"livro": "Gênesis", "capitulo": 23, "versiculo_inicio": 1, "versiculo_fim": 20},
-    24: {"livro": "Gênesis", "capitulo": 24, "versiculo_inicio": 1, "versiculo_fim": 67},
-    25: {"livro": "Gênesis", "capitulo": 25, "versiculo_inicio": 1, "versiculo_fim": 34},
-    # Continuar até dia 365...
-    # Para demonstração, vou adicionar alguns marcos importantes
-    30: {"livro": "Gênesis", "capitulo": 30, "versiculo_inicio": 1, "versiculo_fim": 43},
-    50: {"livro": "Êxodo", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 22},
-    100: {"livro": "Levítico", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 17},
-    150: {"livro": "Números", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 54},
-    200: {"livro": "Deuteronômio", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 46},
-    250: {"livro": "1 Samuel", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 28},
-    300: {"livro": "Salmos", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 6},
-    350: {"livro": "Mateus", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 25},
-    365: {"livro": "Apocalipse", "capitulo": 22, "versiculo_inicio": 1, "versiculo_fim": 21}
+# Planos de leitura anuais (365 dias), gerados por reading_plan.py a partir de LIVROS_BIBLIA
+PLANOS_LEITURA = {
+    "cronologico": {
+        "nome": "Cronológico",
+        "descricao": "Leitura da Bíblia em ordem cronológica dos eventos"
+    },
+    "livros": {
+        "nome": "Por Livros",
+        "descricao": "Leitura por ordem dos livros bíblicos (NT primeiro)"
+    },
+    "canonico": {
+        "nome": "Canônico",
+        "descricao": "Leitura de Gênesis a Apocalipse na ordem da Bíblia"
+    }
 }
 
-# Plano de Leitura por Livros (365 dias)
-PLANO_POR_LIVROS = {
-    1: {"livro": "Mateus", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 25},
-    2: {"livro": "Mateus", "capitulo": 2, "versiculo_inicio": 1, "versiculo_fim": 23},
-    3: {"livro": "Mateus", "capitulo": 3, "versiculo_inicio": 1, "versiculo_fim": 17},
-    4: {"livro": "Mateus", "capitulo": 4, "versiculo_inicio": 1, "versiculo_fim": 25},
-    5: {"livro": "Mateus", "capitulo": 5, "versiculo_inicio": 1, "versiculo_fim": 48},
-    # Continuar com todo o Novo Testamento primeiro
-    # Depois Salmos, Provérbios e Antigo Testamento
-    30: {"livro": "João", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 51},
-    100: {"livro": "Romanos", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 32},
-    200: {"livro": "Salmos", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 6},
-    300: {"livro": "Gênesis", "capitulo": 1, "versiculo_inicio": 1, "versiculo_fim": 31},
-    365: {"livro": "Malaquias", "capitulo": 4, "versiculo_inicio": 1, "versiculo_fim": 6}
-}
+# Ordem aproximada dos eventos, por livro
+ORDEM_CRONOLOGICA = [
+    "Gênesis", "Jó", "Êxodo", "Levítico", "Números", "Deuteronômio", "Josué", "Juízes",
+    "Rute", "1 Samuel", "2 Samuel", "1 Crônicas", "Salmos", "1 Reis", "Provérbios",
+    "Eclesiastes", "Cânticos", "2 Reis", "2 Crônicas", "Jonas", "Amós", "Oseias", "Isaías",
+    "Miqueias", "Naum", "Sofonias", "Joel", "Habacuque", "Jeremias", "Lamentações", "Obadias",
+    "Ezequiel", "Daniel", "Esdras", "Ageu", "Zacarias", "Ester", "Neemias", "Malaquias",
+    "Mateus", "Marcos", "Lucas", "João", "Atos", "Tiago", "Gálatas", "1 Tessalonicenses",
+    "2 Tessalonicenses", "1 Coríntios", "2 Coríntios", "Romanos", "Efésios", "Filipenses",
+    "Colossenses", "Filemom", "1 Timóteo", "Tito", "1 Pedro", "2 Timóteo", "2 Pedro",
+    "Hebreus", "Judas", "1 João", "2 João", "3 João", "Apocalipse"
+]
 
 # Versões da Bíblia - Versículos de exemplo para as principais passagens
 VERSOES_BIBLIA = {
@@ -94,23 +67,163 @@ VERSOES_BIBLIA = {
     }
 }
 
-# Função auxiliar para gerar plano completo (placeholder para expansão futura)
-def gerar_plano_completo(tipo_plano="cronologico"):
-    """
-    Gera plano de leitura completo de 365 dias
-    TODO: Implementar geração automática baseada na estrutura bíblica
-    """
-    if tipo_plano == "cronologico":
-        return PLANO_CRONOLOGICO
-    elif tipo_plano == "livros":
-        return PLANO_POR_LIVROS
-    else:
-        return PLANO_CRONOLOGICO
+# Estrutura dos 66 livros (versificação padrão/KJV): nome, código USFM e
+# quantidade de versículos de cada capítulo
+LIVROS_BIBLIA = [
+    {"nome": "Gênesis", "codigo": "GEN", "versiculos": [
+        31, 25, 24, 26, 32, 22, 24, 22, 29, 32, 32, 20, 18, 24, 21, 16, 27, 33, 38, 18,
+        34, 24, 20, 67, 34, 35, 46, 22, 35, 43, 55, 32, 20, 31, 29, 43, 36, 30, 23, 23,
+        57, 38, 34, 34, 28, 34, 31, 22, 33, 26,
+    ]},
+    {"nome": "Êxodo", "codigo": "EXO", "versiculos": [
+        22, 25, 22, 31, 23, 30, 25, 32, 35, 29, 10, 51, 22, 31, 27, 36, 16, 27, 25, 26,
+        36, 31, 33, 18, 40, 37, 21, 43, 46, 38, 18, 35, 23, 35, 35, 38, 29, 31, 43, 38,
+    ]},
+    {"nome": "Levítico", "codigo": "LEV", "versiculos": [
+        17, 16, 17, 35, 19, 30, 38, 36, 24, 20, 47, 8, 59, 57, 33, 34, 16, 30, 37, 27,
+        24, 33, 44, 23, 55, 46, 34,
+    ]},
+    {"nome": "Números", "codigo": "NUM", "versiculos": [
+        54, 34, 51, 49, 31, 27, 89, 26, 23, 36, 35, 16, 33, 45, 41, 50, 13, 32, 22, 29,
+        35, 41, 30, 25, 18, 65, 23, 31, 40, 16, 54, 42, 56, 29, 34, 13,
+    ]},
+    {"nome": "Deuteronômio", "codigo": "DEU", "versiculos": [
+        46, 37, 29, 49, 33, 25, 26, 20, 29, 22, 32, 32, 18, 29, 23, 22, 20, 22, 21, 20,
+        23, 30, 25, 22, 19, 19, 26, 68, 29, 20, 30, 52, 29, 12,
+    ]},
+    {"nome": "Josué", "codigo": "JOS", "versiculos": [
+        18, 24, 17, 24, 15, 27, 26, 35, 27, 43, 23, 24, 33, 15, 63, 10, 18, 28, 51, 9,
+        45, 34, 16, 33,
+    ]},
+    {"nome": "Juízes", "codigo": "JDG", "versiculos": [
+        36, 23, 31, 24, 31, 40, 25, 35, 57, 18, 40, 15, 25, 20, 20, 31, 13, 31, 30, 48,
+        25,
+    ]},
+    {"nome": "Rute", "codigo": "RUT", "versiculos": [22, 23, 18, 22]},
+    {"nome": "1 Samuel", "codigo": "1SA", "versiculos": [
+        28, 36, 21, 22, 12, 21, 17, 22, 27, 27, 15, 25, 23, 52, 35, 23, 58, 30, 24, 42,
+        15, 23, 29, 22, 44, 25, 12, 25, 11, 31, 13,
+    ]},
+    {"nome": "2 Samuel", "codigo": "2SA", "versiculos": [
+        27, 32, 39, 12, 25, 23, 29, 18, 13, 19, 27, 31, 39, 33, 37, 23, 29, 33, 43, 26,
+        22, 51, 39, 25,
+    ]},
+    {"nome": "1 Reis", "codigo": "1KI", "versiculos": [
+        53, 46, 28, 34, 18, 38, 51, 66, 28, 29, 43, 33, 34, 31, 34, 34, 24, 46, 21, 43,
+        29, 53,
+    ]},
+    {"nome": "2 Reis", "codigo": "2KI", "versiculos": [
+        18, 25, 27, 44, 27, 33, 20, 29, 37, 36, 21, 21, 25, 29, 38, 20, 41, 37, 37, 21,
+        26, 20, 37, 20, 30,
+    ]},
+    {"nome": "1 Crônicas", "codigo": "1CH", "versiculos": [
+        54, 55, 24, 43, 26, 81, 40, 40, 44, 14, 47, 40, 14, 17, 29, 43, 27, 17, 19, 8,
+        30, 19, 32, 31, 31, 32, 34, 21, 30,
+    ]},
+    {"nome": "2 Crônicas", "codigo": "2CH", "versiculos": [
+        17, 18, 17, 22, 14, 42, 22, 18, 31, 19, 23, 16, 22, 15, 19, 14, 19, 34, 11, 37,
+        20, 12, 21, 27, 28, 23, 9, 27, 36, 27, 21, 33, 25, 33, 27, 23,
+    ]},
+    {"nome": "Esdras", "codigo": "EZR", "versiculos": [11, 70, 13, 24, 17, 22, 28, 36, 15, 44]},
+    {"nome": "Neemias", "codigo": "NEH", "versiculos": [11, 20, 32, 23, 19, 19, 73, 18, 38, 39, 36, 47, 31]},
+    {"nome": "Ester", "codigo": "EST", "versiculos": [22, 23, 15, 17, 14, 14, 10, 17, 32, 3]},
+    {"nome": "Jó", "codigo": "JOB", "versiculos": [
+        22, 13, 26, 21, 27, 30, 21, 22, 35, 22, 20, 25, 28, 22, 35, 22, 16, 21, 29, 29,
+        34, 30, 17, 25, 6, 14, 23, 28, 25, 31, 40, 22, 33, 37, 16, 33, 24, 41, 30, 24,
+        34, 17,
+    ]},
+    {"nome": "Salmos", "codigo": "PSA", "versiculos": [
+        6, 12, 8, 8, 12, 10, 17, 9, 20, 18, 7, 8, 6, 7, 5, 11, 15, 50, 14, 9,
+        13, 31, 6, 10, 22, 12, 14, 9, 11, 12, 24, 11, 22, 22, 28, 12, 40, 22, 13, 17,
+        13, 11, 5, 26, 17, 11, 9, 14, 20, 23, 19, 9, 6, 7, 23, 13, 11, 11, 17, 12,
+        8, 12, 11, 10, 13, 20, 7, 35, 36, 5, 24, 20, 28, 23, 10, 12, 20, 72, 13, 19,
+        16, 8, 18, 12, 13, 17, 7, 18, 52, 17, 16, 15, 5, 23, 11, 13, 12, 9, 9, 5,
+        8, 28, 22, 35, 45, 48, 43, 13, 31, 7, 10, 10, 9, 8, 18, 19, 2, 29, 176, 7,
+        8, 9, 4, 8, 5, 6, 5, 6, 8, 8, 3, 18, 3, 3, 21, 26, 9, 8, 24, 13,
+        10, 7, 12, 15, 21, 10, 20, 14, 9, 6,
+    ]},
+    {"nome": "Provérbios", "codigo": "PRO", "versiculos": [
+        33, 22, 35, 27, 23, 35, 27, 36, 18, 32, 31, 28, 25, 35, 33, 33, 28, 24, 29, 30,
+        31, 29, 35, 34, 28, 28, 27, 28, 27, 33, 31,
+    ]},
+    {"nome": "Eclesiastes", "codigo": "ECC", "versiculos": [18, 26, 22, 16, 20, 12, 29, 17, 18, 20, 10, 14]},
+    {"nome": "Cânticos", "codigo": "SNG", "versiculos": [17, 17, 11, 16, 16, 13, 13, 14]},
+    {"nome": "Isaías", "codigo": "ISA", "versiculos": [
+        31, 22, 26, 6, 30, 13, 25, 22, 21, 34, 16, 6, 22, 32, 9, 14, 14, 7, 25, 6,
+        17, 25, 18, 23, 12, 21, 13, 29, 24, 33, 9, 20, 24, 17, 10, 22, 38, 22, 8, 31,
+        29, 25, 28, 28, 25, 13, 15, 22, 26, 11, 23, 15, 12, 17, 13, 12, 21, 14, 21, 22,
+        11, 12, 19, 12, 25, 24,
+    ]},
+    {"nome": "Jeremias", "codigo": "JER", "versiculos": [
+        19, 37, 25, 31, 31, 30, 34, 22, 26, 25, 23, 17, 27, 22, 21, 21, 27, 23, 15, 18,
+        14, 30, 40, 10, 38, 24, 22, 17, 32, 24, 40, 44, 26, 22, 19, 32, 21, 28, 18, 16,
+        18, 22, 13, 30, 5, 28, 7, 47, 39, 46, 64, 34,
+    ]},
+    {"nome": "Lamentações", "codigo": "LAM", "versiculos": [22, 22, 66, 22, 22]},
+    {"nome": "Ezequiel", "codigo": "EZK", "versiculos": [
+        28, 10, 27, 17, 17, 14, 27, 18, 11, 22, 25, 28, 23, 23, 8, 63, 24, 32, 14, 49,
+        32, 31, 49, 27, 17, 21, 36, 26, 21, 26, 18, 32, 33, 31, 15, 38, 28, 23, 29, 49,
+        26, 20, 27, 31, 25, 24, 23, 35,
+    ]},
+    {"nome": "Daniel", "codigo": "DAN", "versiculos": [21, 49, 30, 37, 31, 28, 28, 27, 27, 21, 45, 13]},
+    {"nome": "Oseias", "codigo": "HOS", "versiculos": [11, 23, 5, 19, 15, 11, 16, 14, 17, 15, 12, 14, 16, 9]},
+    {"nome": "Joel", "codigo": "JOL", "versiculos": [20, 32, 21]},
+    {"nome": "Amós", "codigo": "AMO", "versiculos": [15, 16, 15, 13, 27, 14, 17, 14, 15]},
+    {"nome": "Obadias", "codigo": "OBA", "versiculos": [21]},
+    {"nome": "Jonas", "codigo": "JON", "versiculos": [17, 10, 10, 11]},
+    {"nome": "Miqueias", "codigo": "MIC", "versiculos": [16, 13, 12, 13, 15, 16, 20]},
+    {"nome": "Naum", "codigo": "NAM", "versiculos": [15, 13, 19]},
+    {"nome": "Habacuque", "codigo": "HAB", "versiculos": [17, 20, 19]},
+    {"nome": "Sofonias", "codigo": "ZEP", "versiculos": [18, 15, 20]},
+    {"nome": "Ageu", "codigo": "HAG", "versiculos": [15, 23]},
+    {"nome": "Zacarias", "codigo": "ZEC", "versiculos": [21, 13, 10, 14, 11, 15, 14, 23, 17, 12, 17, 14, 9, 21]},
+    {"nome": "Malaquias", "codigo": "MAL", "versiculos": [14, 17, 18, 6]},
+    {"nome": "Mateus", "codigo": "MAT", "versiculos": [
+        25, 23, 17, 25, 48, 34, 29, 34, 38, 42, 30, 50, 58, 36, 39, 28, 27, 35, 30, 34,
+        46, 46, 39, 51, 46, 75, 66, 20,
+    ]},
+    {"nome": "Marcos", "codigo": "MRK", "versiculos": [45, 28, 35, 41, 43, 56, 37, 38, 50, 52, 33, 44, 37, 72, 47, 20]},
+    {"nome": "Lucas", "codigo": "LUK", "versiculos": [
+        80, 52, 38, 44, 39, 49, 50, 56, 62, 42, 54, 59, 35, 35, 32, 31, 37, 43, 48, 47,
+        38, 71, 56, 53,
+    ]},
+    {"nome": "João", "codigo": "JHN", "versiculos": [
+        51, 25, 36, 54, 47, 71, 53, 59, 41, 42, 57, 50, 38, 31, 27, 33, 26, 40, 42, 31,
+        25,
+    ]},
+    {"nome": "Atos", "codigo": "ACT", "versiculos": [
+        26, 47, 26, 37, 42, 15, 60, 40, 43, 48, 30, 25, 52, 28, 41, 40, 34, 28, 41, 38,
+        40, 30, 35, 27, 27, 32, 44, 31,
+    ]},
+    {"nome": "Romanos", "codigo": "ROM", "versiculos": [32, 29, 31, 25, 21, 23, 25, 39, 33, 21, 36, 21, 14, 23, 33, 27]},
+    {"nome": "1 Coríntios", "codigo": "1CO", "versiculos": [31, 16, 23, 21, 13, 20, 40, 13, 27, 33, 34, 31, 13, 40, 58, 24]},
+    {"nome": "2 Coríntios", "codigo": "2CO", "versiculos": [24, 17, 18, 18, 21, 18, 16, 24, 15, 18, 33, 21, 14]},
+    {"nome": "Gálatas", "codigo": "GAL", "versiculos": [24, 21, 29, 31, 26, 18]},
+    {"nome": "Efésios", "codigo": "EPH", "versiculos": [23, 22, 21, 32, 33, 24]},
+    {"nome": "Filipenses", "codigo": "PHP", "versiculos": [30, 30, 21, 23]},
+    {"nome": "Colossenses", "codigo": "COL", "versiculos": [29, 23, 25, 18]},
+    {"nome": "1 Tessalonicenses", "codigo": "1TH", "versiculos": [10, 20, 13, 18, 28]},
+    {"nome": "2 Tessalonicenses", "codigo": "2TH", "versiculos": [12, 17, 18]},
+    {"nome": "1 Timóteo", "codigo": "1TI", "versiculos": [20, 15, 16, 16, 25, 21]},
+    {"nome": "2 Timóteo", "codigo": "2TI", "versiculos": [18, 26, 17, 22]},
+    {"nome": "Tito", "codigo": "TIT", "versiculos": [16, 15, 15]},
+    {"nome": "Filemom", "codigo": "PHM", "versiculos": [25]},
+    {"nome": "Hebreus", "codigo": "HEB", "versiculos": [14, 18, 19, 16, 14, 20, 28, 13, 28, 39, 40, 29, 25]},
+    {"nome": "Tiago", "codigo": "JAS", "versiculos": [27, 26, 18, 17, 20]},
+    {"nome": "1 Pedro", "codigo": "1PE", "versiculos": [25, 25, 22, 19, 14]},
+    {"nome": "2 Pedro", "codigo": "2PE", "versiculos": [21, 22, 18]},
+    {"nome": "1 João", "codigo": "1JN", "versiculos": [10, 29, 24, 21, 21]},
+    {"nome": "2 João", "codigo": "2JN", "versiculos": [13]},
+    {"nome": "3 João", "codigo": "3JN", "versiculos": [14]},
+    {"nome": "Judas", "codigo": "JUD", "versiculos": [25]},
+    {"nome": "Apocalipse", "codigo": "REV", "versiculos": [
+        20, 29, 22, 11, 14, 17, 17, 13, 21, 11, 19, 17, 18, 20, 8, 21, 18, 24, 21, 15,
+        27, 21,
+    ]},
+]
+
+# Número do livro (1-66) pelo nome
+NUMERO_LIVRO = {livro["nome"]: numero for numero, livro in enumerate(LIVROS_BIBLIA, start=1)}
 
-# Função para expandir automaticamente os planos (para implementação futura)
-def expandir_plano_automatico():
-    """
-    TODO: Implementar lógica para preencher os 365 dias automaticamente
-    baseado na estrutura completa da Bíblia
-    """
-    pass
\ No newline at end of file
+# Número do livro (1-66) pelo código USFM
+CODIGO_LIVRO = {livro["codigo"]: numero for numero, livro in enumerate(LIVROS_BIBLIA, start=1)}
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Importador de traduções completas da Bíblia para o armazém de versículos
+Lê os arquivos em streaming (JSON, JSONL, CSV ou USFM), grava em lotes numa
+versão temporária, valida livros/capítulos contra a estrutura padrão e troca a
+versão publicada numa única transação.
+
+Uso:
+    python bible_importer.py --versao ARC --nome "Almeida Revista e Corrigida" arc.json
+    python bible_importer.py --versao NVI --nome "Nova Versão Internacional" usfm/*.usfm
+"""
+
+import os
+import re
+import csv
+import json
+import time
+import argparse
+from datetime import datetime
+from bible_data import LIVROS_BIBLIA
+from verse_store import armazem_versiculos, codificar_versiculo, numero_do_livro, versiculos_no_capitulo
+
+class ErroImportacao(Exception):
+    """Arquivo inválido ou tradução que não passou na validação"""
+
+def resolver_livro(livro):
+    """Número do livro (1-66) a partir do número, nome em português ou código USFM"""
+    numero = numero_do_livro(livro)
+    if numero is None:
+        raise ErroImportacao(f"Livro desconhecido: {livro!r}")
+    return numero
+
+def _campo(registro, *nomes):
+    for nome in nomes:
+        if nome in registro and registro[nome] not in (None, ""):
+            return registro[nome]
+    raise ErroImportacao(f"Campo ausente ({'/'.join(nomes)}) em {registro!r}")
+
+def _versiculo_do_registro(registro):
+    return (
+        resolver_livro(_campo(registro, "livro", "book")),
+        int(_campo(registro, "capitulo", "chapter")),
+        int(_campo(registro, "versiculo", "verse")),
+        str(_campo(registro, "texto", "text")).strip(),
+    )
+
+def ler_jsonl(caminho):
+    """Um versículo por linha: {"livro", "capitulo", "versiculo", "texto"}"""
+    with open(caminho, encoding="utf-8-sig") as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                yield _versiculo_do_registro(json.loads(linha))
+
+def ler_csv(caminho):
+    """CSV com cabeçalho livro,capitulo,versiculo,texto (ou book,chapter,verse,text)"""
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        for registro in csv.DictReader(arquivo):
+            yield _versiculo_do_registro(registro)
+
+def ler_json(caminho, tamanho_bloco=1 << 16):
+    """
+    Lista de livros [{"abbrev"|"livro"|"name", "chapters": [[versículo, ...], ...]}, ...]
+    Os livros são decodificados um a um (raw_decode), sem carregar o arquivo inteiro.
+    Livros sem identificação são numerados pela posição na lista.
+    """
+    decoder = json.JSONDecoder()
+    with open(caminho, encoding="utf-8-sig") as arquivo:
+        buffer = arquivo.read(tamanho_bloco).lstrip()
+        if not buffer.startswith("["):
+            raise ErroImportacao("JSON deve ser uma lista de livros")
+        buffer = buffer[1:]
+        posicao = 0
+        fim_arquivo = False
+
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                livro, indice = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise ErroImportacao(f"JSON inválido após o livro {posicao}")
+                bloco = arquivo.read(tamanho_bloco)
+                fim_arquivo = not bloco
+                buffer += bloco
+                continue
+
+            buffer = buffer[indice:]
+            posicao += 1
+            identificacao = livro.get("livro") or livro.get("name") or livro.get("abbrev")
+            try:
+                numero = resolver_livro(identificacao) if identificacao else posicao
+            except ErroImportacao:
+                numero = posicao
+            for capitulo, versiculos in enumerate(livro["chapters"], start=1):
+                for versiculo, texto in enumerate(versiculos, start=1):
+                    yield numero, capitulo, versiculo, texto.strip()
+
+_USFM_NOTAS = re.compile(r"\\(f|x|fe)\s.*?\\\1\*")
+_USFM_PALAVRA = re.compile(r"\\\+?w\s+([^|\\]*)(?:\|[^\\]*)?\\\+?w\*")
+_USFM_MARCADOR = re.compile(r"\\\+?[a-z]+\d*\*?")
+
+def _limpar_usfm(texto):
+    texto = _USFM_NOTAS.sub("", texto)
+    texto = _USFM_PALAVRA.sub(r"\1", texto)
+    texto = _USFM_MARCADOR.sub("", texto)
+    return " ".join(texto.split())
+
+def ler_usfm(caminho):
+    """Arquivo USFM de um livro: \\id, \\c e \\v; linhas de continuação são anexadas ao versículo"""
+    livro = capitulo = None
+    atual = None
+
+    with open(caminho, encoding="utf-8-sig") as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if linha.startswith("\\id "):
+                livro = resolver_livro(linha.split()[1])
+            elif linha.startswith("\\c "):
+                if atual:
+                    yield atual[0], atual[1], atual[2], _limpar_usfm(" ".join(atual[3]))
+                    atual = None
+                capitulo = int(linha.split()[1])
+            elif linha.startswith("\\v "):
+                if atual:
+                    yield atual[0], atual[1], atual[2], _limpar_usfm(" ".join(atual[3]))
+                if livro is None or capitulo is None:
+                    raise ErroImportacao(f"Versículo antes de \\id/\\c em {caminho}")
+                _, numero, *texto = linha.split(" ", 2)
+                atual = (livro, capitulo, int(numero.split("-")[0]), texto)
+            elif atual and linha and not linha.startswith(("\\s", "\\ms", "\\mt", "\\h", "\\toc")):
+                atual[3].append(linha)
+
+    if atual:
+        yield atual[0], atual[1], atual[2], _limpar_usfm(" ".join(atual[3]))
+
+LEITORES = {
+    "json": ler_json,
+    "jsonl": ler_jsonl,
+    "csv": ler_csv,
+    "usfm": ler_usfm,
+}
+
+def detectar_formato(caminho):
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    formato = {"ndjson": "jsonl", "sfm": "usfm"}.get(extensao, extensao)
+    if formato not in LEITORES:
+        raise ErroImportacao(f"Formato não reconhecido para {caminho}; use --formato")
+    return formato
+
+def validar_contagens(contagens, parcial=False, estrito=False):
+    """
+    Compara os versículos importados por (livro, capítulo) com a estrutura padrão
+
+    Returns:
+        tuple: (erros, avisos)
+    """
+    erros, avisos = [], []
+    livros_importados = {livro for livro, _ in contagens}
+
+    for numero, livro in enumerate(LIVROS_BIBLIA, start=1):
+        if numero not in livros_importados:
+            if not parcial:
+                erros.append(f"{livro['nome']}: livro ausente")
+            continue
+
+        capitulos = sorted(capitulo for (n, capitulo) in contagens if n == numero)
+        if capitulos != list(range(1, len(livro["versiculos"]) + 1)):
+            erros.append(f"{livro['nome']}: {len(capitulos)} capítulos, esperado {len(livro['versiculos'])}")
+            continue
+
+        for capitulo in capitulos:
+            esperado = versiculos_no_capitulo(numero, capitulo)
+            if contagens[(numero, capitulo)] != esperado:
+                # Traduções em português têm pequenas diferenças de versificação
+                mensagem = f"{livro['nome']} {capitulo}: {contagens[(numero, capitulo)]} versículos, esperado {esperado}"
+                (erros if estrito else avisos).append(mensagem)
+
+    return erros, avisos
+
+class ImportadorBiblia:
+
+    def __init__(self, armazem=None, tamanho_lote=None):
+        self.armazem = armazem or armazem_versiculos
+        self.tamanho_lote = tamanho_lote or int(os.getenv("BIBLE_IMPORT_BATCH", "5000"))
+
+    def importar(self, versao, nome, caminhos, formato=None, parcial=False, estrito=False):
+        """
+        Importa uma tradução e publica a versão se a validação passar
+
+        Args:
+            versao (str): Código da versão (ex: "ARC")
+            nome (str): Nome da versão
+            caminhos (list): Arquivos da tradução
+            formato (str): json, jsonl, csv ou usfm (padrão: pela extensão)
+            parcial (bool): Permite livros ausentes (ex: apenas o NT)
+            estrito (bool): Diferenças de versificação também são erros
+
+        Returns:
+            dict: Resumo da importação (versículos, duração, vazão, avisos)
+        """
+        temporaria = f"{versao}.__importando"
+        inicio = time.perf_counter()
+        bytes_lidos = sum(os.path.getsize(c) for c in caminhos)
+        contagens = {}
+        lidos = 0
+
+        conn = self.armazem.conexao_escrita()
+        try:
+            with conn:
+                conn.execute("DELETE FROM versiculos WHERE versao = ?", (temporaria,))
+
+            lote = []
+            for caminho in caminhos:
+                leitor = LEITORES[formato or detectar_formato(caminho)]
+                for livro, capitulo, versiculo, texto in leitor(caminho):
+                    if versiculos_no_capitulo(livro, capitulo) is None or not 1 <= versiculo < 1000:
+                        raise ErroImportacao(f"Referência fora da estrutura: {livro} {capitulo}:{versiculo}")
+                    contagens[(livro, capitulo)] = contagens.get((livro, capitulo), 0) + 1
+                    lote.append((temporaria, codificar_versiculo(livro, capitulo, versiculo), texto))
+                    if len(lote) >= self.tamanho_lote:
+                        lidos += self._gravar_lote(conn, lote)
+                        lote = []
+            lidos += self._gravar_lote(conn, lote)
+
+            armazenados = conn.execute(
+                "SELECT COUNT(*) FROM versiculos WHERE versao = ?", (temporaria,)
+            ).fetchone()[0]
+            if armazenados != lidos:
+                raise ErroImportacao(f"{lidos - armazenados} versículo(s) duplicado(s)")
+
+            erros, avisos = validar_contagens(contagens, parcial=parcial, estrito=estrito)
+            if erros:
+                raise ErroImportacao("Validação falhou:\n  " + "\n  ".join(erros[:20]))
+
+            geracao = self._publicar(conn, versao, nome, temporaria, armazenados, caminhos)
+        except Exception:
+            with conn:
+                conn.execute("DELETE FROM versiculos WHERE versao = ?", (temporaria,))
+            raise
+        finally:
+            conn.close()
+
+        duracao = time.perf_counter() - inicio
+        return {
+            "versao": versao,
+            "versiculos": armazenados,
+            "geracao": geracao,
+            "duracao_s": round(duracao, 2),
+            "versiculos_por_s": round(armazenados / duracao) if duracao > 0 else None,
+            "mb_por_s": round(bytes_lidos / 1024 / 1024 / duracao, 2) if duracao > 0 else None,
+            "avisos": avisos,
+        }
+
+    @staticmethod
+    def _gravar_lote(conn, lote):
+        if lote:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO versiculos (versao, vid, texto) VALUES (?, ?, ?)", lote
+                )
+        return len(lote)
+
+    def _publicar(self, conn, versao, nome, temporaria, versiculos, caminhos):
+        """Troca a versão publicada pela temporária numa única transação"""
+        with conn:
+            geracao = conn.execute("SELECT COALESCE(MAX(geracao), 0) + 1 FROM versoes").fetchone()[0]
+            conn.execute("DELETE FROM versiculos WHERE versao = ?", (versao,))
+            conn.execute("UPDATE versiculos SET versao = ? WHERE versao = ?", (versao, temporaria))
+            self.armazem.reindexar_busca(conn)
+            conn.execute("""
+                INSERT INTO versoes (codigo, nome, versiculos, fonte, geracao, importado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (codigo) DO UPDATE SET
+                    nome = excluded.nome,
+                    versiculos = excluded.versiculos,
+                    fonte = excluded.fonte,
+                    geracao = excluded.geracao,
+                    importado_em = excluded.importado_em
+            """, (versao, nome, versiculos, ", ".join(os.path.basename(c) for c in caminhos),
+                  geracao, datetime.now().isoformat()))
+        return geracao
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa uma tradução completa da Bíblia")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos da tradução")
+    parser.add_argument("--versao", required=True, help="Código da versão (ex: ARC)")
+    parser.add_argument("--nome", required=True, help="Nome da versão")
+    parser.add_argument("--formato", choices=sorted(LEITORES), help="Formato (padrão: pela extensão)")
+    parser.add_argument("--parcial", action="store_true", help="Permite livros ausentes")
+    parser.add_argument("--estrito", action="store_true", help="Diferenças de versificação são erros")
+    parser.add_argument("--lote", type=int, default=None, help="Versículos por transação")
+    args = parser.parse_args()
+
+    try:
+        resumo = ImportadorBiblia(tamanho_lote=args.lote).importar(
+            args.versao, args.nome, args.arquivos,
+            formato=args.formato, parcial=args.parcial, estrito=args.estrito,
+        )
+    except ErroImportacao as e:
+        print(f"❌ Importação cancelada: {e}")
+        exit(1)
+
+    print(f"✅ {resumo['versao']}: {resumo['versiculos']} versículos em {resumo['duracao_s']}s "
+          f"({resumo['versiculos_por_s']} versículos/s, {resumo['mb_por_s']} MB/s), geração {resumo['geracao']}")
+    if resumo["avisos"]:
+        print(f"⚠️ {len(resumo['avisos'])} diferença(s) de versificação:")
+        for aviso in resumo["avisos"][:20]:
+            print(f"  {aviso}")
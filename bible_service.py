@@ -5,15 +5,21 @@ Fornece funcionalidades para obter leituras diárias, versões e planos
 """
 
 from datetime import date
-from bible_data import VERSOES_BIBLIA, gerar_plano_completo
+from bible_data import LIVROS_BIBLIA, VERSOES_BIBLIA, PLANOS_LEITURA
+from reading_plan import leitura_do_plano, formatar_segmento
+from verse_store import (
+    armazem_versiculos, analisar_referencia, codificar_versiculo,
+    decodificar_versiculo, versiculos_no_capitulo
+)
 import requests
 import json
 import os
 
 class BibliaService:
     
-    def __init__(self):
+    def __init__(self, armazem=None):
         self.versoes_disponiveis = VERSOES_BIBLIA
+        self.armazem = armazem or armazem_versiculos
         
     def obter_leitura_do_dia(self, dia_do_ano=None, plano_leitura="cronologico", versao_biblia="ARC"):
         """
@@ -21,7 +27,7 @@ class BibliaService:
         
         Args:
             dia_do_ano (int): Dia do ano (1-365). Se None, usa dia atual
-            plano_leitura (str): Tipo de plano ("cronologico" ou "livros")
+            plano_leitura (str): Tipo de plano ("cronologico", "livros" ou "canonico")
             versao_biblia (str): Versão da Bíblia ("ARC", "NVI", "ACF")
             
         Returns:
@@ -33,62 +39,197 @@ class BibliaService:
         # Ajusta para não exceder 365 dias
         dia_do_ano = ((dia_do_ano - 1) % 365) + 1
         
-        plano = gerar_plano_completo(plano_leitura)
-        
-        if dia_do_ano not in plano:
-            # Se o dia não estiver mapeado, usa o último dia disponível
-            ultimo_dia = max(plano.keys())
-            leitura_info = plano[ultimo_dia]
-            texto_final = "Parabéns! Você completou o plano de leitura anual. Reinicie ou escolha um novo plano."
-        else:
-            leitura_info = plano[dia_do_ano]
-            texto_final = self._formatar_texto_leitura(leitura_info, versao_biblia)
+        leitura_info = leitura_do_plano(dia_do_ano, plano_leitura)
+        primeiro = leitura_info["segmentos"][0]
             
         return {
             "dia": dia_do_ano,
-            "livro": leitura_info["livro"],
-            "capitulo": leitura_info["capitulo"],
-            "versiculo_inicio": leitura_info.get("versiculo_inicio", 1),
-            "versiculo_fim": leitura_info.get("versiculo_fim", 1),
-            "referencia": self._formatar_referencia(leitura_info),
-            "texto": texto_final,
+            "livro": primeiro["livro"],
+            "capitulo": primeiro["capitulo"],
+            "versiculo_inicio": primeiro["versiculo_inicio"],
+            "versiculo_fim": primeiro["versiculo_fim"],
+            "segmentos": [formatar_segmento(s) for s in leitura_info["segmentos"]],
+            # Intervalo de ids de versículos de cada trecho: reconstrói exatamente esta leitura
+            "intervalos": [[s["vid_inicio"], s["vid_fim"]] for s in leitura_info["segmentos"]],
+            "referencia": leitura_info["referencia"],
+            "texto": self._formatar_texto_leitura(leitura_info, versao_biblia),
             "versao": versao_biblia,
             "plano": plano_leitura
         }
     
-    def _formatar_referencia(self, leitura_info):
-        """Formata a referência bíblica (ex: João 3:16-18)"""
-        livro = leitura_info["livro"]
-        capitulo = leitura_info["capitulo"]
-        v_inicio = leitura_info.get("versiculo_inicio", 1)
-        v_fim = leitura_info.get("versiculo_fim", 1)
+    def obter_leitura_dos_intervalos(self, intervalos, versao_biblia="ARC", referencia=None):
+        """
+        Reconstrói uma leitura já enviada a partir dos intervalos de versículos
+        gravados (um por trecho), sem consultar o plano
         
-        if v_inicio == v_fim:
-            return f"{livro} {capitulo}:{v_inicio}"
-        else:
-            return f"{livro} {capitulo}:{v_inicio}-{v_fim}"
+        Args:
+            intervalos (list): [[vid_inicio, vid_fim], ...] na ordem da leitura
+            versao_biblia (str): Versão da Bíblia
+            referencia (str): Referência exibida (padrão: formatada a partir dos trechos)
+            
+        Returns:
+            dict: referencia, texto, intervalos e versao
+        """
+        segmentos = []
+        for vid_inicio, vid_fim in intervalos:
+            livro, capitulo, versiculo_inicio = decodificar_versiculo(vid_inicio)
+            _, capitulo_fim, versiculo_fim = decodificar_versiculo(vid_fim)
+            segmentos.append({
+                "livro_numero": livro, "livro": LIVROS_BIBLIA[livro - 1]["nome"],
+                "capitulo": capitulo, "capitulo_fim": capitulo_fim,
+                "versiculo_inicio": versiculo_inicio, "versiculo_fim": versiculo_fim,
+                "vid_inicio": vid_inicio, "vid_fim": vid_fim,
+            })
+        referencia = referencia or "; ".join(formatar_segmento(s) for s in segmentos)
+        
+        return {
+            "referencia": referencia,
+            "texto": self._formatar_texto_leitura({"segmentos": segmentos, "referencia": referencia}, versao_biblia),
+            "intervalos": [list(intervalo) for intervalo in intervalos],
+            "versao": versao_biblia,
+        }
     
     def _formatar_texto_leitura(self, leitura_info, versao_biblia):
         """
         Formata o texto da leitura bíblica
-        Por enquanto retorna uma mensagem padrão, mas pode ser expandido
-        para incluir o texto completo da passagem
+        Busca cada trecho no armazém de versículos (um único intervalo por trecho)
+        e, se a versão não tiver a leitura completa, retorna uma instrução de leitura
         """
-        referencia = self._formatar_referencia(leitura_info)
+        referencia = leitura_info["referencia"]
         
         # Verifica se temos o texto específico na versão escolhida
-        versao_data = self.versoes_disponiveis.get(versao_biblia, self.versoes_disponiveis["ARC"])
+        if versao_biblia not in self.versoes_disponiveis:
+            versao_biblia = "ARC"
+        versao_data = self.versoes_disponiveis[versao_biblia]
+        
+        linhas = []
+        varios_capitulos = len(leitura_info["segmentos"]) > 1 or \
+            leitura_info["segmentos"][0]["capitulo"] != leitura_info["segmentos"][0]["capitulo_fim"]
+        for segmento in leitura_info["segmentos"]:
+            versiculos = self.armazem.intervalo(versao_biblia, segmento["vid_inicio"], segmento["vid_fim"])
+            esperados = sum(
+                versiculos_no_capitulo(segmento["livro_numero"], capitulo)
+                for capitulo in range(segmento["capitulo"], segmento["capitulo_fim"] + 1)
+            ) - (segmento["versiculo_inicio"] - 1) - (
+                versiculos_no_capitulo(segmento["livro_numero"], segmento["capitulo_fim"]) - segmento["versiculo_fim"]
+            )
+            if len(versiculos) != esperados:
+                linhas = None
+                break
+            
+            capitulo_atual = None
+            for vid, texto in versiculos:
+                _, capitulo, versiculo = decodificar_versiculo(vid)
+                if varios_capitulos and capitulo != capitulo_atual:
+                    capitulo_atual = capitulo
+                    linhas.append(f"\n*{segmento['livro']} {capitulo}*" if linhas else f"*{segmento['livro']} {capitulo}*")
+                linhas.append(f"{versiculo} {texto}")
         
-        # Se tivermos o versículo específico, usa ele
-        if referencia in versao_data["versos"]:
-            texto = versao_data["versos"][referencia]
-            return f'"{texto}"\n\n📖 {referencia} - {versao_data["nome"]}'
+        # Se tivermos a leitura completa, usa ela
+        if linhas:
+            return "\n".join(linhas) + f'\n\n📖 {referencia} - {versao_data["nome"]}'
         
         # Senão, retorna instrução de leitura
         return f"📖 Leitura de hoje: {referencia}\n\n" + \
                f"Versão: {versao_data['nome']}\n\n" + \
                "Leia esta passagem em sua Bíblia e reflita sobre a mensagem de Deus para sua vida hoje."
     
+    def comparar(self, versoes, referencia=None, dia_do_ano=None, plano_leitura="cronologico"):
+        """
+        Compara uma passagem em várias versões, versículo a versículo
+        
+        Args:
+            versoes (list): Códigos das versões a comparar
+            referencia (str): Passagem (ex: "João 3:16-18"); se None, usa a leitura do dia
+            dia_do_ano (int): Dia do plano (1-365) quando não houver referência
+            plano_leitura (str): Plano usado com dia_do_ano
+            
+        Returns:
+            dict: Referência e versículos alinhados ({"textos": {versão: texto}}) ou None
+                  se a referência for inválida
+        """
+        if referencia:
+            analisada = analisar_referencia(referencia)
+            if analisada is None:
+                return None
+            livro, capitulo, v_inicio, v_fim = analisada
+            intervalos = [(codificar_versiculo(livro, capitulo, v_inicio), codificar_versiculo(livro, capitulo, v_fim))]
+            referencia = self._formatar_referencia({
+                "livro": LIVROS_BIBLIA[livro - 1]["nome"], "capitulo": capitulo,
+                "versiculo_inicio": v_inicio, "versiculo_fim": v_fim
+            })
+        else:
+            leitura_info = leitura_do_plano(dia_do_ano, plano_leitura)
+            intervalos = [(s["vid_inicio"], s["vid_fim"]) for s in leitura_info["segmentos"]]
+            referencia = leitura_info["referencia"]
+        
+        # Uma consulta por trecho traz todas as versões; as linhas chegam ordenadas por versículo
+        versiculos = []
+        for vid_inicio, vid_fim in intervalos:
+            for vid, versao, texto in self.armazem.intervalo_versoes(versoes, vid_inicio, vid_fim):
+                if not versiculos or versiculos[-1]["vid"] != vid:
+                    numero, capitulo, versiculo = decodificar_versiculo(vid)
+                    nome_livro = LIVROS_BIBLIA[numero - 1]["nome"]
+                    versiculos.append({
+                        "vid": vid,
+                        "referencia": f"{nome_livro} {capitulo}:{versiculo}",
+                        "livro": nome_livro,
+                        "capitulo": capitulo,
+                        "versiculo": versiculo,
+                        "textos": dict.fromkeys(versoes)
+                    })
+                versiculos[-1]["textos"][versao] = texto
+        
+        return {
+            "referencia": referencia,
+            "versoes": [
+                {"codigo": codigo, "nome": self.versoes_disponiveis[codigo]["nome"]}
+                for codigo in versoes
+            ],
+            "versiculos": versiculos
+        }
+    
+    def _formatar_referencia(self, leitura_info):
+        """Formata a referência bíblica (ex: João 3:16-18)"""
+        livro = leitura_info["livro"]
+        capitulo = leitura_info["capitulo"]
+        v_inicio = leitura_info.get("versiculo_inicio", 1)
+        v_fim = leitura_info.get("versiculo_fim", 1)
+        
+        if v_inicio == v_fim:
+            return f"{livro} {capitulo}:{v_inicio}"
+        else:
+            return f"{livro} {capitulo}:{v_inicio}-{v_fim}"
+    
+    def buscar(self, consulta, versao_biblia=None, livro=None, limite=20, deslocamento=0):
+        """
+        Busca versículos por palavras, ignorando acentos
+        
+        Args:
+            consulta (str): Palavras, "frase exata" ou prefixo*
+            versao_biblia (str): Restringe a uma versão
+            livro (int): Restringe a um livro (1-66)
+            
+        Returns:
+            list: Versículos encontrados, na ordem da Bíblia
+        """
+        resultados = []
+        for versao, vid, texto, destaque in self.armazem.buscar(
+            consulta, versao=versao_biblia, livro=livro, limite=limite, deslocamento=deslocamento
+        ):
+            numero, capitulo, versiculo = decodificar_versiculo(vid)
+            nome_livro = LIVROS_BIBLIA[numero - 1]["nome"]
+            resultados.append({
+                "versao": versao,
+                "referencia": f"{nome_livro} {capitulo}:{versiculo}",
+                "livro": nome_livro,
+                "capitulo": capitulo,
+                "versiculo": versiculo,
+                "texto": texto,
+                "destaque": destaque
+            })
+        return resultados
+    
     def obter_versoes_disponiveis(self):
         """Retorna lista das versões da Bíblia disponíveis"""
         return [
@@ -103,21 +244,17 @@ class BibliaService:
         """Retorna lista dos planos de leitura disponíveis"""
         return [
             {
-                "codigo": "cronologico",
-                "nome": "Cronológico",
-                "descricao": "Leitura da Bíblia em ordem cronológica dos eventos"
-            },
-            {
-                "codigo": "livros", 
-                "nome": "Por Livros",
-                "descricao": "Leitura por ordem dos livros bíblicos (NT primeiro)"
+                "codigo": codigo,
+                "nome": info["nome"],
+                "descricao": info["descricao"]
             }
+            for codigo, info in PLANOS_LEITURA.items()
         ]
     
     def validar_configuracao(self, versao_biblia, plano_leitura):
         """Valida se a configuração escolhida pelo usuário é válida"""
         versoes_validas = list(self.versoes_disponiveis.keys())
-        planos_validos = ["cronologico", "livros"]
+        planos_validos = list(PLANOS_LEITURA.keys())
         
         return {
             "versao_valida": versao_biblia in versoes_validas,
@@ -140,8 +277,35 @@ def obter_trecho_do_dia(plano_leitura="cronologico", versao_biblia="ARC"):
 
 def obter_leitura_personalizada(usuario_id, dia_do_ano=None):
     """
-    Obtém leitura personalizada baseada nas preferências do usuário
-    TODO: Integrar com o banco de dados para buscar preferências do usuário
+    Obtém leitura personalizada baseada nas preferências e no progresso do usuário
+
+    Args:
+        usuario_id (int): ID do usuário
+        dia_do_ano (int): Dia do plano (padrão: próximo dia do usuário)
+
+    Returns:
+        dict: Leitura do dia com o progresso do usuário ou None se o usuário não existir
     """
-    # Por enquanto usa configuração padrão
-    return biblia_service.obter_leitura_do_dia(dia_do_ano)
\ No newline at end of file
+    from database import sessao_escopo
+    from models import Usuario
+
+    with sessao_escopo() as db:
+        usuario = db.query(
+            Usuario.plano_leitura,
+            Usuario.versao_biblia,
+            Usuario.proximo_dia_plano,
+            Usuario.plano_iniciado_em,
+        ).filter(Usuario.id == usuario_id).first()
+
+    if not usuario:
+        return None
+
+    proximo_dia = usuario.proximo_dia_plano or 1
+    leitura = biblia_service.obter_leitura_do_dia(
+        dia_do_ano or proximo_dia,
+        usuario.plano_leitura or "cronologico",
+        usuario.versao_biblia or "ARC"
+    )
+    leitura["proximo_dia_plano"] = proximo_dia
+    leitura["plano_iniciado_em"] = usuario.plano_iniciado_em.isoformat() if usuario.plano_iniciado_em else None
+    return leitura
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Configuração do pytest: antes de qualquer teste importar o armazém global de
+versículos, BIBLE_DB_PATH aponta para um arquivo temporário (ver banco_teste)
+"""
+
+import banco_teste  # noqa: F401
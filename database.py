@@ -1,11 +1,100 @@
-from sqlalchemy import create_engine
+import os
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# Cria o banco de dados SQLite local
-engine = create_engine("sqlite:///versozap.db", echo=True)
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///versozap.db")
+
+def _env_bool(nome, padrao="false"):
+    return os.getenv(nome, padrao).strip().lower() in ("1", "true", "yes", "on")
+
+def _configurar_sqlite(conexao_dbapi, registro):
+    """
+    Pragmas de cada conexão SQLite: WAL deixa leitores trabalhando enquanto o
+    scheduler escreve, NORMAL só sincroniza o disco nos checkpoints e o
+    busy_timeout espera o lock de escrita em vez de falhar na hora
+    """
+    cursor = conexao_dbapi.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout = {int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))}")
+    cursor.execute(f"PRAGMA mmap_size = {int(os.getenv('DB_MMAP_MB', '256')) * 1024 * 1024}")
+    cursor.close()
+
+def criar_engine(database_url=None, echo=None):
+    """
+    Cria uma engine configurada pelo ambiente
+
+    Args:
+        database_url (str): URL do banco (padrão: DATABASE_URL)
+        echo (bool): Loga cada SQL executado (padrão: DB_ECHO, desligado)
+
+    Returns:
+        Engine: Engine com pool dimensionado e, no SQLite, WAL e pragmas de desempenho
+    """
+    database_url = database_url or DATABASE_URL
+    # Provedores como Render/Heroku usam o esquema antigo, recusado pelo SQLAlchemy 2
+    if database_url.startswith("postgres://"):
+        database_url = "postgresql://" + database_url[len("postgres://"):]
+    opcoes = {
+        "echo": _env_bool("DB_ECHO") if echo is None else echo,
+        "pool_pre_ping": True,
+    }
+
+    sqlite = database_url.startswith("sqlite")
+    em_memoria = sqlite and (":memory:" in database_url or database_url.rstrip("/") == "sqlite:")
+    if not em_memoria:
+        opcoes["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+        opcoes["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    if sqlite:
+        # As conexões do pool são usadas pelas threads do Flask e do scheduler
+        opcoes["connect_args"] = {"check_same_thread": False}
+    else:
+        # Servidores fecham conexões ociosas: recicla antes disso
+        opcoes["pool_recycle"] = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+    engine = create_engine(database_url, **opcoes)
+    if sqlite:
+        event.listen(engine, "connect", _configurar_sqlite)
+    return engine
+
+# Engine compartilhada pela aplicação, scheduler, migrations e logs
+engine = criar_engine()
 
 # Cria a sessão para manipular o banco
 SessionLocal = sessionmaker(bind=engine)
 
 # Base para os modelos
 Base = declarative_base()
+
+@contextmanager
+def sessao_escopo(fabrica=None):
+    """
+    Sessão para jobs e scripts: commit ao final, rollback em caso de erro e a
+    conexão sempre volta ao pool
+
+    Args:
+        fabrica (sessionmaker): Fábrica de sessões (padrão: SessionLocal)
+    """
+    db = (fabrica or SessionLocal)()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def estatisticas_pool(engine_db=None):
+    """Uso do pool de conexões (em uso, livres e overflow)"""
+    pool = (engine_db or engine).pool
+    estatisticas = {"tipo": type(pool).__name__}
+    for nome, metodo in (("tamanho", "size"), ("em_uso", "checkedout"),
+                         ("livres", "checkedin"), ("overflow", "overflow")):
+        if hasattr(pool, metodo):
+            estatisticas[nome] = getattr(pool, metodo)()
+    return estatisticas
@@ -4,28 +4,63 @@ Gerenciador de banco de dados e sistema de migrations para VersoZap
 """
 
 import os
+import re
+import shutil
 import sqlite3
-from datetime import datetime
-from sqlalchemy import create_engine, text, inspect
+import argparse
+import subprocess
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import text, inspect, bindparam
 from sqlalchemy.orm import sessionmaker
-from database import Base, engine, SessionLocal
+from database import Base, engine, SessionLocal, DATABASE_URL, criar_engine
 from models import Usuario, Leitura
+from file_lock import LockArquivo
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "HH:MM" com horas 00-23 e minutos 00-59 (mesma regra de models.horario_para_minuto)
+HORARIO_ENVIO_VALIDO = """
+    horario_envio LIKE '__:__'
+    AND substr(horario_envio, 1, 1) BETWEEN '0' AND '2' AND substr(horario_envio, 2, 1) BETWEEN '0' AND '9'
+    AND substr(horario_envio, 1, 2) <= '23' AND substr(horario_envio, 3, 1) = ':'
+    AND substr(horario_envio, 4, 1) BETWEEN '0' AND '5' AND substr(horario_envio, 5, 1) BETWEEN '0' AND '9'
+"""
+
+# Chave do pg_advisory_lock que serializa execuções concorrentes das migrations
+CHAVE_LOCK_MIGRATIONS = 7_420_001
+
+def adaptar_ddl(sql, dialeto):
+    """
+    Traduz o DDL das migrations (escrito para SQLite) para o dialeto da engine
+
+    Args:
+        sql (str): SQL da migration
+        dialeto (str): Nome do dialeto SQLAlchemy ("sqlite", "postgresql")
+
+    Returns:
+        str: SQL pronto para o dialeto
+    """
+    if dialeto == "postgresql":
+        sql = re.sub(r"INTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT", "SERIAL PRIMARY KEY", sql, flags=re.IGNORECASE)
+    return sql
+
 class DatabaseManager:
     
     def __init__(self, database_url=None):
-        self.database_url = database_url or os.getenv("DATABASE_URL", "sqlite:///versozap.db")
-        self.engine = create_engine(self.database_url, echo=False)
+        # Sem URL explícita usa a engine compartilhada da aplicação
+        self.database_url = database_url or DATABASE_URL
+        self.engine = criar_engine(database_url) if database_url else engine
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.dialeto = self.engine.dialect.name
         
     def create_migrations_table(self):
         """Cria tabela de controle de migrations se não existir"""
         with self.engine.connect() as conn:
-            conn.execute(text("""
+            conn.execute(text(adaptar_ddl("""
                 CREATE TABLE IF NOT EXISTS migrations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     migration_name TEXT NOT NULL UNIQUE,
@@ -33,7 +68,7 @@ class DatabaseManager:
                     success BOOLEAN DEFAULT TRUE,
                     error_message TEXT
                 )
-            """))
+            """, self.dialeto)))
             conn.commit()
     
     def get_executed_migrations(self):
@@ -66,7 +101,7 @@ class DatabaseManager:
             
             with self.engine.connect() as conn:
                 # Executa as queries da migration
-                for query in migration_sql.split(';'):
+                for query in adaptar_ddl(migration_sql, self.dialeto).split(';'):
                     query = query.strip()
                     if query:
                         conn.execute(text(query))
@@ -83,6 +118,50 @@ class DatabaseManager:
             self.record_migration(migration_name, success=False, error_message=error_msg)
             return False
     
+    def versao_atual(self):
+        """Nome da última migration definida (versão esperada do esquema)"""
+        return next(reversed(self.get_all_migrations()))
+
+    def esquema_atualizado(self):
+        """
+        Caminho rápido do boot: uma única consulta, sem DDL. As migrations
+        rodam em ordem e param na primeira falha, então basta a última ter rodado.
+        """
+        try:
+            with self.engine.connect() as conn:
+                return conn.execute(text("""
+                    SELECT 1 FROM migrations WHERE migration_name = :versao AND success = TRUE
+                """), {"versao": self.versao_atual()}).first() is not None
+        except Exception:
+            # Banco novo, ainda sem a tabela de controle
+            return False
+
+    @contextmanager
+    def lock_migrations(self, timeout=300):
+        """Lock entre processos para que apenas um execute as migrations"""
+        if self.dialeto == "postgresql":
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT pg_advisory_lock(:chave)"), {"chave": CHAVE_LOCK_MIGRATIONS})
+                try:
+                    yield
+                finally:
+                    conn.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": CHAVE_LOCK_MIGRATIONS})
+                    conn.commit()
+        elif self.dialeto == "sqlite" and self.engine.url.database not in (None, "", ":memory:"):
+            with LockArquivo(f"{self.engine.url.database}.migrations.lock", timeout):
+                yield
+        else:
+            yield
+
+    def migrar(self):
+        """Executa as migrations pendentes sob lock (python database_manager.py migrate)"""
+        with self.lock_migrations():
+            # Outro processo pode ter migrado enquanto aguardávamos o lock
+            if self.esquema_atualizado():
+                logger.info("✅ Todas as migrations já foram executadas")
+                return True
+            return self.run_migrations()
+
     def run_migrations(self):
         """Executa todas as migrations pendentes"""
         self.create_migrations_table()
@@ -210,27 +289,183 @@ class DatabaseManager:
                 
                 CREATE INDEX IF NOT EXISTS idx_message_queue_status ON message_queue(status);
                 CREATE INDEX IF NOT EXISTS idx_message_queue_agendado ON message_queue(agendado_para);
+            """,
+
+            "007_add_send_slot": """
+                ALTER TABLE usuarios ADD COLUMN minuto_envio INTEGER DEFAULT 480;
+
+                UPDATE usuarios SET minuto_envio = NULL;
+                UPDATE usuarios
+                SET minuto_envio = CAST(substr(horario_envio, 1, 2) AS INTEGER) * 60
+                                 + CAST(substr(horario_envio, 4, 2) AS INTEGER)
+                WHERE """ + HORARIO_ENVIO_VALIDO + """;
+
+                CREATE INDEX IF NOT EXISTS idx_usuarios_minuto_envio ON usuarios(minuto_envio);
+            """,
+
+            "008_add_message_queue_claims": """
+                ALTER TABLE message_queue ADD COLUMN reivindicado_por TEXT;
+                ALTER TABLE message_queue ADD COLUMN reivindicado_em TIMESTAMP;
+
+                CREATE INDEX IF NOT EXISTS idx_message_queue_status_agendado ON message_queue(status, agendado_para);
+                CREATE INDEX IF NOT EXISTS idx_message_queue_reivindicado ON message_queue(reivindicado_por);
+            """,
+
+            "009_add_scheduler_leases": """
+                CREATE TABLE IF NOT EXISTS scheduler_leases (
+                    nome TEXT PRIMARY KEY,
+                    dono TEXT,
+                    expira_em TIMESTAMP,
+                    ultimo_tick TEXT,
+                    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """,
+
+            # Deslocamento fixo de cada usuário na janela e o plano de espalhamento
+            # de cada dia ({slot: largura da janela} em JSON)
+            "010_add_send_offset": """
+                ALTER TABLE usuarios ADD COLUMN deslocamento_envio INTEGER;
+
+                UPDATE usuarios SET deslocamento_envio = (id * 7919) % 1000;
+
+                CREATE INDEX IF NOT EXISTS idx_usuarios_slot_deslocamento ON usuarios(minuto_envio, deslocamento_envio);
+
+                CREATE TABLE IF NOT EXISTS planos_envio (
+                    dia TEXT PRIMARY KEY,
+                    plano TEXT NOT NULL,
+                    criado_em TIMESTAMP
+                );
+            """,
+
+            "011_add_prepared_readings": """
+                CREATE TABLE IF NOT EXISTS leituras_preparadas (
+                    dia INTEGER NOT NULL,
+                    plano TEXT NOT NULL,
+                    versao TEXT NOT NULL,
+                    leitura_json TEXT,
+                    audio_path TEXT,
+                    versao_conteudo TEXT,
+                    status TEXT NOT NULL,
+                    erro TEXT,
+                    gerado_em TIMESTAMP,
+                    PRIMARY KEY (dia, plano, versao)
+                );
+            """,
+
+            "012_add_plan_progress": """
+                ALTER TABLE usuarios ADD COLUMN proximo_dia_plano INTEGER DEFAULT 1;
+                ALTER TABLE usuarios ADD COLUMN plano_iniciado_em TIMESTAMP;
+                ALTER TABLE usuarios ADD COLUMN envios_sem_confirmacao INTEGER DEFAULT 0;
+
+                UPDATE usuarios
+                SET plano_iniciado_em = COALESCE(data_cadastro, CURRENT_TIMESTAMP),
+                    proximo_dia_plano = ((
+                        SELECT COUNT(*) FROM leituras
+                        WHERE leituras.usuario_id = usuarios.id AND leituras.concluido = TRUE
+                    ) % 365) + 1;
+            """,
+
+            "013_add_reading_references": """
+                ALTER TABLE leituras ADD COLUMN dia_plano INTEGER;
+                ALTER TABLE leituras ADD COLUMN plano TEXT;
+                ALTER TABLE leituras ADD COLUMN versao TEXT;
+                ALTER TABLE leituras ADD COLUMN intervalos TEXT;
+
+                CREATE INDEX IF NOT EXISTS idx_leituras_pendentes ON leituras(usuario_id, concluido, data);
+            """,
+
+            "014_add_log_rollups": """
+                CREATE TABLE IF NOT EXISTS log_rollups (
+                    minuto TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (minuto, level, category)
+                );
+
+                CREATE TABLE IF NOT EXISTS log_totais (
+                    level TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (level, category)
+                );
+
+                INSERT INTO log_rollups (minuto, level, category, total)
+                SELECT REPLACE(SUBSTR(CAST(timestamp AS TEXT), 1, 16), ' ', 'T'), level, category, COUNT(*)
+                FROM system_logs
+                GROUP BY REPLACE(SUBSTR(CAST(timestamp AS TEXT), 1, 16), ' ', 'T'), level, category;
+
+                INSERT INTO log_totais (level, category, total)
+                SELECT level, category, COUNT(*) FROM system_logs GROUP BY level, category;
+            """,
+
+            "015_add_log_keyset_indexes": """
+                CREATE INDEX IF NOT EXISTS idx_system_logs_ts_id ON system_logs(timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_system_logs_level_ts ON system_logs(level, timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_system_logs_category_ts ON system_logs(category, timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_system_logs_level_category_ts ON system_logs(level, category, timestamp, id);
+                CREATE INDEX IF NOT EXISTS idx_system_logs_user_ts ON system_logs(user_id, timestamp, id);
+
+                DROP INDEX IF EXISTS idx_system_logs_timestamp;
+                DROP INDEX IF EXISTS idx_system_logs_level;
+                DROP INDEX IF EXISTS idx_system_logs_category;
+            """,
+
+            "016_add_cleanup_progress": """
+                CREATE TABLE IF NOT EXISTS manutencao_progresso (
+                    tarefa TEXT PRIMARY KEY,
+                    ultimo_id INTEGER NOT NULL,
+                    removidos INTEGER NOT NULL DEFAULT 0,
+                    atualizado_em TIMESTAMP
+                );
+
+                -- Ids dos logs, únicos entre as partições diárias e o arquivo (system_logs)
+                CREATE TABLE IF NOT EXISTS log_sequencia (
+                    tabela TEXT PRIMARY KEY,
+                    ultimo_id INTEGER NOT NULL
+                );
+                INSERT INTO log_sequencia (tabela, ultimo_id)
+                SELECT 'system_logs', COALESCE(MAX(id), 0) FROM system_logs;
             """
         }
     
     def backup_database(self, backup_path=None):
-        """Cria backup do banco de dados"""
+        """Cria backup do banco de dados (API de backup do SQLite ou pg_dump)"""
         if backup_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"backup_versozap_{timestamp}.db"
+            extensao = "dump" if self.dialeto == "postgresql" else "db"
+            backup_path = f"backup_versozap_{timestamp}.{extensao}"
         
         try:
-            # Para SQLite, copiamos o arquivo
-            if self.database_url.startswith('sqlite'):
-                db_file = self.database_url.replace('sqlite:///', '')
-                import shutil
-                shutil.copy2(db_file, backup_path)
-                logger.info(f"✅ Backup criado: {backup_path}")
-                return backup_path
+            if self.dialeto == "sqlite":
+                # Cópia consistente mesmo em WAL (o arquivo principal sozinho pode estar incompleto)
+                origem = sqlite3.connect(self.engine.url.database)
+                destino = sqlite3.connect(backup_path)
+                try:
+                    origem.backup(destino)
+                finally:
+                    destino.close()
+                    origem.close()
+            elif self.dialeto == "postgresql":
+                if not shutil.which("pg_dump"):
+                    logger.warning("pg_dump não encontrado no PATH; backup não realizado")
+                    return None
+                # pg_dump usa a URL libpq (sem o driver do SQLAlchemy)
+                url = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+                subprocess.run(
+                    ["pg_dump", "--format=custom", "--file", backup_path, url],
+                    check=True, capture_output=True, text=True
+                )
             else:
-                logger.warning("Backup automático disponível apenas para SQLite")
+                logger.warning(f"Backup automático indisponível para {self.dialeto}")
                 return None
+
+            logger.info(f"✅ Backup criado: {backup_path}")
+            return backup_path
                 
+        except subprocess.CalledProcessError as e:
+            logger.error(f"❌ Erro ao criar backup: {e.stderr.strip()}")
+            return None
         except Exception as e:
             logger.error(f"❌ Erro ao criar backup: {e}")
             return None
@@ -240,7 +475,7 @@ class DatabaseManager:
         inspector = inspect(self.engine)
         
         info = {
-            "database_url": self.database_url,
+            "database_url": self.engine.url.render_as_string(hide_password=True),
             "tables": inspector.get_table_names(),
             "migrations_executed": len(self.get_executed_migrations()),
             "created_at": datetime.now().isoformat()
@@ -258,50 +493,147 @@ class DatabaseManager:
         
         return info
     
-    def cleanup_old_data(self, days_old=90):
-        """Remove dados antigos para manter o banco otimizado"""
+    def cleanup_old_data(self, days_old=90, tamanho_lote=None, pausa=None, tempo_maximo=None):
+        """
+        Remove dados antigos para manter o banco otimizado, sem segurar o lock de
+        escrita: partições de logs expiradas são removidas inteiras (DROP TABLE) e
+        o restante sai em lotes pequenos, cada um na sua transação
+        
+        Args:
+            days_old (int): Idade mínima dos dados removidos, em dias
+            tamanho_lote (int): Linhas por lote (padrão: DB_CLEANUP_BATCH_SIZE)
+            pausa (float): Segundos entre lotes para outras escritas passarem (padrão: DB_CLEANUP_PAUSE_SECONDS)
+            tempo_maximo (float): Interrompe após esse tempo; a próxima execução continua de onde parou
+            
+        Returns:
+            dict: Logs, leituras e partições removidos e se a limpeza terminou
+        """
+        from log_partitions import TABELA_ARQUIVO, NIVEIS_PRESERVADOS, listar_particoes, expirar_particao, descontar_totais
+        
+        tamanho_lote = tamanho_lote or int(os.getenv("DB_CLEANUP_BATCH_SIZE", "1000"))
+        pausa = pausa if pausa is not None else float(os.getenv("DB_CLEANUP_PAUSE_SECONDS", "0.05"))
+        prazo = time.monotonic() + tempo_maximo if tempo_maximo else None
         try:
-            cutoff_date = datetime.now() - timedelta(days=days_old)
+            cutoff_date = datetime.now() - timedelta(days=max(int(days_old), 1))
+            resultado = {"logs_removed": 0, "readings_removed": 0, "partitions_dropped": 0, "completed": False}
             
-            with self.engine.connect() as conn:
-                # Remove logs antigos
-                result = conn.execute(text("""
-                    DELETE FROM system_logs 
-                    WHERE timestamp < :cutoff_date 
-                    AND level != 'ERROR'
-                """), {"cutoff_date": cutoff_date})
-                
-                deleted_logs = result.rowcount
-                
-                # Remove leituras muito antigas (mantém estatísticas)
-                result = conn.execute(text("""
-                    DELETE FROM leituras 
-                    WHERE data < :cutoff_date 
-                    AND concluido = TRUE
-                """), {"cutoff_date": cutoff_date})
-                
-                deleted_readings = result.rowcount
-                
-                conn.commit()
+            # Partições de dias inteiramente anteriores ao corte
+            for dia, tabela in listar_particoes(self.engine):
+                if dia >= cutoff_date.date():
+                    break
+                if prazo and time.monotonic() > prazo:
+                    return self._limpeza_interrompida(resultado)
+                with self.engine.begin() as conn:
+                    resultado["logs_removed"] += expirar_particao(conn, tabela)
+                resultado["partitions_dropped"] += 1
+                logger.info(f"🧹 Partição {tabela} removida")
+                time.sleep(pausa)
+            
+            with self.engine.begin() as conn:
+                # Os contadores por minuto só servem às estatísticas das últimas 24h
+                conn.execute(text("DELETE FROM log_rollups WHERE minuto < :corte"),
+                             {"corte": cutoff_date.isoformat()[:16]})
+            
+            niveis = ", ".join(f"'{nivel}'" for nivel in NIVEIS_PRESERVADOS)
+            removidos, concluido = self._excluir_em_lotes(
+                "limpeza_logs", TABELA_ARQUIVO, f"timestamp < :corte AND level NOT IN ({niveis})",
+                {"corte": cutoff_date.isoformat()}, tamanho_lote, pausa, prazo,
+                colunas=("level", "category"),
+                ao_remover=lambda conn, linhas: descontar_totais(
+                    conn, Counter((linha.level, linha.category) for linha in linhas))
+            )
+            resultado["logs_removed"] += removidos
+            if not concluido:
+                return self._limpeza_interrompida(resultado)
             
-            logger.info(f"🧹 Limpeza concluída: {deleted_logs} logs e {deleted_readings} leituras removidas")
-            return {"logs_removed": deleted_logs, "readings_removed": deleted_readings}
+            # Remove leituras muito antigas (mantém estatísticas)
+            removidos, concluido = self._excluir_em_lotes(
+                "limpeza_leituras", "leituras", "data < :corte AND concluido = TRUE",
+                {"corte": cutoff_date}, tamanho_lote, pausa, prazo
+            )
+            resultado["readings_removed"] = removidos
+            if not concluido:
+                return self._limpeza_interrompida(resultado)
+            resultado["completed"] = True
+            
+            logger.info(f"🧹 Limpeza concluída: {resultado['logs_removed']} logs, "
+                        f"{resultado['readings_removed']} leituras e "
+                        f"{resultado['partitions_dropped']} partições removidas")
+            return resultado
             
         except Exception as e:
             logger.error(f"❌ Erro na limpeza: {e}")
             return None
     
+    def _limpeza_interrompida(self, resultado):
+        logger.info(f"⏸️ Limpeza interrompida pelo tempo máximo (continua na próxima execução): {resultado}")
+        return resultado
+    
+    def _excluir_em_lotes(self, tarefa, tabela, condicao, params, tamanho_lote, pausa, prazo,
+                          colunas=(), ao_remover=None):
+        """
+        Apaga as linhas de 'tabela' que atendem a 'condicao' em lotes por id, um
+        lote por transação. O último id de cada lote fica em manutencao_progresso:
+        uma execução interrompida retoma dali em vez de varrer a tabela de novo
+        
+        Returns:
+            tuple: (linhas removidas nesta execução, False se o prazo acabou antes do fim)
+        """
+        with self.engine.connect() as conn:
+            ultimo_id = conn.execute(text("SELECT ultimo_id FROM manutencao_progresso WHERE tarefa = :tarefa"),
+                                     {"tarefa": tarefa}).scalar() or 0
+        if ultimo_id:
+            logger.info(f"🧹 {tarefa}: retomando a partir do id {ultimo_id}")
+        
+        selecao = ", ".join(("id",) + tuple(colunas))
+        removidos = 0
+        while True:
+            if prazo and time.monotonic() > prazo:
+                return removidos, False
+            with self.engine.begin() as conn:
+                linhas = conn.execute(text(f"""
+                    SELECT {selecao} FROM {tabela} WHERE id > :ultimo_id AND {condicao}
+                    ORDER BY id LIMIT :lote
+                """), {**params, "ultimo_id": ultimo_id, "lote": tamanho_lote}).fetchall()
+                if not linhas:
+                    conn.execute(text("DELETE FROM manutencao_progresso WHERE tarefa = :tarefa"), {"tarefa": tarefa})
+                    return removidos, True
+                
+                conn.execute(text(f"DELETE FROM {tabela} WHERE id IN :ids").bindparams(
+                    bindparam("ids", expanding=True)), {"ids": [linha.id for linha in linhas]})
+                if ao_remover:
+                    ao_remover(conn, linhas)
+                ultimo_id = linhas[-1].id
+                conn.execute(text("""
+                    INSERT INTO manutencao_progresso (tarefa, ultimo_id, removidos, atualizado_em)
+                    VALUES (:tarefa, :ultimo_id, :removidos, :agora)
+                    ON CONFLICT (tarefa) DO UPDATE SET ultimo_id = excluded.ultimo_id,
+                        removidos = manutencao_progresso.removidos + excluded.removidos,
+                        atualizado_em = excluded.atualizado_em
+                """), {"tarefa": tarefa, "ultimo_id": ultimo_id, "removidos": len(linhas),
+                       "agora": datetime.now()})
+            
+            removidos += len(linhas)
+            logger.info(f"🧹 {tarefa}: {removidos} linhas removidas (até o id {ultimo_id})")
+            time.sleep(pausa)
+    
     def optimize_database(self):
-        """Otimiza o banco de dados (VACUUM para SQLite)"""
+        """Otimiza o banco de dados (VACUUM no SQLite, VACUUM ANALYZE no PostgreSQL)"""
         try:
-            if self.database_url.startswith('sqlite'):
+            if self.dialeto == "sqlite":
                 with self.engine.connect() as conn:
                     conn.execute(text("VACUUM"))
                     conn.commit()
                 logger.info("✅ Banco de dados otimizado (VACUUM executado)")
                 return True
+            elif self.dialeto == "postgresql":
+                # VACUUM não roda dentro de transação
+                with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.execute(text("VACUUM ANALYZE"))
+                logger.info("✅ Banco de dados otimizado (VACUUM ANALYZE executado)")
+                return True
             else:
-                logger.warning("Otimização automática disponível apenas para SQLite")
+                logger.warning(f"Otimização automática indisponível para {self.dialeto}")
                 return False
                 
         except Exception as e:
@@ -312,11 +644,23 @@ class DatabaseManager:
 db_manager = DatabaseManager()
 
 def initialize_database():
-    """Função principal para inicializar o banco de dados"""
+    """
+    Função principal para inicializar o banco de dados. No boot dos workers
+    apenas confere a versão do esquema; as migrations só rodam (sob lock) se
+    o banco estiver desatualizado e DB_AUTO_MIGRATE não estiver desligado.
+    """
+    if db_manager.esquema_atualizado():
+        logger.info("✅ Esquema do banco na versão atual")
+        return True
+
+    if os.getenv("DB_AUTO_MIGRATE", "true").lower() not in ("1", "true", "yes"):
+        logger.error("❌ Esquema do banco desatualizado: execute python database_manager.py migrate")
+        return False
+
     logger.info("🗄️ Inicializando banco de dados...")
     
     # Executa migrations
-    if db_manager.run_migrations():
+    if db_manager.migrar():
         logger.info("✅ Banco de dados inicializado com sucesso")
         return True
     else:
@@ -324,6 +668,31 @@ def initialize_database():
         return False
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Banco de dados do VersoZap")
+    parser.add_argument("comando", nargs="?", default="info", choices=["info", "migrate", "status", "cleanup"],
+                        help="info (padrão): inicializa e mostra informações; migrate: executa as "
+                             "migrations pendentes; status: confere a versão do esquema; cleanup: "
+                             "remove dados antigos")
+    parser.add_argument("--dias", type=int, default=90, help="cleanup: idade mínima dos dados removidos")
+    parser.add_argument("--tempo-maximo", type=float, help="cleanup: segundos até interromper (retoma depois)")
+    args = parser.parse_args()
+
+    if args.comando == "cleanup":
+        if not initialize_database():
+            exit(1)
+        resultado = db_manager.cleanup_old_data(args.dias, tempo_maximo=args.tempo_maximo)
+        print(resultado)
+        exit(0 if resultado else 1)
+
+    if args.comando == "migrate":
+        exit(0 if db_manager.migrar() else 1)
+
+    if args.comando == "status":
+        atualizado = db_manager.esquema_atualizado()
+        print(f"Versão esperada: {db_manager.versao_atual()} ({'atualizado' if atualizado else 'pendente'})")
+        exit(0 if atualizado else 1)
+
     # Executa inicialização quando chamado diretamente
     initialize_database()
     
@@ -331,4 +700,4 @@ if __name__ == "__main__":
     info = db_manager.get_database_info()
     print("\n📊 Informações do Banco de Dados:")
     for key, value in info.items():
-        print(f"  {key}: {value}")
\ No newline at end of file
+        print(f"  {key}: {value}")
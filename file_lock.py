@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Lock entre processos baseado em arquivo para VersoZap
+O arquivo de lock é criado com O_EXCL; quem não consegue criá-lo aguarda.
+Usado pelo cache de áudio (uma síntese por texto) e pelas migrations em SQLite
+"""
+
+import os
+import time
+
+class LockArquivo:
+    """Context manager: 'with LockArquivo(caminho, timeout):' entra na seção exclusiva"""
+
+    def __init__(self, caminho, timeout):
+        self.caminho = caminho
+        self.timeout = timeout
+
+    def __enter__(self):
+        inicio = time.time()
+        while True:
+            try:
+                fd = os.open(self.caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                # Lock abandonado por um processo que morreu: assume o controle
+                try:
+                    if time.time() - os.path.getmtime(self.caminho) > self.timeout:
+                        os.remove(self.caminho)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() - inicio > self.timeout:
+                    raise TimeoutError(f"Timeout aguardando lock {self.caminho}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+        return False
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Respostas HTTP cacheáveis para o conteúdo bíblico do VersoZap
+ETag forte sobre o corpo, Last-Modified e Cache-Control válido até a virada
+do dia; pedidos com If-None-Match/If-Modified-Since correspondentes recebem 304.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from flask import Response, request
+
+def calcular_etag(corpo):
+    """ETag forte (hash do corpo, sem aspas)"""
+    return hashlib.blake2b(corpo, digest_size=16).hexdigest()
+
+def segundos_ate_virada(agora=None):
+    """Segundos até a próxima meia-noite (horário do servidor)"""
+    agora = agora or datetime.now()
+    amanha = datetime.combine(agora.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((amanha - agora).total_seconds()))
+
+def resposta_cacheavel(corpo, etag=None, ultima_modificacao=None, mimetype="application/json"):
+    """
+    Resposta com validadores e Cache-Control até a virada do dia
+
+    Args:
+        corpo (bytes): Corpo já serializado
+        etag (str): ETag pré-calculada (padrão: hash do corpo)
+        ultima_modificacao (datetime): Valor de Last-Modified
+
+    Returns:
+        Response: 200 com o corpo ou 304 se o cliente já tiver esta versão
+    """
+    resposta = Response(corpo, mimetype=mimetype)
+    resposta.set_etag(etag or calcular_etag(corpo))
+    if ultima_modificacao:
+        resposta.last_modified = ultima_modificacao
+    resposta.cache_control.public = True
+    resposta.cache_control.max_age = segundos_ate_virada()
+    return resposta.make_conditional(request)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Saídas de arquivo e console dos logs do VersoZap
+Quem loga só coloca o registro numa fila (QueueHandler); uma thread ouvinte
+(QueueListener) formata e escreve no console e no arquivo. O arquivo é
+rotacionado por tamanho ou diariamente e as cópias antigas são comprimidas
+com gzip, também na thread ouvinte. O formato pode ser texto ou JSON lines.
+
+Cada arquivo tem um único processo escrevendo e rotacionando: o nome leva o
+papel do processo (ex.: versozap-gunicorn.log, versozap-scheduler.log) e um
+lock exclusivo define o dono. Outro processo do mesmo papel usa o próximo
+número livre (versozap-gunicorn-2.log), reaproveitado após reinícios, então o
+número de arquivos não cresce. Filhos de fork e workers de multiprocessing
+escrevem só no console. Para um único arquivo compartilhado, use
+LOG_ROTATION=externa e rotacione com logrotate.
+"""
+
+import os
+import sys
+import gzip
+import json
+import queue
+import atexit
+import shutil
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from logging.handlers import (QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler,
+                              WatchedFileHandler)
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+ARQUIVO_PADRAO = "versozap-{processo}.log"
+MAX_ARQUIVOS_POR_PAPEL = 32
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos, usa sempre o nome base
+    fcntl = None
+
+_ouvinte = None
+_handler_fila = None
+_lock_dono = None  # Descritor do lock do arquivo deste processo (mantido aberto até o encerramento)
+_lock = threading.Lock()
+
+class FormatadorJson(logging.Formatter):
+    """Um objeto JSON por linha: timestamp, nível, logger e mensagem"""
+
+    def format(self, record):
+        dados = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            dados["exception"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False)
+
+def _nome_comprimido(nome):
+    return nome + ".gz"
+
+def _comprimir(origem, destino):
+    """Rotação: comprime o arquivo que acabou de ser fechado"""
+    with open(origem, "rb") as entrada, gzip.open(destino, "wb") as saida:
+        shutil.copyfileobj(entrada, saida)
+    os.remove(origem)
+
+def nome_arquivo_log(modelo):
+    """
+    Nome base do arquivo deste processo: {processo} vira LOG_PROCESS (padrão:
+    nome do script, ex.: gunicorn, scheduler)
+    """
+    processo = os.getenv("LOG_PROCESS")
+    if not processo:
+        script = sys.argv[0] if sys.argv else ""
+        processo = os.path.splitext(os.path.basename(script))[0]
+        if processo == "__main__":
+            # python -m pacote: usa o nome do pacote
+            processo = os.path.basename(os.path.dirname(script))
+    return modelo.format(processo=processo or "versozap")
+
+def reservar_arquivo_log(diretorio, modelo):
+    """
+    Primeiro arquivo livre do papel (nome base, depois -2, -3...) com lock exclusivo
+
+    Returns:
+        tuple: (caminho, descritor do lock) ou (None, None) se todos estiverem em uso
+    """
+    raiz, extensao = os.path.splitext(nome_arquivo_log(modelo))
+    if fcntl is None:
+        return os.path.join(diretorio, raiz + extensao), None
+    for numero in range(1, MAX_ARQUIVOS_POR_PAPEL + 1):
+        caminho = os.path.join(diretorio, f"{raiz}{'' if numero == 1 else f'-{numero}'}{extensao}")
+        descritor = os.open(caminho + ".lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return caminho, descritor
+        except OSError:
+            os.close(descritor)
+    return None, None
+
+def _liberar_arquivo_log():
+    global _lock_dono
+    if _lock_dono is not None:
+        os.close(_lock_dono)
+        _lock_dono = None
+
+def criar_handler_arquivo(caminho, rotacao=None, tamanho_maximo_mb=None, copias=None):
+    """
+    Handler de arquivo com rotação e compressão das cópias antigas
+
+    Args:
+        caminho (str): Arquivo de log
+        rotacao (str): "tamanho", "diaria" ou "externa" (padrão: LOG_ROTATION, tamanho).
+            Na "externa" o processo não rotaciona: reabre o arquivo quando o logrotate o move
+        tamanho_maximo_mb (float): Tamanho para rotacionar (padrão: LOG_FILE_MAX_MB, 10)
+        copias (int): Cópias comprimidas mantidas (padrão: LOG_FILE_BACKUPS, 7)
+    """
+    rotacao = rotacao or os.getenv("LOG_ROTATION", "tamanho")
+    copias = copias if copias is not None else int(os.getenv("LOG_FILE_BACKUPS", "7"))
+    if rotacao == "externa":
+        return WatchedFileHandler(caminho, encoding="utf-8")
+    if rotacao == "diaria":
+        handler = TimedRotatingFileHandler(caminho, when="midnight", backupCount=copias, encoding="utf-8")
+    elif rotacao == "tamanho":
+        tamanho_maximo_mb = tamanho_maximo_mb or float(os.getenv("LOG_FILE_MAX_MB", "10"))
+        handler = RotatingFileHandler(caminho, maxBytes=int(tamanho_maximo_mb * 1024 * 1024),
+                                      backupCount=copias, encoding="utf-8")
+    else:
+        raise ValueError(f"Rotação de logs inválida: {rotacao}")
+    handler.namer = _nome_comprimido
+    handler.rotator = _comprimir
+    return handler
+
+def configurar_saidas(diretorio=None, arquivo=None, formato=None, nivel=None, console=None):
+    """
+    Liga a fila de logs ao logger raiz e inicia a thread ouvinte (uma vez por processo)
+
+    Args:
+        diretorio (str): Pasta dos logs (padrão: LOG_DIR, logs)
+        arquivo (str): Nome do arquivo, aceita {processo} (padrão: LOG_FILE, versozap-{processo}.log)
+        formato (str): "texto" ou "json" (padrão: LOG_FORMAT, texto)
+        nivel (str): Nível mínimo (padrão: LOG_LEVEL, INFO)
+        console (bool): Também escreve no console (padrão: LOG_CONSOLE, ligado)
+
+    Returns:
+        QueueListener: Ouvinte que escreve nas saídas
+    """
+    global _ouvinte, _handler_fila, _lock_dono
+    with _lock:
+        if _ouvinte is not None:
+            return _ouvinte
+
+        diretorio = diretorio or os.getenv("LOG_DIR", "logs")
+        os.makedirs(diretorio, exist_ok=True)
+        formato = formato or os.getenv("LOG_FORMAT", "texto")
+        if formato not in ("texto", "json"):
+            raise ValueError(f"Formato de logs inválido: {formato}")
+        formatador = FormatadorJson() if formato == "json" else logging.Formatter(FORMATO_TEXTO)
+        if console is None:
+            console = os.getenv("LOG_CONSOLE", "true").strip().lower() in ("1", "true", "yes", "on")
+
+        saidas = []
+        modelo = arquivo or os.getenv("LOG_FILE", ARQUIVO_PADRAO)
+        # Workers de multiprocessing (ex.: pré-renderização) não abrem arquivo; o nome do
+        # processo já vem definido enquanto o worker (spawn) importa os módulos
+        if multiprocessing.current_process().name == "MainProcess":
+            if os.getenv("LOG_ROTATION", "tamanho") == "externa":
+                caminho = os.path.join(diretorio, nome_arquivo_log(modelo))
+            else:
+                caminho, _lock_dono = reservar_arquivo_log(diretorio, modelo)
+            if caminho:
+                saidas.append(criar_handler_arquivo(caminho))
+        if console:
+            saidas.append(logging.StreamHandler())
+        for saida in saidas:
+            saida.setFormatter(formatador)
+
+        fila = queue.SimpleQueue()
+        _handler_fila = QueueHandler(fila)
+        raiz = logging.getLogger()
+        raiz.setLevel((nivel or os.getenv("LOG_LEVEL", "INFO")).upper())
+        raiz.addHandler(_handler_fila)
+
+        _ouvinte = QueueListener(fila, *saidas, respect_handler_level=True)
+        _ouvinte.start()
+        atexit.register(encerrar_saidas)
+        return _ouvinte
+
+def _reiniciar_apos_fork():
+    """
+    A thread ouvinte não sobrevive ao fork (workers do gunicorn com --preload).
+    O arquivo continua só do pai: o filho escreve apenas no console
+    """
+    global _lock_dono
+    if _ouvinte is not None:
+        arquivos = [saida for saida in _ouvinte.handlers if isinstance(saida, logging.FileHandler)]
+        _ouvinte.handlers = tuple(saida for saida in _ouvinte.handlers if saida not in arquivos)
+        for saida in arquivos:
+            # Fecha só a cópia do descritor herdada pelo filho; o pai segue escrevendo
+            if saida.stream:
+                saida.stream.close()
+                saida.stream = None
+        if _lock_dono is not None:
+            # O lock é do pai: fechar a cópia herdada não o libera
+            os.close(_lock_dono)
+            _lock_dono = None
+        fila = queue.SimpleQueue()
+        _ouvinte.queue = _handler_fila.queue = fila
+        _ouvinte._thread = None
+        _ouvinte.start()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_apos_fork)
+
+def encerrar_saidas():
+    """Escreve o que restou na fila e para a thread ouvinte (registrado no atexit)"""
+    global _ouvinte, _handler_fila
+    with _lock:
+        if _ouvinte is None:
+            return
+        logging.getLogger().removeHandler(_handler_fila)
+        _ouvinte.stop()
+        for saida in _ouvinte.handlers:
+            saida.close()
+        _ouvinte = _handler_fila = None
+        _liberar_arquivo_log()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Partições diárias dos logs do VersoZap
+Cada dia de logs fica numa tabela própria (system_logs_AAAAMMDD, mesmas colunas
+e índices de system_logs), criada pelo gravador no primeiro log do dia. Expirar
+um dia é um DROP TABLE em vez de um DELETE de milhões de linhas. A tabela
+system_logs continua como arquivo: logs anteriores às partições e os ERRORs
+preservados quando a partição do dia é removida. Os ids vêm de um contador
+único (log_sequencia), então um log mantém o mesmo id ao ir para o arquivo e o
+cursor (timestamp, id) não se repete entre tabelas.
+"""
+
+import re
+from collections import Counter
+from datetime import date
+from sqlalchemy import text, inspect
+from database_manager import adaptar_ddl
+
+TABELA_ARQUIVO = "system_logs"
+PREFIXO_PARTICAO = "system_logs_"
+_NOME_PARTICAO = re.compile(r"^system_logs_(\d{8})$")
+
+# Níveis preservados (copiados para o arquivo) quando uma partição expira
+NIVEIS_PRESERVADOS = ("ERROR",)
+
+DDL_PARTICAO = """
+    CREATE TABLE IF NOT EXISTS {nome} (
+        id INTEGER PRIMARY KEY,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        level TEXT NOT NULL,
+        category TEXT NOT NULL,
+        message TEXT NOT NULL,
+        details TEXT,
+        user_id INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_{nome}_ts_id ON {nome}(timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_{nome}_level_ts ON {nome}(level, timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_{nome}_category_ts ON {nome}(category, timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_{nome}_level_category_ts ON {nome}(level, category, timestamp, id);
+    CREATE INDEX IF NOT EXISTS idx_{nome}_user_ts ON {nome}(user_id, timestamp, id)
+"""
+
+def dia_do_log(timestamp):
+    """Dia de um log (date) a partir do timestamp gravado (str ISO ou datetime)"""
+    valor = timestamp.isoformat() if hasattr(timestamp, "isoformat") else str(timestamp)
+    return date.fromisoformat(valor[:10])
+
+def nome_particao(dia):
+    """Tabela dos logs de um dia: system_logs_AAAAMMDD"""
+    return f"{PREFIXO_PARTICAO}{dia.strftime('%Y%m%d')}"
+
+def listar_particoes(engine_db):
+    """Partições existentes [(dia, tabela)] em ordem cronológica"""
+    particoes = []
+    for tabela in inspect(engine_db).get_table_names():
+        encontrado = _NOME_PARTICAO.match(tabela)
+        if encontrado:
+            valor = encontrado.group(1)
+            particoes.append((date(int(valor[:4]), int(valor[4:6]), int(valor[6:])), tabela))
+    return sorted(particoes)
+
+def reservar_ids(conn, quantidade):
+    """
+    Reserva ids consecutivos para novos logs no contador compartilhado
+
+    Returns:
+        int: Primeiro id reservado
+    """
+    conn.execute(text("UPDATE log_sequencia SET ultimo_id = ultimo_id + :quantidade WHERE tabela = :tabela"),
+                 {"quantidade": quantidade, "tabela": TABELA_ARQUIVO})
+    # A linha fica travada pelo UPDATE até o commit: nenhum outro gravador lê o mesmo valor
+    ultimo = conn.execute(text("SELECT ultimo_id FROM log_sequencia WHERE tabela = :tabela"),
+                          {"tabela": TABELA_ARQUIVO}).scalar()
+    return ultimo - quantidade + 1
+
+def criar_particao(conn, dia):
+    """Cria (se preciso) a partição de um dia dentro da transação de 'conn'"""
+    nome = nome_particao(dia)
+    for comando in adaptar_ddl(DDL_PARTICAO.format(nome=nome), conn.dialect.name).split(";"):
+        if comando.strip():
+            conn.execute(text(comando))
+    return nome
+
+def expirar_particao(conn, tabela):
+    """
+    Remove uma partição inteira: copia os níveis preservados para o arquivo,
+    desconta o restante dos totais das estatísticas e apaga a tabela
+
+    Returns:
+        int: Logs removidos (sem contar os preservados)
+    """
+    niveis = ", ".join(f"'{nivel}'" for nivel in NIVEIS_PRESERVADOS)
+    conn.execute(text(f"""
+        INSERT INTO {TABELA_ARQUIVO} (id, timestamp, level, category, message, details, user_id)
+        SELECT id, timestamp, level, category, message, details, user_id FROM {tabela}
+        WHERE level IN ({niveis}) ORDER BY timestamp, id
+    """))
+    removidos = Counter({
+        (row.level, row.category): row.total for row in conn.execute(text(f"""
+            SELECT level, category, COUNT(*) AS total FROM {tabela}
+            WHERE level NOT IN ({niveis}) GROUP BY level, category
+        """))
+    })
+    descontar_totais(conn, removidos)
+    conn.execute(text(f"DROP TABLE {tabela}"))
+    return sum(removidos.values())
+
+def descontar_totais(conn, removidos):
+    """Desconta logs removidos dos totais por (level, category) usados nas estatísticas"""
+    if removidos:
+        conn.execute(text("""
+            UPDATE log_totais SET total = MAX(total - :removidos, 0)
+            WHERE level = :level AND category = :category
+        """ if conn.dialect.name == "sqlite" else """
+            UPDATE log_totais SET total = GREATEST(total - :removidos, 0)
+            WHERE level = :level AND category = :category
+        """), [{"level": l, "category": c, "removidos": t} for (l, c), t in removidos.items()])
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação assíncrona dos logs no banco para VersoZap
+Os registros entram numa fila em memória limitada e uma thread em segundo
+plano os insere em lotes (por tamanho ou por tempo), fora da thread do request
+e numa única transação por lote, na partição diária de cada log (log_partitions).
+Na mesma transação são somados os contadores por minuto (log_rollups) e totais
+(log_totais) usados pelas estatísticas.
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import Counter
+from sqlalchemy import text
+from database import engine
+from log_partitions import dia_do_log, nome_particao, listar_particoes, criar_particao, reservar_ids
+
+logger = logging.getLogger(__name__)
+
+# O que fazer com um registro novo quando a fila está cheia
+POLITICAS_EXCESSO = ("descartar_novos", "descartar_antigos", "bloquear")
+
+def minuto_do_log(timestamp):
+    """Bucket de um log: "AAAA-MM-DDTHH:MM" (mesmo formato ISO dos timestamps gravados)"""
+    valor = timestamp.isoformat() if hasattr(timestamp, "isoformat") else str(timestamp)
+    return valor[:16].replace(" ", "T")
+
+class GravadorLogs:
+
+    def __init__(self, engine_db=None, capacidade=None, tamanho_lote=None, intervalo=None,
+                 politica=None, espera_bloqueio=None):
+        self.engine = engine_db or engine
+        self.capacidade = capacidade or int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        self.tamanho_lote = tamanho_lote or int(os.getenv("LOG_BATCH_SIZE", "500"))
+        self.intervalo = intervalo if intervalo is not None else float(os.getenv("LOG_FLUSH_SECONDS", "1"))
+        self.politica = politica or os.getenv("LOG_OVERFLOW_POLICY", "descartar_novos")
+        if self.politica not in POLITICAS_EXCESSO:
+            raise ValueError(f"Política de excesso inválida: {self.politica}")
+        self.espera_bloqueio = espera_bloqueio if espera_bloqueio is not None else \
+            float(os.getenv("LOG_QUEUE_BLOCK_SECONDS", "0.5"))
+
+        self._fila = queue.Queue(maxsize=self.capacidade)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._descarregar = threading.Event()
+        # Dias cuja partição este processo já criou ou conferiu
+        self._particoes = set()
+        self.metricas = {"enfileirados": 0, "gravados": 0, "descartados": 0, "lotes": 0,
+                         "retentativas": 0, "falhas": 0, "maior_profundidade": 0}
+        atexit.register(self.encerrar)
+
+    def enfileirar(self, registro):
+        """
+        Coloca um registro (colunas dos logs) na fila sem esperar o banco
+
+        Returns:
+            bool: False se o registro foi descartado pela política de excesso
+        """
+        self._garantir_thread()
+        try:
+            if self.politica == "bloquear":
+                self._fila.put(registro, timeout=self.espera_bloqueio)
+            else:
+                self._fila.put_nowait(registro)
+        except queue.Full:
+            if self.politica != "descartar_antigos" or not self._substituir_mais_antigo(registro):
+                self.metricas["descartados"] += 1
+                return False
+
+        self.metricas["enfileirados"] += 1
+        profundidade = self._fila.qsize()
+        if profundidade > self.metricas["maior_profundidade"]:
+            self.metricas["maior_profundidade"] = profundidade
+        return True
+
+    def _substituir_mais_antigo(self, registro):
+        try:
+            self._fila.get_nowait()
+            self._fila.task_done()
+            self.metricas["descartados"] += 1
+            self._fila.put_nowait(registro)
+            return True
+        except (queue.Empty, queue.Full):
+            return False
+
+    def _garantir_thread(self):
+        """Inicia a thread gravadora (de novo após um fork, p.ex. workers do gunicorn)"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # A fila herdada do processo pai pode estar com os locks internos presos
+                self._fila = queue.Queue(maxsize=self.capacidade)
+            self._pid = os.getpid()
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="versozap-log-sink", daemon=True)
+            self._thread.start()
+
+    def _executar(self):
+        while True:
+            lote = self._coletar_lote()
+            if lote:
+                self._gravar(lote)
+                for _ in lote:
+                    self._fila.task_done()
+            elif self._parar.is_set() and self._fila.empty():
+                # Confere a fila de novo: um registro pode ter chegado junto com o pedido de parada
+                return
+
+    def _coletar_lote(self):
+        """Junta registros até completar o lote ou passar o intervalo desde o primeiro"""
+        lote = []
+        prazo = None
+        while len(lote) < self.tamanho_lote:
+            urgente = self._parar.is_set() or self._descarregar.is_set()
+            try:
+                if urgente:
+                    registro = self._fila.get_nowait()
+                else:
+                    # Espera em fatias curtas para notar encerramento e descarga
+                    espera = 0.1 if prazo is None else min(0.1, prazo - time.monotonic())
+                    if espera <= 0:
+                        break
+                    registro = self._fila.get(timeout=espera)
+            except queue.Empty:
+                if urgente:
+                    break
+                continue
+            if prazo is None:
+                prazo = time.monotonic() + self.intervalo
+            lote.append(registro)
+        return lote
+
+    def _gravar(self, lote):
+        por_dia, erro = None, None
+        # Uma segunda tentativa cobre a partição expirada ou criada por outro processo no meio do lote
+        for tentativa in range(2):
+            try:
+                if por_dia is None:
+                    # Transação própria: o contador não fica travado enquanto o lote é inserido
+                    with self.engine.begin() as conn:
+                        primeiro = reservar_ids(conn, len(lote))
+                    por_dia = {}
+                    for numero, registro in enumerate(lote):
+                        por_dia.setdefault(dia_do_log(registro["timestamp"]), []).append(
+                            {**registro, "id": primeiro + numero})
+                for dia in por_dia:
+                    if dia not in self._particoes:
+                        self._criar_particao(dia)
+                with self.engine.begin() as conn:
+                    for dia, registros in por_dia.items():
+                        conn.execute(text(f"""
+                            INSERT INTO {nome_particao(dia)} (id, timestamp, level, category, message, details, user_id)
+                            VALUES (:id, :timestamp, :level, :category, :message, :details, :user_id)
+                        """), registros)
+                    self._somar_contadores(conn, lote)
+                self.metricas["gravados"] += len(lote)
+                self.metricas["lotes"] += 1
+                return
+            except Exception as e:
+                # A partição pode ter sido expirada por outro processo: confere de novo
+                self._particoes.clear()
+                erro = e
+                if tentativa == 0:
+                    self.metricas["retentativas"] += 1
+        # Sem banco os registros ficam apenas no arquivo/console
+        self.metricas["falhas"] += 1
+        self.metricas["descartados"] += len(lote)
+        logger.error(f"Erro ao gravar lote de {len(lote)} logs no banco: {erro}")
+
+    def _criar_particao(self, dia):
+        """
+        Cria a partição do dia na sua própria transação. No PostgreSQL, dois
+        CREATE TABLE IF NOT EXISTS simultâneos podem falhar com chave duplicada:
+        se a tabela existe depois do erro, outro processo a criou
+        """
+        try:
+            with self.engine.begin() as conn:
+                criar_particao(conn, dia)
+        except Exception:
+            if dia not in {existente for existente, _ in listar_particoes(self.engine)}:
+                raise
+        self._particoes.add(dia)
+
+    @staticmethod
+    def _somar_contadores(conn, lote):
+        """Soma o lote aos contadores por minuto e totais (um upsert por chave distinta)"""
+        por_minuto = Counter((minuto_do_log(r["timestamp"]), r["level"], r["category"]) for r in lote)
+        conn.execute(text("""
+            INSERT INTO log_rollups (minuto, level, category, total)
+            VALUES (:minuto, :level, :category, :total)
+            ON CONFLICT (minuto, level, category) DO UPDATE SET total = log_rollups.total + excluded.total
+        """), [{"minuto": m, "level": l, "category": c, "total": t} for (m, l, c), t in por_minuto.items()])
+
+        totais = Counter((r["level"], r["category"]) for r in lote)
+        conn.execute(text("""
+            INSERT INTO log_totais (level, category, total)
+            VALUES (:level, :category, :total)
+            ON CONFLICT (level, category) DO UPDATE SET total = log_totais.total + excluded.total
+        """), [{"level": l, "category": c, "total": t} for (l, c), t in totais.items()])
+
+    def descarregar(self, timeout=5):
+        """
+        Grava imediatamente o que está na fila e aguarda
+
+        Returns:
+            bool: True se a fila foi esvaziada dentro do timeout
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return self._fila.unfinished_tasks == 0
+        self._descarregar.set()
+        try:
+            fim = time.monotonic() + timeout
+            with self._fila.all_tasks_done:
+                while self._fila.unfinished_tasks:
+                    restante = fim - time.monotonic()
+                    if restante <= 0:
+                        return False
+                    self._fila.all_tasks_done.wait(restante)
+            return True
+        finally:
+            self._descarregar.clear()
+
+    def encerrar(self, timeout=5):
+        """Grava o que restou na fila e para a thread (registrado no atexit)"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._parar.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def obter_metricas(self):
+        """Profundidade da fila e contadores de gravação/descartes"""
+        return {
+            **self.metricas,
+            "profundidade": self._fila.qsize(),
+            "capacidade": self.capacidade,
+            "politica": self.politica,
+        }
@@ -4,16 +4,18 @@ Sistema de logging estruturado para VersoZap
 Fornece logging centralizado com diferentes níveis e categorias
 """
 
-import os
 import json
+import base64
 import logging
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from database import SessionLocal
+from sqlalchemy import text
+from database import engine
+from log_sink import GravadorLogs, minuto_do_log
+from log_partitions import TABELA_ARQUIVO, dia_do_log, listar_particoes
+from log_handlers import configurar_saidas
 
 class LogLevel(Enum):
     DEBUG = "DEBUG"
@@ -33,27 +35,31 @@ class LogCategory(Enum):
     API = "API"
     DATABASE = "DATABASE"
 
+def codificar_cursor(timestamp, log_id) -> str:
+    """Cursor opaco de paginação a partir do (timestamp, id) do último log da página"""
+    valor = timestamp.isoformat() if hasattr(timestamp, "isoformat") else str(timestamp)
+    return base64.urlsafe_b64encode(f"{valor}|{log_id}".encode("utf-8")).decode("ascii")
+
+def decodificar_cursor(cursor: str):
+    """Retorna (timestamp, id) de um cursor; ValueError se for inválido"""
+    try:
+        valor, log_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return valor, int(log_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
 class VersoZapLogger:
     
-    def __init__(self):
+    def __init__(self, engine_db=None):
         self.setup_file_logging()
         self.db_logging_enabled = True
+        self.engine = engine_db or engine
+        # Os logs vão para o banco em lotes, por uma thread em segundo plano
+        self.gravador = GravadorLogs(engine_db=self.engine)
         
     def setup_file_logging(self):
-        """Configura logging para arquivo"""
-        # Cria diretório de logs se não existir
-        os.makedirs("logs", exist_ok=True)
-        
-        # Configuração do logger Python padrão
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/versozap.log', encoding='utf-8'),
-                logging.StreamHandler()  # Console
-            ]
-        )
-        
+        """Configura logging para arquivo e console (escritos por uma thread em segundo plano)"""
+        configurar_saidas()
         self.logger = logging.getLogger('VersoZap')
     
     def log(self, 
@@ -118,32 +124,16 @@ class VersoZapLogger:
         return mapping.get(level, logging.INFO)
     
     def _log_to_database(self, log_data: Dict[str, Any]):
-        """Salva log no banco de dados"""
-        try:
-            db = SessionLocal()
-            
-            # Converte details para JSON
-            details_json = json.dumps(log_data["details"], ensure_ascii=False) if log_data["details"] else None
-            
-            # Usa SQL direto para evitar dependência de models
-            db.execute(text("""
-                INSERT INTO system_logs (timestamp, level, category, message, details, user_id)
-                VALUES (:timestamp, :level, :category, :message, :details, :user_id)
-            """), {
-                "timestamp": log_data["timestamp"],
-                "level": log_data["level"],
-                "category": log_data["category"],
-                "message": log_data["message"],
-                "details": details_json,
-                "user_id": log_data["user_id"]
-            })
-            
-            db.commit()
-            db.close()
-            
-        except Exception as e:
-            # Se não conseguir logar no banco, pelo menos loga no arquivo
-            self.logger.error(f"Erro ao salvar log no banco: {e}")
+        """Enfileira o log para gravação em lote no banco (não bloqueia quem loga)"""
+        # O timestamp é o do evento, não o da gravação do lote
+        self.gravador.enfileirar({
+            "timestamp": log_data["timestamp"],
+            "level": log_data["level"],
+            "category": log_data["category"],
+            "message": log_data["message"],
+            "details": json.dumps(log_data["details"], ensure_ascii=False) if log_data["details"] else None,
+            "user_id": log_data["user_id"]
+        })
     
     # Métodos de conveniência para cada nível
     def debug(self, category: LogCategory, message: str, **kwargs):
@@ -246,76 +236,147 @@ class VersoZapLogger:
         self.error(LogCategory.SYSTEM, message, error=error, **kwargs)
     
     def get_recent_logs(self, limit: int = 100, level: Optional[str] = None, category: Optional[str] = None):
-        """Recupera logs recentes do banco de dados"""
+        """Recupera logs recentes do banco de dados (lista vazia em caso de erro)"""
         try:
-            db = SessionLocal()
+            logs, _ = self.consultar_logs(limite=limit, level=level, category=category)
+        except Exception:
+            return []
+        return logs
+    
+    def consultar_logs(self, limite: int = 100, level: Optional[str] = None, category: Optional[str] = None,
+                       user_id: Optional[int] = None, desde: Optional[str] = None, ate: Optional[str] = None,
+                       cursor: Optional[str] = None, crescente: bool = False):
+        """
+        Página de logs com paginação por cursor (timestamp, id): cada página
+        continua do último log da anterior pelo índice, sem OFFSET
+        
+        Args:
+            limite: Quantidade máxima de logs da página
+            level, category, user_id: Filtros exatos
+            desde, ate: Intervalo de tempo (ISO, inclusivo em desde e exclusivo em ate)
+            cursor: Valor de proximo_cursor da página anterior
+            crescente: Do mais antigo para o mais recente (padrão: mais recentes primeiro)
+            
+        Returns:
+            tuple: (logs, proximo_cursor ou None na última página)
             
-            query = "SELECT * FROM system_logs WHERE 1=1"
-            params = {}
+        Raises:
+            ValueError: Cursor inválido
+            Exception: Erros do banco são propagados (uma página vazia indicaria o fim dos logs)
+        """
+        try:
+            condicoes, params = [], {"limite": limite}
+            for coluna, valor in (("level", level), ("category", category), ("user_id", user_id)):
+                if valor is not None:
+                    condicoes.append(f"{coluna} = :{coluna}")
+                    params[coluna] = valor
+            if desde:
+                condicoes.append("timestamp >= :desde")
+                params["desde"] = desde
+            if ate:
+                condicoes.append("timestamp < :ate")
+                params["ate"] = ate
+            if cursor:
+                params["cursor_ts"], params["cursor_id"] = decodificar_cursor(cursor)
+                comparacao = ">" if crescente else "<"
+                condicoes.append(f"(timestamp, id) {comparacao} (:cursor_ts, :cursor_id)")
             
-            if level:
-                query += " AND level = :level"
-                params["level"] = level
-                
-            if category:
-                query += " AND category = :category"
-                params["category"] = category
+            direcao = "ASC" if crescente else "DESC"
+            where = " WHERE " + " AND ".join(condicoes) if condicoes else ""
             
-            query += " ORDER BY timestamp DESC LIMIT :limit"
-            params["limit"] = limit
+            def consultar(conn, tabela, quantidade):
+                return conn.execute(text(
+                    f"SELECT id, timestamp, level, category, message, details, user_id FROM {tabela}"
+                    f"{where} ORDER BY timestamp {direcao}, id {direcao} LIMIT :limite"
+                ), {**params, "limite": quantidade}).fetchall()
             
-            result = db.execute(text(query), params)
+            # Só as partições dos dias do intervalo (e do lado certo do cursor), na ordem da página
+            primeiro = dia_do_log(desde) if desde else None
+            ultimo = dia_do_log(ate) if ate else None
+            if cursor:
+                dia_cursor = dia_do_log(params["cursor_ts"])
+                if crescente:
+                    primeiro = max(primeiro, dia_cursor) if primeiro else dia_cursor
+                else:
+                    ultimo = min(ultimo, dia_cursor) if ultimo else dia_cursor
+            particoes = [tabela for dia, tabela in listar_particoes(self.engine)
+                         if (primeiro is None or dia >= primeiro) and (ultimo is None or dia <= ultimo)]
+            if not crescente:
+                particoes.reverse()
             
-            logs = []
-            for row in result.fetchall():
-                log_dict = {
-                    "id": row[0],
-                    "timestamp": row[1],
-                    "level": row[2],
-                    "category": row[3],
-                    "message": row[4],
-                    "details": json.loads(row[5]) if row[5] else None,
-                    "user_id": row[6]
-                }
-                logs.append(log_dict)
+            with self.engine.connect() as conn:
+                # Cada partição cobre um único dia: basta seguir até completar a página
+                rows = []
+                for tabela in particoes:
+                    rows.extend(consultar(conn, tabela, limite - len(rows)))
+                    if len(rows) >= limite:
+                        break
+                # O arquivo (logs anteriores às partições e ERRORs preservados) entra na ordenação
+                rows = sorted(rows + consultar(conn, TABELA_ARQUIVO, limite),
+                              key=lambda row: (row.timestamp, row.id), reverse=not crescente)[:limite]
             
-            db.close()
-            return logs
+            logs = [{
+                "id": row.id,
+                "timestamp": row.timestamp,
+                "level": row.level,
+                "category": row.category,
+                "message": row.message,
+                "details": json.loads(row.details) if row.details else None,
+                "user_id": row.user_id
+            } for row in rows]
             
+            proximo_cursor = None
+            if len(logs) == limite:
+                proximo_cursor = codificar_cursor(logs[-1]["timestamp"], logs[-1]["id"])
+            return logs, proximo_cursor
+            
+        except ValueError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro ao recuperar logs: {e}")
-            return []
+            raise
+    
+    def iterar_logs(self, tamanho_pagina: int = 1000, **filtros):
+        """
+        Percorre todos os logs dos filtros página a página (exportação em streaming):
+        apenas uma página fica em memória e nenhuma conexão fica presa entre páginas.
+        Um erro do banco no meio do caminho é propagado, nunca tratado como fim dos logs
+        """
+        cursor = None
+        while True:
+            logs, cursor = self.consultar_logs(limite=tamanho_pagina, cursor=cursor, **filtros)
+            yield from logs
+            if cursor is None:
+                return
     
     def get_stats(self):
-        """Retorna estatísticas dos logs"""
+        """
+        Retorna estatísticas dos logs a partir dos contadores mantidos pelo
+        gravador: uma única consulta agrupada, independente do tamanho de system_logs
+        """
         try:
-            db = SessionLocal()
-            
-            # Count por nível
-            level_stats = {}
-            for level in LogLevel:
-                result = db.execute(text("""
-                    SELECT COUNT(*) FROM system_logs 
-                    WHERE level = :level 
-                    AND timestamp >= datetime('now', '-24 hours')
-                """), {"level": level.value})
-                level_stats[level.value] = result.scalar()
-            
-            # Count por categoria
-            category_stats = {}
-            for category in LogCategory:
-                result = db.execute(text("""
-                    SELECT COUNT(*) FROM system_logs 
-                    WHERE category = :category 
-                    AND timestamp >= datetime('now', '-24 hours')
-                """), {"category": category.value})
-                category_stats[category.value] = result.scalar()
+            # Buckets por minuto no mesmo formato ISO dos timestamps gravados
+            desde = minuto_do_log(datetime.now() - timedelta(hours=24))
             
-            # Total de logs
-            result = db.execute(text("SELECT COUNT(*) FROM system_logs"))
-            total_logs = result.scalar()
+            with self.engine.connect() as conn:
+                result = conn.execute(text("""
+                    SELECT 'janela' AS origem, level, category, SUM(total) AS total
+                    FROM log_rollups WHERE minuto >= :desde
+                    GROUP BY level, category
+                    UNION ALL
+                    SELECT 'total' AS origem, level, category, total FROM log_totais
+                """), {"desde": desde})
+                linhas = result.fetchall()
             
-            db.close()
+            level_stats = {level.value: 0 for level in LogLevel}
+            category_stats = {category.value: 0 for category in LogCategory}
+            total_logs = 0
+            for origem, level, category, total in linhas:
+                if origem == "total":
+                    total_logs += total
+                    continue
+                level_stats[level] = level_stats.get(level, 0) + total
+                category_stats[category] = category_stats.get(category, 0) + total
             
             return {
                 "total_logs": total_logs,
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de mensagens (outbox) para envio via WhatsApp
+Produtores enfileiram em lote na tabela message_queue; workers reivindicam
+lotes de forma atômica, enviam e registram o resultado com backoff exponencial
+"""
+
+import os
+import uuid
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import text, bindparam
+from database import engine
+from logging_system import versozap_logger, LogCategory, log_info
+from whatsapp_sender import disparador_whatsapp
+
+class FilaMensagens:
+
+    def __init__(self, engine_db=None, disparador=None):
+        self.engine = engine_db or engine
+        self.disparador = disparador or disparador_whatsapp
+        self.tamanho_lote = int(os.getenv("QUEUE_BATCH_SIZE", "50"))
+        self.backoff_base = int(os.getenv("QUEUE_BACKOFF_BASE", "30"))  # segundos
+        self.backoff_max = int(os.getenv("QUEUE_BACKOFF_MAX", "3600"))
+        self.timeout_reivindicacao = int(os.getenv("QUEUE_CLAIM_TIMEOUT", "300"))
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    def enfileirar(self, mensagens, conexao=None):
+        """
+        Enfileira mensagens em lote (um único INSERT com executemany)
+
+        Args:
+            mensagens (list): dicts com usuario_id, telefone, mensagem,
+                audio_path e, opcionalmente, agendado_para
+            conexao: Conexão de uma transação em andamento (ex.: db.connection()
+                de uma sessão). As mensagens são gravadas no mesmo commit que as
+                demais escritas dela, como as leituras registradas (outbox)
+
+        Returns:
+            int: Quantidade de mensagens enfileiradas
+        """
+        if not mensagens:
+            return 0
+
+        agora = datetime.now()
+        parametros = [
+            {
+                "usuario_id": m["usuario_id"],
+                "telefone": m["telefone"],
+                "mensagem": m["mensagem"],
+                "audio_path": m.get("audio_path"),
+                "agendado_para": m.get("agendado_para") or agora,
+            }
+            for m in mensagens
+        ]
+
+        inserir = text("""
+            INSERT INTO message_queue (usuario_id, telefone, mensagem, audio_path, status, agendado_para)
+            VALUES (:usuario_id, :telefone, :mensagem, :audio_path, 'pending', :agendado_para)
+        """)
+        if conexao is not None:
+            conexao.execute(inserir, parametros)
+        else:
+            with self.engine.begin() as conn:
+                conn.execute(inserir, parametros)
+
+        return len(parametros)
+
+    def reivindicar_lote(self, limite=None):
+        """
+        Reivindica atomicamente um lote de mensagens prontas para envio.
+        Mensagens presas em 'processing' por um worker que morreu voltam
+        para a fila após QUEUE_CLAIM_TIMEOUT segundos, contando como uma
+        tentativa: uma mensagem que derruba o worker vira 'failed' ao
+        atingir max_tentativas em vez de ser reivindicada para sempre.
+
+        Returns:
+            list: Mensagens reivindicadas por este worker
+        """
+        agora = datetime.now()
+        token = f"{self.worker_id}-{uuid.uuid4().hex[:12]}"
+
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE message_queue
+                SET status = CASE WHEN COALESCE(tentativas, 0) + 1 >= COALESCE(max_tentativas, 3)
+                                  THEN 'failed' ELSE 'pending' END,
+                    tentativas = COALESCE(tentativas, 0) + 1,
+                    erro = :erro, reivindicado_por = NULL
+                WHERE status = 'processing' AND reivindicado_em < :expirado
+            """), {"expirado": agora - timedelta(seconds=self.timeout_reivindicacao),
+                   "erro": "Reivindicação expirada: o worker não concluiu o envio"})
+
+            # No PostgreSQL, workers concorrentes pulam as linhas já travadas por outro lote
+            travar = " FOR UPDATE SKIP LOCKED" if conn.dialect.name == "postgresql" else ""
+            conn.execute(text(f"""
+                UPDATE message_queue
+                SET status = 'processing', reivindicado_por = :token, reivindicado_em = :agora
+                WHERE status = 'pending' AND id IN (
+                    SELECT id FROM message_queue
+                    WHERE status = 'pending'
+                    AND (agendado_para IS NULL OR agendado_para <= :agora)
+                    ORDER BY agendado_para, id
+                    LIMIT :limite{travar}
+                )
+            """), {"token": token, "agora": agora, "limite": limite or self.tamanho_lote})
+
+            result = conn.execute(text("""
+                SELECT id, usuario_id, telefone, mensagem, audio_path, tentativas, max_tentativas
+                FROM message_queue
+                WHERE reivindicado_por = :token
+                ORDER BY id
+            """), {"token": token})
+
+            return [dict(row) for row in result.mappings()]
+
+    def marcar_enviadas(self, ids):
+        """Marca mensagens como enviadas"""
+        if not ids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE message_queue
+                SET status = 'sent', enviado_em = :agora, erro = NULL,
+                    tentativas = tentativas + 1, reivindicado_por = NULL
+                WHERE id IN :ids
+            """).bindparams(bindparam("ids", expanding=True)),
+                {"agora": datetime.now(), "ids": list(ids)})
+
+    def marcar_falhas(self, falhas):
+        """
+        Registra falhas de envio. A mensagem volta para a fila com backoff
+        exponencial persistido em agendado_para, ou vira 'failed' ao atingir
+        max_tentativas.
+
+        Args:
+            falhas (list): tuplas (mensagem, erro)
+        """
+        if not falhas:
+            return
+
+        agora = datetime.now()
+        parametros = []
+        for mensagem, erro in falhas:
+            tentativas = (mensagem["tentativas"] or 0) + 1
+            esgotou = tentativas >= (mensagem["max_tentativas"] or 3)
+            atraso = min(self.backoff_base * (2 ** (tentativas - 1)), self.backoff_max)
+            parametros.append({
+                "id": mensagem["id"],
+                "tentativas": tentativas,
+                "status": "failed" if esgotou else "pending",
+                "agendado_para": agora + timedelta(seconds=atraso),
+                "erro": str(erro)[:1000],
+            })
+
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE message_queue
+                SET status = :status, tentativas = :tentativas, agendado_para = :agendado_para,
+                    erro = :erro, reivindicado_por = NULL
+                WHERE id = :id
+            """), parametros)
+
+    def processar_lote(self):
+        """
+        Reivindica um lote de mensagens e as envia em paralelo
+
+        Returns:
+            dict: Contagem de mensagens enviadas e com falha
+        """
+        mensagens = self.reivindicar_lote()
+        if not mensagens:
+            return {"reivindicadas": 0, "enviadas": 0, "falhas": 0}
+
+        enviadas, falhas = self.disparador.enviar_lote(mensagens)
+        for mensagem, erro in falhas:
+            versozap_logger.log_message_failed(mensagem["telefone"], mensagem["usuario_id"], erro)
+
+        self.marcar_enviadas([m["id"] for m in enviadas])
+        self.marcar_falhas(falhas)
+
+        return {"reivindicadas": len(mensagens), "enviadas": len(enviadas), "falhas": len(falhas)}
+
+    def processar_pendentes(self, max_lotes=100):
+        """Processa lotes até esvaziar as mensagens prontas (ou atingir max_lotes)"""
+        total = {"reivindicadas": 0, "enviadas": 0, "falhas": 0}
+        with self.disparador.tick():
+            for _ in range(max_lotes):
+                resultado = self.processar_lote()
+                for chave, valor in resultado.items():
+                    total[chave] += valor
+                if resultado["reivindicadas"] == 0:
+                    break
+
+        if total["reivindicadas"]:
+            log_info(LogCategory.MESSAGE, "Fila de mensagens processada", details=total)
+        return total
+
+    def obter_estatisticas(self):
+        """Retorna a quantidade de mensagens por status"""
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT status, COUNT(*) FROM message_queue GROUP BY status
+            """))
+            return {status: count for status, count in result.fetchall()}
+
+# Instância global da fila
+fila_mensagens = FilaMensagens()
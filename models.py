@@ -1,7 +1,28 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import func
+from sqlalchemy.orm import relationship, validates
 from database import Base
+from reading_plan import DIAS_PLANO
 import datetime
+import json
+import random
+
+
+def horario_para_minuto(horario):
+    """
+    Converte um horário "HH:MM" em minutos desde a meia-noite (0-1439).
+    Retorna None se o horário for vazio ou inválido.
+    """
+    if not horario or len(horario) != 5 or horario[2] != ":":
+        return None
+    try:
+        horas, minutos = int(horario[:2]), int(horario[3:])
+    except ValueError:
+        return None
+    if not (0 <= horas < 24 and 0 <= minutos < 60):
+        return None
+    return horas * 60 + minutos
+
 
 class Usuario(Base):
     __tablename__ = "usuarios"
@@ -15,10 +36,33 @@ class Usuario(Base):
     plano_leitura = Column(String, default="cronologico")
     tipo_ordem = Column(String, default="normal")  # normal ou cronológica
     horario_envio = Column(String, default="08:00")
+    # Slot de envio indexado (minutos desde 00:00), mantido em sincronia com horario_envio
+    minuto_envio = Column(Integer, default=480)
+    # Posição fixa do usuário (0-999) dentro da janela de espalhamento de slots lotados
+    deslocamento_envio = Column(Integer, default=lambda: random.randrange(1000))
     data_cadastro = Column(DateTime, default=datetime.datetime.utcnow)
+    # Progresso no plano: próximo dia (1-365) a enviar, avança ao confirmar a leitura
+    # ou depois de BIBLE_PLAN_MAX_UNCONFIRMED envios do mesmo dia sem confirmação
+    proximo_dia_plano = Column(Integer, default=1)
+    plano_iniciado_em = Column(DateTime, default=datetime.datetime.utcnow)
+    envios_sem_confirmacao = Column(Integer, default=0)
 
     leituras = relationship("Leitura", back_populates="usuario")
 
+    @validates("horario_envio")
+    def _sincronizar_minuto_envio(self, key, horario):
+        self.minuto_envio = horario_para_minuto(horario)
+        return horario
+
+    @validates("plano_leitura")
+    def _reiniciar_progresso(self, key, plano):
+        # Trocar de plano recomeça do primeiro dia
+        if plano != self.plano_leitura:
+            self.proximo_dia_plano = 1
+            self.envios_sem_confirmacao = 0
+            self.plano_iniciado_em = datetime.datetime.utcnow()
+        return plano
+
 class Leitura(Base):
     __tablename__ = "leituras"
 
@@ -27,5 +71,60 @@ class Leitura(Base):
     data = Column(DateTime, default=datetime.datetime.utcnow)
     trecho = Column(String)
     concluido = Column(Boolean, default=False)
+    # Referência estruturada: (dia, plano, versão) localiza o progresso no plano e os
+    # intervalos de ids de versículos de cada trecho (JSON) reconstroem a passagem enviada
+    dia_plano = Column(Integer)
+    plano = Column(String)
+    versao = Column(String)
+    intervalos = Column(String)
 
     usuario = relationship("Usuario", back_populates="leituras")
+
+    @classmethod
+    def registrar(cls, usuario_id, leitura_info):
+        """Nova leitura pendente a partir da leitura do dia (bible_service)"""
+        return cls(
+            usuario_id=usuario_id,
+            trecho=leitura_info["referencia"],
+            concluido=False,
+            dia_plano=leitura_info.get("dia"),
+            plano=leitura_info.get("plano"),
+            versao=leitura_info.get("versao"),
+            intervalos=json.dumps(leitura_info["intervalos"]) if leitura_info.get("intervalos") else None,
+        )
+
+    @classmethod
+    def confirmar(cls, db, id_leitura):
+        """
+        Marca a leitura como concluída e leva o progresso do usuário ao dia
+        seguinte ao da leitura. O ponteiro só anda se ainda estiver no dia da
+        leitura: confirmações repetidas e leituras reenviadas do mesmo dia (ou
+        de um plano anterior) não pulam dias.
+
+        Returns:
+            int | None: usuario_id da leitura ou None se ela não existir
+        """
+        leitura = db.query(cls.id, cls.usuario_id, cls.dia_plano, cls.plano).filter_by(id=id_leitura).first()
+        if not leitura:
+            return None
+
+        marcadas = db.query(cls).filter(
+            cls.id == leitura.id,
+            cls.concluido.is_(False),
+        ).update({cls.concluido: True}, synchronize_session=False)
+        if not marcadas:
+            return leitura.usuario_id
+
+        if leitura.dia_plano:
+            condicoes = [func.coalesce(Usuario.proximo_dia_plano, 1) == leitura.dia_plano]
+            if leitura.plano:
+                condicoes.append(func.coalesce(Usuario.plano_leitura, "cronologico") == leitura.plano)
+            novo_dia = leitura.dia_plano % DIAS_PLANO + 1
+        else:
+            # Leituras anteriores às referências estruturadas não sabem o próprio dia
+            condicoes = []
+            novo_dia = func.coalesce(Usuario.proximo_dia_plano, 1) % DIAS_PLANO + 1
+        db.query(Usuario).filter(Usuario.id == leitura.usuario_id, *condicoes).update(
+            {Usuario.proximo_dia_plano: novo_dia, Usuario.envios_sem_confirmacao: 0}, synchronize_session=False
+        )
+        return leitura.usuario_id
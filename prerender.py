@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Pré-renderização das leituras e áudios dos próximos dias para VersoZap
+As leituras dependem apenas de (dia do plano, plano, versão), então as que os
+usuários vão receber são preparadas com antecedência num pool de processos;
+os ticks de envio apenas leem os artefatos prontos e falhas aparecem horas
+antes do envio. Cada artefato guarda a versão do conteúdo (geração do armazém
+de versículos e peso do plano): depois de uma importação ele deixa de valer.
+Os processos do pool são iniciados com spawn: o scheduler e o web já têm
+threads vivas (APScheduler, logs, envio) e um fork copiaria locks em uso.
+
+Uso:
+    python prerender.py --dias 2 --processos 4
+"""
+
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+from database import engine
+from bible_service import biblia_service
+from audio_cache import audio_cache, gerar_audio_versiculo
+from verse_store import armazem_versiculos
+from logging_system import LogCategory, log_error, log_success, log_warning
+
+def dia_do_plano(data):
+    """Dia do plano (1-365) correspondente a uma data"""
+    return ((data.timetuple().tm_yday - 1) % 365) + 1
+
+def versao_do_conteudo():
+    """Versículos importados e configuração do plano de que as leituras dependem"""
+    return ":".join(map(str, (
+        armazem_versiculos.obter_geracao(),
+        os.getenv("BIBLE_PLAN_WEIGHT", "versiculos"),
+        os.getenv("BIBLE_PLAN_WORDS_VERSION", "ARC"),
+    )))
+
+def renderizar_leitura(dia, plano, versao):
+    """
+    Renderiza a leitura e o áudio de um (dia, plano, versão).
+    Executado nos processos do pool: não acessa o banco de dados.
+    """
+    try:
+        leitura_info = biblia_service.obter_leitura_do_dia(
+            dia_do_ano=dia,
+            plano_leitura=plano,
+            versao_biblia=versao
+        )
+        caminho_audio = gerar_audio_versiculo(leitura_info["texto"])
+        return {"dia": dia, "plano": plano, "versao": versao, "status": "ok",
+                "leitura": leitura_info, "audio_path": caminho_audio, "erro": None}
+    except Exception as e:
+        return {"dia": dia, "plano": plano, "versao": versao, "status": "erro",
+                "leitura": None, "audio_path": None, "erro": f"{type(e).__name__}: {e}"}
+
+def _renderizar(combinacao):
+    return renderizar_leitura(*combinacao)
+
+def _iniciar_processo(diretorio_audio, sintetizador, caminho_biblia):
+    """Processos do pool (spawn) recebem a configuração do cache e do armazém do processo principal"""
+    audio_cache.diretorio = diretorio_audio
+    audio_cache.sintetizador = sintetizador
+    armazem_versiculos.caminho = caminho_biblia
+
+class PreRenderizador:
+
+    def __init__(self, engine_db=None):
+        self.engine = engine_db or engine
+
+    def combinacoes(self, dias=0):
+        """
+        (dia, plano, versão) que os usuários vão receber: o próximo dia de cada
+        usuário no seu plano e os 'dias' seguintes
+        """
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT DISTINCT COALESCE(proximo_dia_plano, 1) AS dia,
+                       COALESCE(plano_leitura, 'cronologico') AS plano,
+                       COALESCE(versao_biblia, 'ARC') AS versao
+                FROM usuarios WHERE telefone IS NOT NULL
+            """))
+            atuais = [(row.dia, row.plano, row.versao) for row in result]
+
+        combinacoes = {
+            ((dia - 1 + i) % 365 + 1, plano, versao)
+            for dia, plano, versao in atuais
+            for i in range(dias + 1)
+        }
+        return sorted(combinacoes)
+
+    def _ja_preparadas(self, combinacoes, conteudo):
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT dia, plano, versao, audio_path FROM leituras_preparadas
+                WHERE status = 'ok' AND versao_conteudo = :conteudo
+            """), {"conteudo": conteudo})
+            prontas = {
+                (row.dia, row.plano, row.versao)
+                for row in result
+                if row.audio_path and os.path.exists(row.audio_path)
+            }
+        return [c for c in combinacoes if c in prontas]
+
+    def prerenderizar(self, dias=None, processos=None, forcar=False):
+        """
+        Prepara leituras e áudios do próximo dia de cada usuário e dos 'dias' seguintes
+
+        Args:
+            dias (int): Quantidade de dias à frente (PRERENDER_DIAS, padrão 2)
+            processos (int): Tamanho do pool (PRERENDER_PROCESSOS, padrão nº de CPUs)
+            forcar (bool): Renderiza novamente mesmo o que já está pronto
+
+        Returns:
+            dict: Resumo com quantidades, falhas e duração
+        """
+        dias = dias if dias is not None else int(os.getenv("PRERENDER_DIAS", "2"))
+        processos = processos or int(os.getenv("PRERENDER_PROCESSOS", "0")) or os.cpu_count()
+
+        combinacoes = self.combinacoes(dias)
+        # Lida antes de renderizar: uma importação durante a execução invalida o que for gravado
+        conteudo = versao_do_conteudo()
+        if not forcar:
+            prontas = set(self._ja_preparadas(combinacoes, conteudo))
+            combinacoes = [c for c in combinacoes if c not in prontas]
+
+        comeco = time.perf_counter()
+        if combinacoes:
+            with ProcessPoolExecutor(
+                max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_processo,
+                initargs=(audio_cache.diretorio, audio_cache.sintetizador, armazem_versiculos.caminho),
+            ) as pool:
+                resultados = list(pool.map(_renderizar, combinacoes))
+            self._salvar(resultados, conteudo)
+        else:
+            resultados = []
+
+        falhas = [r for r in resultados if r["status"] != "ok"]
+        for falha in falhas:
+            log_error(LogCategory.BIBLE, "Falha ao pré-renderizar leitura", details={
+                "dia": falha["dia"], "plano": falha["plano"],
+                "versao": falha["versao"], "erro": falha["erro"],
+            })
+
+        resumo = {
+            "renderizadas": len(resultados) - len(falhas),
+            "falhas": len(falhas),
+            "duracao_s": round(time.perf_counter() - comeco, 2),
+            "processos": processos,
+        }
+        if falhas:
+            log_warning(LogCategory.BIBLE, "Pré-renderização concluída com falhas", details=resumo)
+        else:
+            log_success(LogCategory.BIBLE, "Pré-renderização concluída", details=resumo)
+        return resumo
+
+    def _salvar(self, resultados, conteudo):
+        agora = datetime.now()
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO leituras_preparadas
+                    (dia, plano, versao, leitura_json, audio_path, status, erro, gerado_em, versao_conteudo)
+                VALUES (:dia, :plano, :versao, :leitura_json, :audio_path, :status, :erro, :gerado_em, :conteudo)
+                ON CONFLICT (dia, plano, versao) DO UPDATE SET
+                    leitura_json = excluded.leitura_json,
+                    audio_path = excluded.audio_path,
+                    status = excluded.status,
+                    erro = excluded.erro,
+                    gerado_em = excluded.gerado_em,
+                    versao_conteudo = excluded.versao_conteudo
+            """), [
+                {
+                    "dia": r["dia"],
+                    "plano": r["plano"],
+                    "versao": r["versao"],
+                    "leitura_json": json.dumps(r["leitura"], ensure_ascii=False) if r["leitura"] else None,
+                    "audio_path": r["audio_path"],
+                    "status": r["status"],
+                    "erro": r["erro"],
+                    "gerado_em": agora,
+                    "conteudo": conteudo,
+                }
+                for r in resultados
+            ])
+
+    def obter_preparada(self, dia, plano, versao):
+        """Retorna (leitura_info, caminho_audio) pré-renderados para o conteúdo atual ou None"""
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT leitura_json, audio_path FROM leituras_preparadas
+                WHERE dia = :dia AND plano = :plano AND versao = :versao AND status = 'ok'
+                AND versao_conteudo = :conteudo
+            """), {"dia": dia, "plano": plano, "versao": versao, "conteudo": versao_do_conteudo()}).first()
+
+        if row and row.audio_path and os.path.exists(row.audio_path):
+            return json.loads(row.leitura_json), row.audio_path
+        return None
+
+    def leitura_com_audio(self, plano, versao, dia=None):
+        """
+        Leitura e áudio do dia: usa o artefato pré-renderado e, se não houver,
+        renderiza na hora (registrando o fallback)
+        """
+        dia = dia or dia_do_plano(date.today())
+        preparada = self.obter_preparada(dia, plano, versao)
+        if preparada:
+            return preparada
+
+        log_warning(LogCategory.BIBLE, "Leitura não pré-renderizada; renderizando no envio",
+                    details={"dia": dia, "plano": plano, "versao": versao})
+        leitura_info = biblia_service.obter_leitura_do_dia(
+            dia_do_ano=dia,
+            plano_leitura=plano,
+            versao_biblia=versao
+        )
+        return leitura_info, gerar_audio_versiculo(leitura_info["texto"])
+
+# Instância global
+pre_renderizador = PreRenderizador()
+
+if __name__ == "__main__":
+    from database_manager import initialize_database
+
+    parser = argparse.ArgumentParser(description="Pré-renderiza leituras e áudios dos próximos dias")
+    parser.add_argument("--dias", type=int, default=None, help="Dias do plano à frente (padrão: PRERENDER_DIAS ou 2)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos no pool")
+    parser.add_argument("--forcar", action="store_true", help="Renderiza novamente o que já está pronto")
+    args = parser.parse_args()
+
+    if not initialize_database():
+        exit(1)
+
+    resumo = pre_renderizador.prerenderizar(dias=args.dias, processos=args.processos, forcar=args.forcar)
+    print("\n📦 Pré-renderização:")
+    for chave, valor in resumo.items():
+        print(f"  {chave}: {valor}")
+    exit(1 if resumo["falhas"] else 0)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Cache em memória das respostas de leitura diária para VersoZap
+Só existem 365 x planos x versões respostas distintas: cada uma é montada e
+serializada em JSON uma única vez por processo e servida como bytes prontos.
+O cache é descartado quando uma versão é importada (geração do armazém) ou
+quando a configuração dos planos muda.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from bible_data import VERSOES_BIBLIA, PLANOS_LEITURA
+from bible_service import biblia_service
+from http_cache import calcular_etag
+from verse_store import armazem_versiculos
+
+class CacheLeituras:
+
+    def __init__(self, servico=None, armazem=None, intervalo_verificacao=None):
+        self.servico = servico or biblia_service
+        self.armazem = armazem or armazem_versiculos
+        # A importação roda em outro processo: a geração é consultada periodicamente
+        self.intervalo_verificacao = intervalo_verificacao if intervalo_verificacao is not None else \
+            float(os.getenv("READING_CACHE_CHECK_SECONDS", "5"))
+        self._respostas = {}
+        self._lock = threading.Lock()
+        self._versao_conteudo = None
+        self._proxima_verificacao = 0
+        self.estatisticas = {"hits": 0, "misses": 0, "invalidacoes": 0}
+
+    @staticmethod
+    def configuracao_valida(plano, versao):
+        return plano in PLANOS_LEITURA and versao in VERSOES_BIBLIA
+
+    def _verificar_conteudo(self):
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        self._proxima_verificacao = agora + self.intervalo_verificacao
+
+        versao_conteudo = (self.armazem.obter_geracao(), os.getenv("BIBLE_PLAN_WEIGHT", "versiculos"))
+        if versao_conteudo != self._versao_conteudo:
+            with self._lock:
+                if self._versao_conteudo is not None:
+                    self.estatisticas["invalidacoes"] += 1
+                self._respostas = {}
+                self._versao_conteudo = versao_conteudo
+
+    def obter(self, dia, plano, versao):
+        """
+        Corpo JSON ({"leitura": ...}) já serializado de um (dia, plano, versão)
+
+        Returns:
+            bytes ou None se o plano ou a versão forem inválidos
+        """
+        entrada = self.obter_entrada(dia, plano, versao)
+        return entrada[0] if entrada else None
+
+    def obter_entrada(self, dia, plano, versao):
+        """
+        Como obter(), mas inclui os validadores HTTP pré-calculados
+
+        Returns:
+            tuple: (corpo, etag, gerado_em) ou None se a configuração for inválida
+        """
+        if not self.configuracao_valida(plano, versao):
+            return None
+
+        self._verificar_conteudo()
+        chave = (dia, plano, versao)
+        entrada = self._respostas.get(chave)
+        if entrada is not None:
+            self.estatisticas["hits"] += 1
+            return entrada
+
+        leitura = self.servico.obter_leitura_do_dia(
+            dia_do_ano=dia,
+            plano_leitura=plano,
+            versao_biblia=versao
+        )
+        corpo = json.dumps({"leitura": leitura}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entrada = (corpo, calcular_etag(corpo), datetime.now(timezone.utc).replace(microsecond=0))
+        with self._lock:
+            self.estatisticas["misses"] += 1
+            self._respostas[chave] = entrada
+        return entrada
+
+    def limpar(self):
+        with self._lock:
+            self._respostas = {}
+
+    def obter_estatisticas(self):
+        """Contadores de hit/miss e tamanho do cache"""
+        respostas = [corpo for corpo, _, _ in self._respostas.values()]
+        total = self.estatisticas["hits"] + self.estatisticas["misses"]
+        return {
+            **self.estatisticas,
+            "taxa_hit": round(self.estatisticas["hits"] / total, 4) if total else None,
+            "entradas": len(respostas),
+            "bytes": sum(len(corpo) for corpo in respostas),
+        }
+
+# Instância global do cache
+cache_leituras = CacheLeituras()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador dos planos de leitura anuais para VersoZap
+Cada plano é uma ordem de capítulos dividida em 365 dias de peso equilibrado
+(versículos ou palavras). O plano é compilado uma única vez num vetor denso
+indexado pelo dia, então a leitura de um dia é um acesso direto.
+"""
+
+import os
+from functools import lru_cache
+from bible_data import LIVROS_BIBLIA, NUMERO_LIVRO, ORDEM_CRONOLOGICA, PLANOS_LEITURA
+from verse_store import armazem_versiculos, codificar_versiculo
+
+DIAS_PLANO = 365
+
+def ordem_dos_livros(plano):
+    """Números dos livros (1-66) na ordem de leitura do plano"""
+    canonica = list(range(1, len(LIVROS_BIBLIA) + 1))
+    if plano == "canonico":
+        return canonica
+    if plano == "livros":
+        # Novo Testamento, depois Salmos e Provérbios e o restante do Antigo Testamento
+        salmos, proverbios = NUMERO_LIVRO["Salmos"], NUMERO_LIVRO["Provérbios"]
+        inicio_nt = NUMERO_LIVRO["Mateus"]
+        return (
+            canonica[inicio_nt - 1:] + [salmos, proverbios] +
+            [n for n in canonica[:inicio_nt - 1] if n not in (salmos, proverbios)]
+        )
+    return [NUMERO_LIVRO[nome] for nome in ORDEM_CRONOLOGICA]
+
+def dividir_em_dias(pesos, dias=DIAS_PLANO):
+    """
+    Divide uma sequência de pesos em 'dias' grupos contíguos e não vazios.
+    Cada dia mira o peso restante dividido pelos dias restantes, então um
+    capítulo longo não deixa o dia seguinte quase vazio.
+
+    Returns:
+        list: Índice inicial de cada dia (mais o total de itens no final)
+    """
+    acumulado = [0]
+    for peso in pesos:
+        acumulado.append(acumulado[-1] + peso)
+    total = acumulado[-1]
+
+    cortes = [0]
+    for dia in range(dias - 1):
+        inicio = cortes[-1]
+        alvo = acumulado[inicio] + (total - acumulado[inicio]) / (dias - dia)
+        j = inicio
+        while j < len(pesos) - 1 and acumulado[j + 1] < alvo:
+            j += 1
+        # Corta antes ou depois do item que cruza o alvo, o que ficar mais perto
+        corte = j + 1 if acumulado[j + 1] - alvo <= alvo - acumulado[j] else j
+        # Cada dia precisa de ao menos um item, inclusive os que faltam
+        corte = min(max(corte, inicio + 1), len(pesos) - (dias - dia - 1))
+        cortes.append(corte)
+    cortes.append(len(pesos))
+    return cortes
+
+def _segmentos(capitulos):
+    """Agrupa capítulos consecutivos do mesmo livro em trechos"""
+    segmentos = []
+    for livro, capitulo in capitulos:
+        atual = segmentos[-1] if segmentos else None
+        if atual and atual["livro_numero"] == livro and atual["capitulo_fim"] == capitulo - 1:
+            atual["capitulo_fim"] = capitulo
+        else:
+            atual = {"livro_numero": livro, "livro": LIVROS_BIBLIA[livro - 1]["nome"],
+                     "capitulo": capitulo, "capitulo_fim": capitulo, "versiculo_inicio": 1}
+            segmentos.append(atual)
+        atual["versiculo_fim"] = LIVROS_BIBLIA[livro - 1]["versiculos"][capitulo - 1]
+
+    for segmento in segmentos:
+        segmento["vid_inicio"] = codificar_versiculo(segmento["livro_numero"], segmento["capitulo"], 1)
+        segmento["vid_fim"] = codificar_versiculo(
+            segmento["livro_numero"], segmento["capitulo_fim"], segmento["versiculo_fim"]
+        )
+    return segmentos
+
+def formatar_segmento(segmento):
+    """Referência de um trecho (ex: "Gênesis 1:1-31", "Gênesis 1-3")"""
+    if segmento["capitulo"] == segmento["capitulo_fim"]:
+        return f"{segmento['livro']} {segmento['capitulo']}:{segmento['versiculo_inicio']}-{segmento['versiculo_fim']}"
+    return f"{segmento['livro']} {segmento['capitulo']}-{segmento['capitulo_fim']}"
+
+@lru_cache(maxsize=None)
+def compilar_plano(plano, peso="versiculos", versao_palavras="ARC", geracao=0):
+    """
+    Gera e compila um plano de 365 dias
+
+    Args:
+        plano (str): "cronologico", "livros" ou "canonico"
+        peso (str): "versiculos" ou "palavras" (contadas em 'versao_palavras')
+        geracao (int): Geração do armazém de versículos (invalida o cache ao importar)
+
+    Returns:
+        tuple: Leitura de cada dia, indexada por dia - 1
+    """
+    capitulos = [
+        (livro, capitulo)
+        for livro in ordem_dos_livros(plano)
+        for capitulo in range(1, len(LIVROS_BIBLIA[livro - 1]["versiculos"]) + 1)
+    ]
+
+    pesos = [LIVROS_BIBLIA[livro - 1]["versiculos"][capitulo - 1] for livro, capitulo in capitulos]
+    if peso == "palavras":
+        palavras = armazem_versiculos.palavras_por_capitulo(versao_palavras)
+        # Sem o texto completo da versão não há como contar palavras
+        if all(c in palavras for c in capitulos):
+            pesos = [palavras[c] for c in capitulos]
+
+    cortes = dividir_em_dias(pesos)
+    dias = []
+    for dia in range(DIAS_PLANO):
+        segmentos = _segmentos(capitulos[cortes[dia]:cortes[dia + 1]])
+        dias.append({
+            "dia": dia + 1,
+            "segmentos": segmentos,
+            "referencia": "; ".join(formatar_segmento(s) for s in segmentos),
+            "peso": sum(pesos[cortes[dia]:cortes[dia + 1]]),
+        })
+    return tuple(dias)
+
+def obter_plano(plano="cronologico", peso=None):
+    """Plano compilado (em cache); planos desconhecidos usam o cronológico"""
+    if plano not in PLANOS_LEITURA:
+        plano = "cronologico"
+    peso = peso or os.getenv("BIBLE_PLAN_WEIGHT", "versiculos")
+    if peso == "palavras":
+        return compilar_plano(plano, peso, os.getenv("BIBLE_PLAN_WORDS_VERSION", "ARC"),
+                              armazem_versiculos.obter_geracao())
+    return compilar_plano(plano)
+
+def leitura_do_plano(dia, plano="cronologico", peso=None):
+    """Leitura de um dia (1-365) do plano"""
+    return obter_plano(plano, peso)[(dia - 1) % DIAS_PLANO]
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+"""
+Jobs agendados do VersoZap e controle de liderança entre processos
+Cada tick do envio diário é executado por um único processo, dono de um
+lease na tabela scheduler_leases; se o dono morrer, outro assume após o TTL.
+
+Uso standalone (sem servidor web):
+    python scheduler.py
+"""
+
+import os
+import json
+import math
+import uuid
+import socket
+import threading
+from datetime import date, datetime, timedelta
+from sqlalchemy import text, bindparam, and_, or_
+from database import engine, sessao_escopo
+from models import Usuario, Leitura
+from reading_plan import DIAS_PLANO
+from message_queue import fila_mensagens
+from prerender import pre_renderizador
+from logging_system import LogCategory, log_info, log_error, log_warning
+
+FORMATO_TICK = "%Y-%m-%d %H:%M"
+MINUTOS_DIA = 1440
+ESCALA_DESLOCAMENTO = 1000  # deslocamento_envio varia de 0 a 999
+
+class SchedulerLease:
+
+    def __init__(self, nome, engine_db=None, ttl_segundos=None):
+        self.nome = nome
+        self.engine = engine_db or engine
+        self.ttl = int(ttl_segundos or os.getenv("SCHEDULER_LEASE_TTL", "150"))
+        self.dono = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def reivindicar_tick(self, tick, agora=None):
+        """
+        Adquire (ou renova) o lease e reivindica o tick informado numa única
+        transação com compare-and-set sobre ultimo_tick.
+
+        Args:
+            tick (str): Identificador ordenável do tick (ex: "2025-01-01 08:00")
+
+        Returns:
+            str | None: None se outro processo é o dono ou o tick já foi
+                executado; senão o último tick executado antes deste ("" se nunca)
+        """
+        agora = agora or datetime.now()
+
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO scheduler_leases (nome, dono, expira_em)
+                VALUES (:nome, NULL, :agora)
+                ON CONFLICT (nome) DO NOTHING
+            """), {"nome": self.nome, "agora": agora})
+
+            anterior = conn.execute(text("""
+                SELECT ultimo_tick FROM scheduler_leases WHERE nome = :nome
+            """), {"nome": self.nome}).scalar() or ""
+
+            if anterior >= tick:
+                return None
+
+            result = conn.execute(text("""
+                UPDATE scheduler_leases
+                SET dono = :dono, expira_em = :expira_em, ultimo_tick = :tick, atualizado_em = :agora
+                WHERE nome = :nome
+                AND (dono = :dono OR dono IS NULL OR expira_em < :agora)
+                AND COALESCE(ultimo_tick, '') = :anterior
+            """), {
+                "nome": self.nome,
+                "dono": self.dono,
+                "expira_em": agora + timedelta(seconds=self.ttl),
+                "tick": tick,
+                "agora": agora,
+                "anterior": anterior,
+            })
+
+            return anterior if result.rowcount == 1 else None
+
+    def desfazer_tick(self, tick, anterior):
+        """
+        Devolve ultimo_tick para 'anterior' quando o trabalho do tick falhou (nada
+        foi gravado), para que os minutos sejam recuperados no próximo tick.
+        Compare-and-set: não mexe se outro tick já avançou além deste.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE scheduler_leases SET ultimo_tick = :anterior
+                WHERE nome = :nome AND dono = :dono AND ultimo_tick = :tick
+            """), {"nome": self.nome, "dono": self.dono, "tick": tick, "anterior": anterior or None})
+
+    def liberar(self):
+        """Libera o lease (ex: no desligamento) para o failover ser imediato"""
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE scheduler_leases SET dono = NULL
+                WHERE nome = :nome AND dono = :dono
+            """), {"nome": self.nome, "dono": self.dono})
+
+    def obter_status(self):
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT dono, expira_em, ultimo_tick FROM scheduler_leases WHERE nome = :nome
+            """), {"nome": self.nome}).mappings().first()
+        return {
+            "nome": self.nome,
+            "dono": row["dono"] if row else None,
+            "sou_dono": bool(row) and row["dono"] == self.dono,
+            "expira_em": str(row["expira_em"]) if row else None,
+            "ultimo_tick": row["ultimo_tick"] if row else None,
+        }
+
+def posicao_na_janela(deslocamento, largura):
+    """Minuto (0..largura-1) da janela em que cai um deslocamento_envio"""
+    return ((deslocamento + 1) * largura - 1) // ESCALA_DESLOCAMENTO
+
+class PlanejadorEnvios:
+    """
+    Achata os picos de envio: slots (minutos) com mais usuários que a
+    capacidade são espalhados pelos minutos seguintes. A posição de cada
+    usuário na janela vem do seu deslocamento_envio fixo, então a faixa de
+    cada minuto é uma consulta por intervalo no índice (minuto_envio,
+    deslocamento_envio). O plano é congelado por dia na tabela planos_envio
+    para que nenhum usuário seja pulado ou enviado duas vezes se a carga mudar
+    durante a janela, inclusive quando outro processo assume o lease no meio dela.
+    Cada minuto é resolvido pelo plano do seu próprio dia; janelas que passam de
+    23:59 continuam, no dia seguinte, com o plano do dia em que começaram.
+    """
+
+    def __init__(self, engine_db=None, capacidade=None, janela_max=None):
+        self.engine = engine_db or engine
+        self.capacidade = int(capacidade or os.getenv("SEND_SLOT_CAPACITY", "500"))
+        self.janela_max = int(janela_max or os.getenv("SEND_JITTER_WINDOW", "30"))
+        self._planos = {}
+        self._lock = threading.Lock()
+
+    def carga_por_slot(self):
+        """Quantidade de usuários com telefone por minuto_envio (GROUP BY no índice)"""
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT minuto_envio, COUNT(*) FROM usuarios
+                WHERE minuto_envio IS NOT NULL AND telefone IS NOT NULL
+                GROUP BY minuto_envio
+            """))
+            return {minuto: total for minuto, total in result.fetchall()}
+
+    def largura_janela(self, usuarios_no_slot):
+        """Minutos necessários para o slot não exceder a capacidade por minuto"""
+        return max(1, min(self.janela_max, math.ceil(usuarios_no_slot / self.capacidade)))
+
+    def plano_do_dia(self, dia=None):
+        """Retorna {slot: largura da janela} dos slots espalhados no dia"""
+        dia = dia or date.today()
+        with self._lock:
+            if dia not in self._planos:
+                # Bastam o dia atual e o anterior (janelas que atravessam a meia-noite)
+                for antigo in sorted(self._planos)[:-1]:
+                    del self._planos[antigo]
+                self._planos[dia] = self._carregar_ou_criar_plano(dia)
+            return self._planos[dia]
+
+    def _carregar_ou_criar_plano(self, dia):
+        """
+        O primeiro processo a calcular o plano do dia o grava; os demais (e quem
+        assumir o lease depois de um failover ou reinício) leem o plano gravado
+        """
+        with self.engine.begin() as conn:
+            gravado = conn.execute(text("SELECT plano FROM planos_envio WHERE dia = :dia"),
+                                   {"dia": dia.isoformat()}).scalar()
+            if gravado is None:
+                espalhados = {
+                    slot: self.largura_janela(total)
+                    for slot, total in self.carga_por_slot().items()
+                    if total > self.capacidade
+                }
+                conn.execute(text("""
+                    INSERT INTO planos_envio (dia, plano, criado_em) VALUES (:dia, :plano, :agora)
+                    ON CONFLICT (dia) DO NOTHING
+                """), {"dia": dia.isoformat(), "plano": json.dumps(espalhados), "agora": datetime.now()})
+                conn.execute(text("DELETE FROM planos_envio WHERE dia < :antigo"),
+                             {"antigo": (dia - timedelta(days=7)).isoformat()})
+                gravado = conn.execute(text("SELECT plano FROM planos_envio WHERE dia = :dia"),
+                                       {"dia": dia.isoformat()}).scalar()
+        return {int(slot): largura for slot, largura in json.loads(gravado).items()}
+
+    def faixas_do_minuto(self, minuto, plano, plano_anterior=None):
+        """
+        Faixas (slot, deslocamento_inicio, deslocamento_fim) enviadas no minuto.
+        Slots não espalhados são representados com a faixa completa. Slots do
+        dia anterior (plano_anterior) entram se a janela passou da meia-noite.
+        """
+        faixas = []
+        if minuto not in plano:
+            faixas.append((minuto, 0, ESCALA_DESLOCAMENTO))
+        janelas = [(slot, largura, minuto - slot) for slot, largura in plano.items() if slot <= minuto]
+        janelas += [(slot, largura, minuto + MINUTOS_DIA - slot)
+                    for slot, largura in (plano_anterior or {}).items() if slot > minuto]
+        for slot, largura, posicao in janelas:
+            if posicao < largura:
+                faixas.append((
+                    slot,
+                    posicao * ESCALA_DESLOCAMENTO // largura,
+                    (posicao + 1) * ESCALA_DESLOCAMENTO // largura,
+                ))
+        return faixas
+
+    def filtro_dos_minutos(self, instantes):
+        """
+        Condição SQLAlchemy que seleciona os usuários a enviar nos minutos
+
+        Args:
+            instantes (list): datetimes dos minutos (a data escolhe o plano do dia)
+        """
+        completos, condicoes = [], []
+
+        for instante in instantes:
+            dia = instante.date()
+            plano = self.plano_do_dia(dia)
+            plano_anterior = self.plano_do_dia(dia - timedelta(days=1))
+            minuto = instante.hour * 60 + instante.minute
+            for slot, inicio, fim in self.faixas_do_minuto(minuto, plano, plano_anterior):
+                if (inicio, fim) == (0, ESCALA_DESLOCAMENTO):
+                    completos.append(slot)
+                else:
+                    condicoes.append(and_(
+                        Usuario.minuto_envio == slot,
+                        Usuario.deslocamento_envio >= inicio,
+                        Usuario.deslocamento_envio < fim,
+                    ))
+
+        if completos:
+            condicoes.append(Usuario.minuto_envio.in_(completos))
+        return or_(*condicoes)
+
+    def histograma(self):
+        """Carga por minuto antes e depois do espalhamento"""
+        carga = self.carga_por_slot()
+        plano = self.plano_do_dia()
+        efetiva = {}
+
+        for slot, total in carga.items():
+            if slot not in plano:
+                efetiva[slot] = efetiva.get(slot, 0) + total
+
+        if plano:
+            with self.engine.connect() as conn:
+                result = conn.execute(text("""
+                    SELECT minuto_envio, deslocamento_envio, COUNT(*) FROM usuarios
+                    WHERE telefone IS NOT NULL AND minuto_envio IN :slots
+                    GROUP BY minuto_envio, deslocamento_envio
+                """).bindparams(bindparam("slots", expanding=True)), {"slots": list(plano)})
+                for slot, deslocamento, total in result.fetchall():
+                    posicao = posicao_na_janela(deslocamento or 0, plano[slot])
+                    minuto = (slot + posicao) % MINUTOS_DIA
+                    efetiva[minuto] = efetiva.get(minuto, 0) + total
+
+        return {
+            "capacidade_por_minuto": self.capacidade,
+            "janela_max_minutos": self.janela_max,
+            "slots_espalhados": {
+                f"{slot // 60:02d}:{slot % 60:02d}": largura for slot, largura in sorted(plano.items())
+            },
+            "minutos": [
+                {
+                    "horario": f"{minuto // 60:02d}:{minuto % 60:02d}",
+                    "agendados": carga.get(minuto, 0),
+                    "efetivos": efetiva.get(minuto, 0),
+                }
+                for minuto in sorted(set(carga) | set(efetiva))
+            ],
+        }
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+lease_envio = SchedulerLease("enviar_leitura_diaria")
+lease_prerender = SchedulerLease("prerenderizar_leituras", ttl_segundos=3600)
+planejador_envios = PlanejadorEnvios()
+
+# Scheduler ativo neste processo (None quando o processo não agenda jobs)
+scheduler = None
+
+def minutos_pendentes(anterior, agora, limite):
+    """
+    Minutos (datetimes) entre o último tick executado e agora, inclusive.
+    Permite que um novo dono recupere os ticks perdidos no failover; a data
+    de cada minuto define o plano de espalhamento usado nele.
+    """
+    atual = agora.replace(second=0, microsecond=0)
+    inicio = atual
+    if anterior:
+        ultimo = datetime.strptime(anterior, FORMATO_TICK)
+        inicio = max(ultimo + timedelta(minutes=1), atual - timedelta(minutes=limite - 1))
+
+    minutos = []
+    while inicio <= atual:
+        minutos.append(inicio)
+        inicio += timedelta(minutes=1)
+    return minutos
+
+def enviar_leitura_diaria():
+    agora = datetime.now()
+    tick = agora.strftime(FORMATO_TICK)
+    anterior = lease_envio.reivindicar_tick(tick, agora)
+    if anterior is None:
+        # Outro processo é o dono do lease ou este minuto já foi processado
+        return
+
+    minutos = minutos_pendentes(anterior, agora, int(os.getenv("SCHEDULER_CATCHUP_MINUTES", "15")))
+    if len(minutos) > 1:
+        log_warning(LogCategory.SYSTEM, f"Recuperando {len(minutos)} minutos de envio pendentes",
+                    details={"minutos": [minuto.strftime(FORMATO_TICK) for minuto in minutos]})
+
+    try:
+        enviar_leituras_dos_slots(minutos)
+    except Exception:
+        # Leituras e mensagens foram desfeitas junto com a transação: os minutos
+        # voltam a ficar pendentes e o próximo tick os recupera
+        lease_envio.desfazer_tick(tick, anterior)
+        raise
+
+def enviar_leituras_dos_slots(minutos):
+    mensagens = []
+
+    # A sessão é encerrada (commit/rollback e devolução da conexão) ao fim do job
+    with sessao_escopo() as db:
+        # Busca apenas os usuários dos slots (índice em minuto_envio, deslocamento_envio),
+        # projetando somente as colunas necessárias para o envio
+        usuarios = db.query(
+            Usuario.id,
+            Usuario.nome,
+            Usuario.telefone,
+            Usuario.plano_leitura,
+            Usuario.versao_biblia,
+            Usuario.proximo_dia_plano,
+            Usuario.envios_sem_confirmacao,
+        ).filter(
+            planejador_envios.filtro_dos_minutos(minutos),
+            Usuario.telefone.isnot(None),
+        ).all()
+
+        leituras_do_dia = {}
+        progresso = []
+        max_sem_confirmacao = int(os.getenv("BIBLE_PLAN_MAX_UNCONFIRMED", "3"))
+
+        for usuario in usuarios:
+            # Usa as preferências e o progresso do usuário para obter a leitura personalizada
+            plano_leitura = usuario.plano_leitura or "cronologico"
+            versao_biblia = usuario.versao_biblia or "ARC"
+            anterior = usuario.proximo_dia_plano or 1
+            envios = usuario.envios_sem_confirmacao or 0
+            dia = anterior
+            if max_sem_confirmacao and envios >= max_sem_confirmacao:
+                # Quem não confirma não fica preso no mesmo dia: segue o plano
+                dia, envios = anterior % DIAS_PLANO + 1, 0
+            progresso.append({"id": usuario.id, "anterior": anterior, "dia": dia, "envios": envios + 1})
+
+            # Leitura e áudio dependem apenas de (dia, plano, versão) e já foram
+            # pré-renderizados: uma leitura da tabela por combinação no tick
+            chave = (dia, plano_leitura, versao_biblia)
+            if chave not in leituras_do_dia:
+                leituras_do_dia[chave] = pre_renderizador.leitura_com_audio(plano_leitura, versao_biblia, dia)
+            leitura_info, caminho_audio = leituras_do_dia[chave]
+
+            db.add(Leitura.registrar(usuario.id, leitura_info))
+            mensagens.append({
+                "usuario_id": usuario.id,
+                "telefone": usuario.telefone,
+                "mensagem": f"🙏 Olá {usuario.nome}, sua leitura bíblica de hoje:\n\n{leitura_info['texto']}",
+                "audio_path": caminho_audio,
+            })
+
+        if progresso:
+            # Uma confirmação concorrente (ponteiro já movido) prevalece sobre a contagem
+            db.execute(text("""
+                UPDATE usuarios SET proximo_dia_plano = :dia, envios_sem_confirmacao = :envios
+                WHERE id = :id AND COALESCE(proximo_dia_plano, 1) = :anterior
+            """), progresso)
+
+        # Leituras e mensagens entram no mesmo commit: nenhuma leitura fica registrada sem envio
+        fila_mensagens.enfileirar(mensagens, conexao=db.connection())
+
+    # O envio fica a cargo do worker da fila: o tick não espera pelo sender
+    if mensagens:
+        acordar_fila()
+
+def prerenderizar_leituras():
+    agora = datetime.now()
+    # Uma vez por dia, em um único processo
+    if lease_prerender.reivindicar_tick(agora.strftime("%Y-%m-%d"), agora) is None:
+        return
+    pre_renderizador.prerenderizar()
+
+def processar_fila_mensagens():
+    # Sem lease: a reivindicação de lotes é atômica, então vários workers podem rodar
+    fila_mensagens.processar_pendentes()
+
+def acordar_fila():
+    """Antecipa a próxima execução do worker da fila (se houver scheduler neste processo)"""
+    job = scheduler.get_job("processar_fila_mensagens") if scheduler else None
+    if job:
+        job.modify(next_run_time=datetime.now())
+
+# ---------------------------------------------------------------------------
+# Inicialização
+# ---------------------------------------------------------------------------
+
+def criar_scheduler(classe=None):
+    """Cria o scheduler com todos os jobs do VersoZap (padrão: BackgroundScheduler)"""
+    if classe is None:
+        # APScheduler só é carregado nos processos que agendam jobs
+        from apscheduler.schedulers.background import BackgroundScheduler
+        classe = BackgroundScheduler
+    novo = classe()
+    novo.add_job(
+        enviar_leitura_diaria,
+        "interval",
+        minutes=1,
+        id="enviar_leitura_diaria",
+        max_instances=1,
+        coalesce=True,
+    )
+    hora, minuto = os.getenv("PRERENDER_HORA", "02:00").split(":")
+    novo.add_job(
+        prerenderizar_leituras,
+        "cron",
+        hour=int(hora),
+        minute=int(minuto),
+        id="prerenderizar_leituras",
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=3600,
+    )
+    novo.add_job(
+        processar_fila_mensagens,
+        "interval",
+        seconds=int(os.getenv("QUEUE_POLL_SECONDS", "10")),
+        id="processar_fila_mensagens",
+        max_instances=1,
+        coalesce=True,
+    )
+    return novo
+
+def iniciar_scheduler(classe=None):
+    """Cria e inicia o scheduler deste processo"""
+    global scheduler
+    scheduler = criar_scheduler(classe)
+    log_info(LogCategory.SYSTEM, "Scheduler iniciado", details={"dono_lease": lease_envio.dono})
+    scheduler.start()
+    return scheduler
+
+def parar_scheduler():
+    global scheduler
+    if scheduler:
+        scheduler.shutdown(wait=False)
+        scheduler = None
+        lease_envio.liberar()
+
+if __name__ == "__main__":
+    from database_manager import initialize_database
+
+    if not initialize_database():
+        log_error(LogCategory.DATABASE, "Falha na inicialização do banco de dados")
+        exit(1)
+
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    try:
+        iniciar_scheduler(BlockingScheduler)
+    except (KeyboardInterrupt, SystemExit):
+        lease_envio.liberar()
+        log_info(LogCategory.SYSTEM, "Scheduler interrompido")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para o cache de áudio do VersoZap
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_cache import AudioCache
+
+class SintetizadorFalso:
+    """Substitui o gTTS e conta quantas sínteses foram feitas"""
+
+    def __init__(self, atraso=0.0):
+        self.chamadas = 0
+        self.atraso = atraso
+        self.lock = threading.Lock()
+
+    def __call__(self, texto, idioma, destino):
+        with self.lock:
+            self.chamadas += 1
+        time.sleep(self.atraso)
+        with open(destino, "wb") as f:
+            f.write(texto.encode("utf-8"))
+
+def test_sintese_unica_por_texto():
+    """Testa que o mesmo texto gera um único arquivo compartilhado"""
+    print("=== Testando Síntese Única por Texto ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        sintetizador = SintetizadorFalso()
+        cache = AudioCache(diretorio=diretorio, sintetizador=sintetizador)
+
+        caminhos = [cache.obter_audio("Salmos 23:1") for _ in range(5)]
+        outro = cache.obter_audio("João 3:16")
+
+        print(f"Sínteses: {sintetizador.chamadas}")
+        assert sintetizador.chamadas == 2
+        assert len(set(caminhos)) == 1
+        assert outro != caminhos[0]
+        assert cache.caminho(cache.chave("Salmos 23:1", "en")) != caminhos[0]
+
+def test_concorrencia():
+    """Testa que threads simultâneas não sintetizam o mesmo texto em duplicidade"""
+    print("\n=== Testando Concorrência ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        sintetizador = SintetizadorFalso(atraso=0.05)
+        cache = AudioCache(diretorio=diretorio, sintetizador=sintetizador)
+
+        threads = [
+            threading.Thread(target=cache.obter_audio, args=("Gênesis 1:1",))
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        print(f"Sínteses: {sintetizador.chamadas}")
+        assert sintetizador.chamadas == 1
+        assert not [n for n in os.listdir(diretorio) if not n.endswith(".mp3")]
+
+def test_limpeza():
+    """Testa a remoção por idade e por tamanho máximo"""
+    print("\n=== Testando Limpeza ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache = AudioCache(diretorio=diretorio, max_bytes=25, max_idade_segundos=3600,
+                           sintetizador=SintetizadorFalso())
+
+        antigo = cache.obter_audio("texto antigo")
+        os.utime(antigo, (time.time() - 7200, time.time() - 7200))
+        primeiro = cache.obter_audio("0123456789")
+        os.utime(primeiro, (time.time() - 60, time.time() - 60))
+        segundo = cache.obter_audio("abcdefghij")
+        terceiro = cache.obter_audio("ABCDEFGHIJ")
+
+        removidos = cache.limpar()
+        print(f"Arquivos removidos: {removidos}")
+        assert removidos == 2
+        assert not os.path.exists(antigo)
+        assert not os.path.exists(primeiro)
+        assert os.path.exists(segundo) and os.path.exists(terceiro)
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DO CACHE DE AUDIO VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_sintese_unica_por_texto()
+        test_concorrencia()
+        test_limpeza()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para o importador de traduções da Bíblia do VersoZap
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bible_data import LIVROS_BIBLIA
+from bible_importer import ImportadorBiblia, ErroImportacao
+from verse_store import ArmazemVersiculos
+
+def escrever_json_completo(caminho, prefixo):
+    """Gera uma tradução sintética com a estrutura completa da Bíblia"""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump([
+            {
+                "abbrev": livro["codigo"].lower(),
+                "chapters": [
+                    [f"{prefixo} {livro['nome']} {c}:{v}" for v in range(1, total + 1)]
+                    for c, total in enumerate(livro["versiculos"], start=1)
+                ],
+            }
+            for livro in LIVROS_BIBLIA
+        ], arquivo, ensure_ascii=False)
+
+def test_importacao_json_completa():
+    """Testa a importação em streaming e a troca atômica de versão"""
+    print("=== Testando Importação JSON Completa ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db"))
+        importador = ImportadorBiblia(armazem=armazem, tamanho_lote=1000)
+        caminho = os.path.join(diretorio, "arc.json")
+
+        escrever_json_completo(caminho, "v1")
+        resumo = importador.importar("ARC", "Almeida Revista e Corrigida", [caminho])
+        print(f"Resumo: { {k: v for k, v in resumo.items() if k != 'avisos'} }")
+        assert resumo["versiculos"] == 31102
+        assert resumo["avisos"] == []
+        assert armazem.contar("ARC") == 31102
+
+        passagem = armazem.passagem("ARC", 1, 24, 1, 67)
+        assert len(passagem) == 67
+        assert passagem[0][1] == "v1 Gênesis 24:1"
+
+        # Reimportação substitui a versão inteira e incrementa a geração
+        escrever_json_completo(caminho, "v2")
+        segunda = importador.importar("ARC", "Almeida Revista e Corrigida", [caminho])
+        assert segunda["geracao"] == resumo["geracao"] + 1
+        assert armazem.obter_geracao() == segunda["geracao"]
+        assert armazem.contar("ARC") == 31102
+        assert armazem.passagem("ARC", 66, 22, 21, 21)[0][1] == "v2 Apocalipse 22:21"
+
+def test_validacao_mantem_versao_publicada():
+    """Testa que uma tradução incompleta é rejeitada sem afetar a versão publicada"""
+    print("\n=== Testando Validação ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db"))
+        importador = ImportadorBiblia(armazem=armazem)
+        caminho = os.path.join(diretorio, "nvi.jsonl")
+
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for v in range(1, 17):
+                arquivo.write(json.dumps({"livro": "João", "capitulo": 3, "versiculo": v, "texto": f"Jo 3:{v}"}) + "\n")
+
+        try:
+            importador.importar("NVI", "Nova Versão Internacional", [caminho])
+            assert False, "importação incompleta deveria falhar"
+        except ErroImportacao as e:
+            print(f"Rejeitada: {str(e).splitlines()[0]}")
+
+        # A versão publicada (versículos de exemplo) continua intacta
+        assert armazem.contar("NVI") == 5
+        assert armazem.contar("NVI.__importando") == 0
+
+def test_importacao_usfm_parcial():
+    """Testa a leitura de USFM com marcadores e a importação parcial"""
+    print("\n=== Testando Importação USFM ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db"))
+        caminho = os.path.join(diretorio, "obadias.usfm")
+
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\\id OBA\n\\h Obadias\n\\c 1\n\\p\n")
+            for v in range(1, 22):
+                arquivo.write(f"\\v {v} Texto \\w do|strong=\"H1\"\\w* versículo {v}\\f + \\ft nota\\f*\n")
+            arquivo.write("\\q1 continuação\n")
+
+        resumo = ImportadorBiblia(armazem=armazem).importar(
+            "ACF", "Almeida Corrigida Fiel", [caminho], parcial=True
+        )
+        assert resumo["versiculos"] == 21
+        versiculos = armazem.passagem("ACF", 31, 1, 1, 21)
+        print(f"Último versículo: {versiculos[-1][1]}")
+        assert versiculos[0][1] == "Texto do versículo 1"
+        assert versiculos[-1][1] == "Texto do versículo 21 continuação"
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DO IMPORTADOR BÍBLICO VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_importacao_json_completa()
+        test_validacao_mantem_versao_publicada()
+        test_importacao_usfm_parcial()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -6,12 +6,17 @@ Script de teste para o sistema de conteúdo bíblico do VersoZap
 
 import sys
 import os
+import tempfile
 from datetime import date
 
 # Adiciona o diretório atual ao path para importar os módulos
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from bible_service import biblia_service
+import banco_teste  # BIBLE_DB_PATH temporário, antes do armazém global
+from bible_service import biblia_service, BibliaService
+from bible_data import LIVROS_BIBLIA
+from reading_plan import obter_plano, dividir_em_dias
+from verse_store import ArmazemVersiculos, analisar_referencia, codificar_versiculo, decodificar_versiculo
 
 def test_versoes_disponiveis():
     """Testa se as versões da Bíblia estão sendo carregadas corretamente"""
@@ -103,6 +108,141 @@ def test_validacao():
         print(f"Versão válida: {resultado['versao_valida']}")
         print(f"Plano válido: {resultado['plano_valido']}")
 
+def test_estrutura_biblia():
+    """Testa a tabela de livros contra os totais conhecidos da versificação padrão"""
+    print("\n=== Testando Estrutura da Bíblia ===")
+
+    totais = {livro["nome"]: sum(livro["versiculos"]) for livro in LIVROS_BIBLIA}
+    print(f"Livros: {len(LIVROS_BIBLIA)}, versículos: {sum(totais.values())}")
+    assert len(LIVROS_BIBLIA) == 66
+    assert sum(len(livro["versiculos"]) for livro in LIVROS_BIBLIA) == 1189
+    assert sum(totais.values()) == 31102
+    assert totais["Gênesis"] == 1533
+    assert totais["Salmos"] == 2461
+    assert totais["Mateus"] == 1071
+    assert totais["Apocalipse"] == 404
+
+    assert analisar_referencia("Gênesis 24:1-67") == (1, 24, 1, 67)
+    assert analisar_referencia("1 João 3:16") == (62, 3, 16, 16)
+    assert analisar_referencia("Salmos 23") == (19, 23, 1, 6)
+    assert analisar_referencia("Gênesis 24:1-68") is None
+    assert decodificar_versiculo(codificar_versiculo(19, 119, 176)) == (19, 119, 176)
+
+def test_armazem_versiculos():
+    """Testa a leitura de uma passagem completa do armazém de versículos"""
+    print("\n=== Testando Armazém de Versículos ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db"))
+        armazem.garantir_esquema()
+        print(f"Versículos de exemplo: {armazem.contar()}")
+        assert armazem.contar("ARC") == 5
+
+        conn = armazem.conexao_escrita()
+        with conn:
+            conn.executemany(
+                "INSERT INTO versiculos (versao, vid, texto) VALUES (?, ?, ?)",
+                [("ARC", codificar_versiculo(1, 24, v), f"Versículo {v}") for v in range(1, 68)]
+            )
+        conn.close()
+
+        passagem = armazem.passagem("ARC", 1, 24, 1, 67)
+        assert len(passagem) == 67
+        assert passagem[-1] == (codificar_versiculo(1, 24, 67), "Versículo 67")
+        assert armazem.passagem("NVI", 1, 24, 1, 67) is None
+
+        # Primeiro dia do plano canônico: Gênesis 1-3 numa única busca por trecho
+        conn = armazem.conexao_escrita()
+        with conn:
+            conn.executemany(
+                "INSERT INTO versiculos (versao, vid, texto) VALUES (?, ?, ?)",
+                [("ARC", codificar_versiculo(1, c, v), f"Gn {c}:{v}")
+                 for c, total in ((1, 31), (2, 25), (3, 24)) for v in range(1, total + 1)]
+            )
+        conn.close()
+
+        servico = BibliaService(armazem=armazem)
+        leitura = servico.obter_leitura_do_dia(dia_do_ano=1, plano_leitura="canonico", versao_biblia="ARC")
+        print(f"Texto: {leitura['texto'][:60]}...")
+        assert leitura["referencia"] == "Gênesis 1-3"
+        assert leitura["texto"].startswith("*Gênesis 1*\n1 Gn 1:1\n2 Gn 1:2")
+        assert "*Gênesis 3*\n1 Gn 3:1" in leitura["texto"]
+        assert "Leia esta passagem" in servico.obter_leitura_do_dia(
+            dia_do_ano=1, plano_leitura="canonico", versao_biblia="NVI"
+        )["texto"]
+
+def test_planos_gerados():
+    """Testa que cada plano cobre a Bíblia inteira em 365 dias equilibrados"""
+    print("\n=== Testando Planos Gerados ===")
+
+    for plano in ("cronologico", "livros", "canonico"):
+        dias = obter_plano(plano, peso="versiculos")
+        capitulos = [
+            (s["livro_numero"], c)
+            for dia in dias for s in dia["segmentos"]
+            for c in range(s["capitulo"], s["capitulo_fim"] + 1)
+        ]
+        pesos = [dia["peso"] for dia in dias]
+        print(f"{plano}: {len(dias)} dias, versículos por dia {min(pesos)}-{max(pesos)}")
+        assert len(dias) == 365
+        assert len(capitulos) == len(set(capitulos)) == 1189
+        assert sum(pesos) == 31102
+        # O único dia acima de 130 versículos é o Salmo 119 sozinho
+        assert all(peso <= 130 or dia["referencia"] == "Salmos 119:1-176" for peso, dia in zip(pesos, dias))
+        assert min(pesos) >= 40
+
+    assert obter_plano("livros")[0]["segmentos"][0]["livro"] == "Mateus"
+    assert obter_plano("cronologico") is obter_plano("cronologico")
+    assert dividir_em_dias([1, 1, 10, 1, 1, 1], dias=3) == [0, 2, 3, 6]
+
+    # Nenhum dia cai no fallback de "plano concluído"
+    for dia in range(1, 366):
+        leitura = biblia_service.obter_leitura_do_dia(dia_do_ano=dia, plano_leitura="livros")
+        assert "Parabéns" not in leitura["texto"]
+
+def test_busca():
+    """Testa a busca por palavras, frases e prefixos, ignorando acentos"""
+    print("\n=== Testando Busca ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        servico = BibliaService(armazem=ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db")))
+
+        resultados = servico.buscar("unigenito")
+        print(f"'unigenito': {[(r['versao'], r['referencia']) for r in resultados]}")
+        assert {r["versao"] for r in resultados} == {"ARC", "NVI", "ACF"}
+        assert all(r["referencia"] == "João 3:16" for r in resultados)
+        assert "*unigênito*" in resultados[0]["destaque"].lower()
+
+        assert [r["versao"] for r in servico.buscar('"tanto amou"')] == ["NVI"]
+        assert {r["referencia"] for r in servico.buscar("fortal*")} == {"Filipenses 4:13"}
+        assert [r["referencia"] for r in servico.buscar("pastor", versao_biblia="ACF")] == ["Salmos 23:1"]
+        assert servico.buscar("pastor", livro=43) == []
+        assert servico.buscar('" OR * : ^') == []
+
+def test_comparar_versoes():
+    """Testa a comparação alinhada de uma passagem em várias versões"""
+    print("\n=== Testando Comparação de Versões ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        servico = BibliaService(armazem=ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db")))
+
+        comparacao = servico.comparar(["ARC", "NVI", "ACF"], referencia="João 3:16")
+        print(f"Referência: {comparacao['referencia']}, versículos: {len(comparacao['versiculos'])}")
+        assert comparacao["referencia"] == "João 3:16"
+        assert len(comparacao["versiculos"]) == 1
+        textos = comparacao["versiculos"][0]["textos"]
+        assert list(textos) == ["ARC", "NVI", "ACF"]
+        assert textos["NVI"].startswith("Porque Deus tanto amou")
+
+        # Versículos ausentes numa versão ficam alinhados com None
+        comparacao = servico.comparar(["NVI", "ARC"], referencia="Salmos 23")
+        assert [v["versiculo"] for v in comparacao["versiculos"]] == [1]
+        assert servico.comparar(["ARC"], referencia="Salmos 151") is None
+
+        comparacao = servico.comparar(["ARC"], dia_do_ano=1, plano_leitura="canonico")
+        assert comparacao["referencia"] == "Gênesis 1-3"
+        assert comparacao["versiculos"] == []
+
 def main():
     """Executa todos os testes"""
     print("INICIANDO TESTES DO SISTEMA BIBLICO VERSOZAP")
@@ -114,6 +254,11 @@ def main():
         test_leitura_do_dia()
         test_dias_especificos()
         test_validacao()
+        test_estrutura_biblia()
+        test_armazem_versiculos()
+        test_planos_gerados()
+        test_busca()
+        test_comparar_versoes()
         
         print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
         print("O sistema de conteudo biblico esta funcionando corretamente.")
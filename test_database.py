@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para a engine compartilhada do VersoZap
+"""
+
+import sys
+import os
+import tempfile
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import engine, criar_engine, sessao_escopo, estatisticas_pool
+from banco_teste import url_banco_teste
+from database_manager import DatabaseManager, db_manager, adaptar_ddl, HORARIO_ENVIO_VALIDO
+from models import horario_para_minuto
+from logging_system import versozap_logger
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+def test_engine_sqlite():
+    """Testa os pragmas aplicados a cada conexão SQLite"""
+    print("=== Testando Engine SQLite ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_teste = criar_engine(f"sqlite:///{os.path.join(diretorio, 'engine.db')}", echo=False)
+        with engine_teste.connect() as conn:
+            journal = conn.execute(text("PRAGMA journal_mode")).scalar()
+            synchronous = conn.execute(text("PRAGMA synchronous")).scalar()
+            busy_timeout = conn.execute(text("PRAGMA busy_timeout")).scalar()
+        engine_teste.dispose()
+
+        print(f"journal_mode={journal} synchronous={synchronous} busy_timeout={busy_timeout}")
+        assert journal == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout > 0
+        assert engine_teste.echo is False
+
+def test_engine_compartilhada():
+    """Testa que o gerenciador usa a engine da aplicação quando não recebe URL"""
+    print("\n=== Testando Engine Compartilhada ===")
+
+    assert db_manager.engine is engine
+    assert DatabaseManager().engine is engine
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(diretorio, 'outro.db')}")
+        assert manager.engine is not engine
+        manager.engine.dispose()
+
+def test_sessao_escopo():
+    """Testa commit, rollback e devolução da conexão ao pool"""
+    print("\n=== Testando Sessão com Escopo ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_teste = criar_engine(f"sqlite:///{os.path.join(diretorio, 'sessao.db')}", echo=False)
+        fabrica = sessionmaker(bind=engine_teste)
+        with engine_teste.begin() as conn:
+            conn.execute(text("CREATE TABLE itens (nome TEXT)"))
+
+        with sessao_escopo(fabrica) as db:
+            db.execute(text("INSERT INTO itens VALUES ('confirmado')"))
+            assert estatisticas_pool(engine_teste)["em_uso"] == 1
+
+        try:
+            with sessao_escopo(fabrica) as db:
+                db.execute(text("INSERT INTO itens VALUES ('descartado')"))
+                raise RuntimeError("falha no job")
+        except RuntimeError:
+            pass
+
+        estatisticas = estatisticas_pool(engine_teste)
+        print(f"Pool após as sessões: {estatisticas}")
+        assert estatisticas["em_uso"] == 0
+
+        with engine_teste.connect() as conn:
+            nomes = [row[0] for row in conn.execute(text("SELECT nome FROM itens"))]
+        assert nomes == ["confirmado"]
+        engine_teste.dispose()
+
+def test_migrations_por_dialeto():
+    """Testa a tradução do DDL das migrations e o backup consistente do SQLite"""
+    print("\n=== Testando Migrations por Dialeto ===")
+
+    ddl = "CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT)"
+    assert adaptar_ddl(ddl, "sqlite") == ddl
+    assert adaptar_ddl(ddl, "postgresql") == "CREATE TABLE t (id SERIAL PRIMARY KEY, nome TEXT)"
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(f"sqlite:///{os.path.join(diretorio, 'origem.db')}")
+        assert manager.run_migrations()
+        with manager.engine.begin() as conn:
+            conn.execute(text("INSERT INTO usuarios (nome, telefone) VALUES ('Ana', '5511900000001')"))
+
+        # A escrita ainda está no WAL: o backup precisa incluí-la
+        destino = manager.backup_database(os.path.join(diretorio, "backup.db"))
+        assert destino is not None
+        backup = criar_engine(f"sqlite:///{destino}", echo=False)
+        with backup.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM usuarios")).scalar() == 1
+        backup.dispose()
+        manager.engine.dispose()
+
+def test_versao_do_esquema():
+    """Testa o caminho rápido do boot e as migrations sob lock"""
+    print("\n=== Testando Versão do Esquema ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'esquema.db'))
+        assert not manager.esquema_atualizado()
+
+        assert manager.migrar()
+        assert manager.esquema_atualizado()
+        print(f"Versão do esquema: {manager.versao_atual()}")
+
+        # Já na versão atual: nenhuma migration é executada de novo
+        with manager.engine.connect() as conn:
+            antes = conn.execute(text("SELECT COUNT(*) FROM migrations")).scalar()
+        assert manager.migrar()
+        with manager.engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM migrations")).scalar() == antes
+        assert not os.path.exists(os.path.join(diretorio, "esquema.db.migrations.lock"))
+        manager.engine.dispose()
+
+def test_horarios_de_envio_invalidos():
+    """Testa que o backfill do slot de envio só aceita horários válidos, como horario_para_minuto"""
+    print("\n=== Testando Horários de Envio Inválidos ===")
+
+    horarios = ["08:00", "00:00", "23:59", "24:00", "99:99", "08:0x", "8:00", "08:60", "1x:00", "ab:cd", "08-00"]
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'slots.db'))
+        todas = manager.get_all_migrations()
+
+        # Banco anterior à 007, com horários cadastrados válidos e inválidos
+        manager.get_all_migrations = lambda: {k: v for k, v in todas.items() if k < "007"}
+        assert manager.run_migrations()
+        with manager.engine.begin() as conn:
+            for horario in horarios:
+                conn.execute(text("""
+                    INSERT INTO usuarios (nome, telefone, horario_envio) VALUES (:horario, :horario, :horario)
+                """), {"horario": horario})
+            valido = {row[0]: bool(row[1]) for row in conn.execute(text(
+                "SELECT horario_envio, " + HORARIO_ENVIO_VALIDO + " FROM usuarios"
+            ))}
+
+        assert valido == {h: horario_para_minuto(h) is not None for h in horarios}
+        del manager.get_all_migrations
+        assert manager.run_migrations()
+        with manager.engine.connect() as conn:
+            minutos = dict(conn.execute(text("SELECT horario_envio, minuto_envio FROM usuarios")).fetchall())
+        print(f"Slots: {minutos}")
+        # O backfill só preenche o slot quando horario_para_minuto aceitaria o horário
+        assert minutos == {h: horario_para_minuto(h) for h in horarios}
+        manager.engine.dispose()
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DA ENGINE VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_engine_sqlite()
+        test_engine_compartilhada()
+        test_sessao_escopo()
+        test_migrations_por_dialeto()
+        test_versao_do_esquema()
+        test_horarios_de_envio_invalidos()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
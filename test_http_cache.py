@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para as respostas HTTP cacheáveis do VersoZap
+"""
+
+import sys
+import os
+from datetime import datetime, timezone
+from flask import Flask
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_cache import resposta_cacheavel, segundos_ate_virada
+
+def criar_app():
+    app = Flask(__name__)
+
+    @app.get("/conteudo")
+    def conteudo():
+        return resposta_cacheavel(
+            b'{"versoes":[]}',
+            ultima_modificacao=datetime(2025, 1, 1, tzinfo=timezone.utc)
+        )
+
+    return app
+
+def test_get_condicional():
+    """Testa ETag, Cache-Control e o 304 para If-None-Match"""
+    print("=== Testando GET Condicional ===")
+
+    cliente = criar_app().test_client()
+    resposta = cliente.get("/conteudo")
+    etag = resposta.headers["ETag"]
+    print(f"ETag: {etag}, Cache-Control: {resposta.headers['Cache-Control']}")
+    assert resposta.status_code == 200
+    assert not etag.startswith("W/")
+    assert "public" in resposta.headers["Cache-Control"]
+    assert resposta.headers["Last-Modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    repetida = cliente.get("/conteudo", headers={"If-None-Match": etag})
+    assert repetida.status_code == 304
+    assert repetida.data == b""
+
+    assert cliente.get("/conteudo", headers={"If-None-Match": '"outra"'}).status_code == 200
+    assert cliente.get("/conteudo", headers={
+        "If-Modified-Since": "Thu, 02 Jan 2025 00:00:00 GMT"
+    }).status_code == 304
+
+def test_virada_do_dia():
+    """Testa o max-age até a meia-noite"""
+    print("\n=== Testando Virada do Dia ===")
+
+    assert segundos_ate_virada(datetime(2025, 1, 1, 23, 59, 0)) == 60
+    assert segundos_ate_virada(datetime(2025, 1, 1, 0, 0, 0)) == 86400
+    assert segundos_ate_virada(datetime(2025, 1, 1, 23, 59, 59, 900000)) == 1
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DO CACHE HTTP VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_get_condicional()
+        test_virada_do_dia()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para as saídas de arquivo e console dos logs do VersoZap
+"""
+
+import sys
+import os
+import gzip
+import json
+import logging
+import tempfile
+import subprocess
+from logging.handlers import QueueHandler
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from logging_system import versozap_logger, LogLevel, LogCategory
+from log_handlers import FormatadorJson, criar_handler_arquivo, configurar_saidas, encerrar_saidas
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+def test_rotacao_comprimida():
+    """Testa a rotação por tamanho com as cópias antigas comprimidas"""
+    print("=== Testando Rotação Comprimida ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "teste.log")
+        handler = criar_handler_arquivo(caminho, rotacao="tamanho", tamanho_maximo_mb=0.001, copias=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(500):
+            handler.emit(logging.makeLogRecord({"msg": f"linha {i:03d}", "levelno": logging.INFO}))
+        handler.close()
+
+        arquivos = sorted(os.listdir(diretorio))
+        print(f"Arquivos: {arquivos}")
+        assert arquivos == ["teste.log", "teste.log.1.gz", "teste.log.2.gz"]
+        with gzip.open(os.path.join(diretorio, "teste.log.1.gz"), "rt", encoding="utf-8") as copia:
+            linhas = copia.read().splitlines()
+        with open(caminho, encoding="utf-8") as atual:
+            # A cópia mais recente termina onde o arquivo atual começa
+            assert int(linhas[-1].split()[-1]) + 1 == int(atual.readline().split()[-1])
+
+        try:
+            criar_handler_arquivo(caminho, rotacao="semanal")
+            assert False, "Rotação inválida deveria falhar"
+        except ValueError:
+            pass
+
+def test_saidas_em_fila():
+    """Testa que os logs passam pela fila e chegam ao arquivo em JSON lines"""
+    print("\n=== Testando Saídas em Fila ===")
+
+    raiz = logging.getLogger()
+    assert configurar_saidas() is configurar_saidas()
+    assert sum(isinstance(h, QueueHandler) for h in raiz.handlers) == 1
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        encerrar_saidas()
+        try:
+            configurar_saidas(diretorio=diretorio, arquivo="json.log", formato="json", console=False)
+            versozap_logger.log(LogLevel.WARNING, LogCategory.SYSTEM, "Aviso de teste", details={"a": 1})
+            try:
+                raise RuntimeError("falha")
+            except RuntimeError:
+                logging.getLogger("teste").exception("Erro de teste")
+            # O encerramento escreve o que ainda estiver na fila
+            encerrar_saidas()
+
+            with open(os.path.join(diretorio, "json.log"), encoding="utf-8") as arquivo:
+                registros = [json.loads(linha) for linha in arquivo]
+            print(f"Registros: {registros}")
+            assert registros[0]["level"] == "WARNING"
+            assert registros[0]["logger"] == "VersoZap"
+            assert registros[0]["message"] == '[SYSTEM] Aviso de teste | Details: {"a": 1}'
+            assert registros[1]["level"] == "ERROR" and "RuntimeError: falha" in registros[1]["message"]
+        finally:
+            encerrar_saidas()
+            configurar_saidas()
+
+    registro = logging.makeLogRecord({"msg": "ação %s", "args": ("ok",), "levelname": "INFO", "name": "x"})
+    assert json.loads(FormatadorJson().format(registro))["message"] == "ação ok"
+
+def test_arquivo_por_processo():
+    """Testa que cada arquivo tem um único processo escrevendo e que os nomes são reaproveitados"""
+    print("\n=== Testando Arquivo por Processo ===")
+
+    os.environ["LOG_PROCESS"] = "teste"
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Outro processo do mesmo papel, enquanto este segura o arquivo base
+        outro_processo = [sys.executable, "-c", (
+            "import logging, log_handlers; "
+            f"log_handlers.configurar_saidas(diretorio={diretorio!r}, arquivo='{{processo}}.log', console=False); "
+            "logging.getLogger('teste').warning('do outro processo')"
+        )]
+        encerrar_saidas()
+        try:
+            configurar_saidas(diretorio=diretorio, arquivo="{processo}.log", console=False)
+            logging.getLogger("teste").warning("do pai")
+            if hasattr(os, "fork"):
+                filho = os.fork()
+                if filho == 0:
+                    # Filho do fork: só console, o arquivo continua sendo do pai
+                    logging.getLogger("teste").warning("do filho")
+                    encerrar_saidas()
+                    os._exit(0)
+                os.waitpid(filho, 0)
+            for _ in range(3):
+                # Reinícios reaproveitam o mesmo número livre
+                subprocess.run(outro_processo, check=True, env=os.environ,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+            logging.getLogger("teste").warning("do pai de novo")
+            encerrar_saidas()
+
+            arquivos = sorted(nome for nome in os.listdir(diretorio) if nome.endswith(".log"))
+            print(f"Arquivos: {arquivos}")
+            assert arquivos == ["teste-2.log", "teste.log"]
+            with open(os.path.join(diretorio, "teste.log"), encoding="utf-8") as arquivo:
+                do_pai = arquivo.read()
+            with open(os.path.join(diretorio, "teste-2.log"), encoding="utf-8") as arquivo:
+                do_outro = arquivo.read()
+            assert "do pai" in do_pai and "do pai de novo" in do_pai and "do filho" not in do_pai
+            assert do_outro.count("do outro processo") == 3 and "do filho" not in do_outro
+        finally:
+            del os.environ["LOG_PROCESS"]
+            encerrar_saidas()
+            configurar_saidas()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Rotação externa: o logrotate move o arquivo e o handler o reabre
+        caminho = os.path.join(diretorio, "compartilhado.log")
+        handler = criar_handler_arquivo(caminho, rotacao="externa")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.emit(logging.makeLogRecord({"msg": "antes", "levelno": logging.INFO}))
+        os.rename(caminho, caminho + ".1")
+        handler.emit(logging.makeLogRecord({"msg": "depois", "levelno": logging.INFO}))
+        handler.close()
+        with open(caminho, encoding="utf-8") as atual, open(caminho + ".1", encoding="utf-8") as movido:
+            assert atual.read() == "depois\n" and movido.read() == "antes\n"
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DAS SAÍDAS DE LOG VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_rotacao_comprimida()
+        test_saidas_em_fila()
+        test_arquivo_por_processo()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para a gravação assíncrona de logs do VersoZap
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from banco_teste import url_banco_teste
+from database_manager import DatabaseManager
+from logging_system import versozap_logger, VersoZapLogger, LogLevel, LogCategory
+import log_sink
+from log_sink import GravadorLogs
+from log_partitions import listar_particoes, nome_particao
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+def registro(numero):
+    return {"timestamp": datetime.now().isoformat(), "level": "INFO", "category": "SYSTEM",
+            "message": f"log {numero}", "details": None, "user_id": None}
+
+def criar_banco(diretorio):
+    manager = DatabaseManager(url_banco_teste(diretorio, 'logs.db'))
+    assert manager.run_migrations()
+    return manager.engine
+
+def mensagens(engine_db):
+    """Mensagens gravadas nas partições diárias, na ordem de gravação"""
+    with engine_db.connect() as conn:
+        return [row[0] for _, tabela in listar_particoes(engine_db)
+                for row in conn.execute(text(f"SELECT message FROM {tabela} ORDER BY id"))]
+
+def test_gravacao_em_lotes():
+    """Testa que os logs enfileirados são gravados em lotes e descarregados no encerramento"""
+    print("=== Testando Gravação em Lotes ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_db = criar_banco(diretorio)
+        gravador = GravadorLogs(engine_db=engine_db, capacidade=1000, tamanho_lote=100, intervalo=0.05)
+
+        for i in range(250):
+            assert gravador.enfileirar(registro(i))
+        assert gravador.descarregar(timeout=5)
+
+        metricas = gravador.obter_metricas()
+        print(f"Métricas: {metricas}")
+        assert metricas["gravados"] == 250
+        assert metricas["profundidade"] == 0
+        assert metricas["lotes"] < 250
+        assert mensagens(engine_db) == [f"log {i}" for i in range(250)]
+
+        # O encerramento grava o que ainda estiver na fila
+        gravador.enfileirar(registro(250))
+        gravador.encerrar()
+        assert len(mensagens(engine_db)) == 251
+        engine_db.dispose()
+
+def test_particao_concorrente():
+    """Testa que a partição criada ou expirada por outro processo não derruba o lote"""
+    print("\n=== Testando Partição Concorrente ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_db = criar_banco(diretorio)
+        gravador = GravadorLogs(engine_db=engine_db, tamanho_lote=100, intervalo=0.05)
+
+        # Outro processo cria a mesma partição ao mesmo tempo e o CREATE deste falha
+        criar_original = log_sink.criar_particao
+        def criar_em_paralelo(conn, dia):
+            with engine_db.begin() as outra:
+                criar_original(outra, dia)
+            raise RuntimeError("duplicate key value violates unique constraint")
+        log_sink.criar_particao = criar_em_paralelo
+        try:
+            for i in range(10):
+                gravador.enfileirar(registro(i))
+            assert gravador.descarregar(timeout=5)
+        finally:
+            log_sink.criar_particao = criar_original
+
+        # A limpeza expira a partição que este processo já conhecia: o lote é refeito uma vez
+        with engine_db.begin() as conn:
+            conn.execute(text(f"DROP TABLE {nome_particao(datetime.now().date())}"))
+        for i in range(10, 20):
+            gravador.enfileirar(registro(i))
+        assert gravador.descarregar(timeout=5)
+
+        metricas = gravador.obter_metricas()
+        print(f"Métricas: {metricas}")
+        assert metricas["gravados"] == 20 and metricas["retentativas"] == 1
+        assert metricas["falhas"] == 0 and metricas["descartados"] == 0
+        assert mensagens(engine_db) == [f"log {i}" for i in range(10, 20)]
+        gravador.encerrar()
+        engine_db.dispose()
+
+def test_politicas_de_excesso():
+    """Testa o descarte de logs com a fila cheia"""
+    print("\n=== Testando Políticas de Excesso ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_db = criar_banco(diretorio)
+
+        for politica, esperadas in (("descartar_novos", [0, 1, 2]), ("descartar_antigos", [7, 8, 9])):
+            gravador = GravadorLogs(engine_db=engine_db, capacidade=3, tamanho_lote=10,
+                                    intervalo=0.05, politica=politica)
+            # Gravador parado: a fila enche
+            iniciar = gravador._garantir_thread
+            gravador._garantir_thread = lambda: None
+            for i in range(10):
+                gravador.enfileirar(registro(i))
+            assert gravador.obter_metricas()["descartados"] == 7
+            assert gravador.obter_metricas()["profundidade"] == 3
+
+            gravador._garantir_thread = iniciar
+            gravador._garantir_thread()
+            assert gravador.descarregar(timeout=5)
+            gravador.encerrar()
+
+            gravadas = mensagens(engine_db)[-3:]
+            print(f"{politica}: {gravadas}")
+            assert gravadas == [f"log {i}" for i in esperadas]
+
+        try:
+            GravadorLogs(engine_db=engine_db, politica="ignorar")
+            assert False, "Política inválida deveria falhar"
+        except ValueError:
+            pass
+        engine_db.dispose()
+
+def test_contadores_das_estatisticas():
+    """Testa os contadores por minuto mantidos pelo gravador e a consulta das estatísticas"""
+    print("\n=== Testando Contadores das Estatísticas ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_db = criar_banco(diretorio)
+        logger_teste = VersoZapLogger(engine_db=engine_db)
+
+        for i in range(30):
+            logger_teste.log(LogLevel.INFO, LogCategory.SYSTEM, f"info {i}")
+        for i in range(5):
+            logger_teste.log(LogLevel.ERROR, LogCategory.MESSAGE, f"erro {i}")
+        # Log antigo: conta no total, mas fora da janela de 24h
+        antigo = registro(0)
+        antigo["timestamp"] = (datetime.now() - timedelta(days=3)).isoformat()
+        logger_teste.gravador.enfileirar(antigo)
+        assert logger_teste.gravador.descarregar(timeout=5)
+
+        with engine_db.connect() as conn:
+            buckets = conn.execute(text("SELECT COUNT(*) FROM log_rollups")).scalar()
+        print(f"Buckets por minuto: {buckets}")
+        assert buckets <= 6
+
+        stats = logger_teste.get_stats()
+        print(f"Estatísticas: {stats}")
+        assert stats["total_logs"] == 36
+        assert stats["last_24h_by_level"]["INFO"] == 30
+        assert stats["last_24h_by_level"]["ERROR"] == 5
+        assert stats["last_24h_by_category"]["MESSAGE"] == 5
+        assert stats["last_24h_by_category"]["SYSTEM"] == 30
+        logger_teste.gravador.encerrar()
+        engine_db.dispose()
+
+def test_paginacao_por_cursor():
+    """Testa a paginação por (timestamp, id), os filtros e o uso dos índices compostos"""
+    print("\n=== Testando Paginação por Cursor ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine_db = criar_banco(diretorio)
+        logger_teste = VersoZapLogger(engine_db=engine_db)
+        base = datetime(2026, 1, 10, 12, 0)
+
+        # Timestamps repetidos: o id desempata sem pular nem repetir logs
+        for i in range(25):
+            registro_log = registro(i)
+            registro_log["timestamp"] = (base + timedelta(seconds=i // 3)).isoformat()
+            registro_log["level"] = "ERROR" if i % 5 == 0 else "INFO"
+            registro_log["user_id"] = 7 if i < 10 else None
+            logger_teste.gravador.enfileirar(registro_log)
+        assert logger_teste.gravador.descarregar(timeout=5)
+
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            logs, cursor = logger_teste.consultar_logs(limite=10, cursor=cursor)
+            vistos.extend(log["message"] for log in logs)
+            paginas += 1
+            if cursor is None:
+                break
+        print(f"Páginas: {paginas}")
+        assert paginas == 3
+        assert vistos == [f"log {i}" for i in reversed(range(25))]
+
+        erros, _ = logger_teste.consultar_logs(limite=100, level="ERROR")
+        assert [log["message"] for log in erros] == ["log 20", "log 15", "log 10", "log 5", "log 0"]
+        do_usuario, _ = logger_teste.consultar_logs(limite=100, user_id=7, level="ERROR")
+        assert [log["message"] for log in do_usuario] == ["log 5", "log 0"]
+        intervalo, _ = logger_teste.consultar_logs(
+            limite=100, desde=(base + timedelta(seconds=2)).isoformat(),
+            ate=(base + timedelta(seconds=4)).isoformat()
+        )
+        assert {log["message"] for log in intervalo} == {f"log {i}" for i in range(6, 12)}
+
+        exportados = [log["message"] for log in logger_teste.iterar_logs(tamanho_pagina=4, level="INFO",
+                                                                        crescente=True)]
+        assert exportados == [f"log {i}" for i in range(25) if i % 5]
+
+        try:
+            logger_teste.consultar_logs(cursor="invalido")
+            assert False, "Cursor inválido deveria falhar"
+        except ValueError:
+            pass
+
+        # Erro do banco no meio da exportação: propaga em vez de parecer a última página
+        exportacao = logger_teste.iterar_logs(tamanho_pagina=4, crescente=True)
+        primeiros = [next(exportacao)["message"] for _ in range(4)]
+        assert primeiros == [f"log {i}" for i in range(4)]
+        with engine_db.begin() as conn:
+            conn.execute(text("ALTER TABLE system_logs RENAME TO system_logs_fora"))
+        interrompida = False
+        try:
+            list(exportacao)
+        except Exception:
+            interrompida = True
+        assert interrompida, "Erro do banco deveria interromper a exportação"
+        with engine_db.begin() as conn:
+            conn.execute(text("ALTER TABLE system_logs_fora RENAME TO system_logs"))
+
+        if engine_db.dialect.name == "sqlite":
+            particao = nome_particao(base.date())
+            with engine_db.connect() as conn:
+                plano = " ".join(str(row[-1]) for row in conn.execute(text(
+                    f"EXPLAIN QUERY PLAN SELECT id FROM {particao} WHERE level = 'ERROR' "
+                    "ORDER BY timestamp DESC, id DESC LIMIT 10"
+                )))
+            print(f"Plano: {plano}")
+            assert f"idx_{particao}_level_ts" in plano and "TEMP B-TREE" not in plano
+        logger_teste.gravador.encerrar()
+        engine_db.dispose()
+
+def test_retencao_por_particoes():
+    """Testa a expiração dos logs por partição diária e a limpeza em lotes retomável"""
+    print("\n=== Testando Retenção por Partições ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'logs.db'))
+        todas = manager.get_all_migrations()
+        manager.get_all_migrations = lambda: {k: v for k, v in todas.items() if k < "016"}
+        assert manager.run_migrations()
+        engine_db = manager.engine
+        hoje = datetime.now()
+
+        with engine_db.begin() as conn:
+            # Logs anteriores às partições ficam na tabela de arquivo
+            for level in ("INFO", "ERROR"):
+                conn.execute(text("""
+                    INSERT INTO system_logs (timestamp, level, category, message) VALUES (:ts, :level, 'SYSTEM', 'antigo')
+                """), {"ts": (hoje - timedelta(days=20)).isoformat(), "level": level})
+                conn.execute(text("""
+                    INSERT INTO log_totais (level, category, total) VALUES (:level, 'SYSTEM', 1)
+                """), {"level": level})
+        del manager.get_all_migrations
+        assert manager.run_migrations()
+        logger_teste = VersoZapLogger(engine_db=engine_db)
+
+        for dias, level, quantidade in ((10, "INFO", 5), (10, "ERROR", 2), (5, "INFO", 3), (0, "INFO", 4)):
+            for i in range(quantidade):
+                registro_log = registro(i)
+                registro_log["timestamp"] = (hoje - timedelta(days=dias)).isoformat()
+                registro_log["level"] = level
+                logger_teste.gravador.enfileirar(registro_log)
+        assert logger_teste.gravador.descarregar(timeout=5)
+
+        with engine_db.begin() as conn:
+            conn.execute(text("INSERT INTO usuarios (id, nome, telefone) VALUES (1, 'Ana', '5511900000001')"))
+            for i in range(10):
+                conn.execute(text("INSERT INTO leituras (usuario_id, data, concluido) VALUES (1, :data, TRUE)"),
+                             {"data": hoje - timedelta(days=30)})
+        assert len(listar_particoes(engine_db)) == 3
+        ids_antes = {(log["message"], str(log["timestamp"])): log["id"] for log in logger_teste.iterar_logs(level="ERROR")}
+
+        # Interrompida pelo tempo máximo: a próxima execução continua de onde parou
+        parcial = manager.cleanup_old_data(7, tamanho_lote=2, pausa=0.05, tempo_maximo=0.2)
+        print(f"Parcial: {parcial}")
+        assert parcial["completed"] is False
+        resultado = manager.cleanup_old_data(7, tamanho_lote=2, pausa=0)
+        print(f"Resultado: {resultado}")
+        assert resultado["completed"] is True
+        assert parcial["logs_removed"] + resultado["logs_removed"] == 6
+        assert parcial["partitions_dropped"] + resultado["partitions_dropped"] == 1
+        assert parcial["readings_removed"] + resultado["readings_removed"] == 10
+
+        assert [dia for dia, _ in listar_particoes(engine_db)] == \
+            [(hoje - timedelta(days=5)).date(), hoje.date()]
+        erros, _ = logger_teste.consultar_logs(level="ERROR")
+        assert len(erros) == 3  # os ERRORs da partição expirada foram preservados
+        # Os ids são únicos entre partições e arquivo e não mudam quando o log é arquivado
+        assert {(log["message"], str(log["timestamp"])): log["id"] for log in erros} == ids_antes
+        todos = [log["id"] for log in logger_teste.iterar_logs(tamanho_pagina=3)]
+        assert len(todos) == len(set(todos)) == 10
+        assert logger_teste.get_stats()["total_logs"] == 10
+        with engine_db.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM leituras")).scalar() == 0
+            assert conn.execute(text("SELECT COUNT(*) FROM manutencao_progresso")).scalar() == 0
+        logger_teste.gravador.encerrar()
+        engine_db.dispose()
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DA GRAVAÇÃO DE LOGS VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_gravacao_em_lotes()
+        test_particao_concorrente()
+        test_politicas_de_excesso()
+        test_contadores_das_estatisticas()
+        test_paginacao_por_cursor()
+        test_retencao_por_particoes()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para a fila de mensagens (outbox) do VersoZap
+"""
+
+import sys
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import sessao_escopo
+from banco_teste import url_banco_teste
+from database_manager import DatabaseManager
+from models import Leitura
+from logging_system import versozap_logger
+from message_queue import FilaMensagens
+from whatsapp_sender import DisparadorWhatsApp
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+class DisparadorTeste(DisparadorWhatsApp):
+    """Disparador com sender falso: telefones listados em 'falhar' geram erro"""
+
+    def __init__(self, falhar=()):
+        super().__init__(sender_url="http://sender.invalid", concorrencia=4, max_por_segundo=0)
+        self.falhar = set(falhar)
+        self.enviados = []
+
+    def enviar(self, mensagem):
+        if mensagem["telefone"] in self.falhar:
+            raise RuntimeError("sender indisponível")
+        self.enviados.append(mensagem["telefone"])
+
+class FilaTeste(FilaMensagens):
+
+    def __init__(self, engine_db, falhar=()):
+        super().__init__(engine_db=engine_db, disparador=DisparadorTeste(falhar))
+
+def criar_banco(diretorio):
+    manager = DatabaseManager(url_banco_teste(diretorio, 'fila.db'))
+    assert manager.run_migrations()
+    # Destinatários das mensagens (o PostgreSQL aplica a chave estrangeira de message_queue)
+    with manager.engine.begin() as conn:
+        conn.execute(text("INSERT INTO usuarios (id, nome, telefone) VALUES (:id, :nome, :telefone)"),
+                     [{"id": i, "nome": f"Usuário {i}", "telefone": f"55{i}"} for i in range(200)])
+    return manager.engine
+
+def mensagens(quantidade, prefixo="55"):
+    return [
+        {"usuario_id": i, "telefone": f"{prefixo}{i}", "mensagem": f"Leitura {i}", "audio_path": None}
+        for i in range(quantidade)
+    ]
+
+def test_enfileirar_e_enviar():
+    """Testa o fluxo completo: enfileirar em lote, reivindicar e enviar"""
+    print("=== Testando Enfileiramento e Envio ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fila = FilaTeste(criar_banco(diretorio))
+        assert fila.enfileirar(mensagens(120)) == 120
+
+        total = fila.processar_pendentes()
+        print(f"Resultado: {total}")
+        assert total["enviadas"] == 120
+        assert sorted(fila.disparador.enviados) == sorted(f"55{i}" for i in range(120))
+        assert fila.obter_estatisticas() == {"sent": 120}
+
+        metricas = fila.disparador.obter_metricas()["ultimo_tick"]
+        print(f"Métricas do tick: {metricas}")
+        assert metricas["total"] == 120 and metricas["falhas"] == 0
+        assert metricas["latencia_ms"]["p50"] <= metricas["latencia_ms"]["p99"]
+
+def test_reivindicacao_atomica():
+    """Testa que workers concorrentes nunca reivindicam a mesma mensagem"""
+    print("\n=== Testando Reivindicação Atômica ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        FilaTeste(engine).enfileirar(mensagens(200))
+
+        reivindicadas = []
+        lock = threading.Lock()
+
+        def worker():
+            fila = FilaTeste(engine)
+            while True:
+                lote = fila.reivindicar_lote(limite=7)
+                if not lote:
+                    break
+                with lock:
+                    reivindicadas.extend(m["id"] for m in lote)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        print(f"Mensagens reivindicadas: {len(reivindicadas)}")
+        assert len(reivindicadas) == 200
+        assert len(set(reivindicadas)) == 200
+
+def test_backoff_e_falha_definitiva():
+    """Testa o backoff exponencial persistido e o limite de tentativas"""
+    print("\n=== Testando Backoff ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        fila = FilaTeste(engine, falhar={"550"})
+        fila.enfileirar(mensagens(1))
+
+        atrasos = []
+        for tentativa in range(3):
+            antes = datetime.now()
+            assert fila.processar_lote()["falhas"] == 1
+            with engine.connect() as conn:
+                status, tentativas, agendado = conn.execute(text(
+                    "SELECT status, tentativas, agendado_para FROM message_queue"
+                )).one()
+            atrasos.append((datetime.fromisoformat(str(agendado)) - antes).total_seconds())
+            # Libera a mensagem imediatamente para a próxima tentativa
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE message_queue SET agendado_para = :agora"),
+                             {"agora": datetime.now() - timedelta(seconds=1)})
+
+        print(f"Status final: {status} após {tentativas} tentativas, atrasos {atrasos}")
+        assert status == "failed" and tentativas == 3
+        assert atrasos[0] < atrasos[1]
+        assert fila.processar_lote()["reivindicadas"] == 0
+
+def test_reivindicacao_expirada():
+    """Testa que uma mensagem presa em 'processing' conta tentativas e acaba como 'failed'"""
+    print("\n=== Testando Reivindicação Expirada ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        fila = FilaTeste(engine)
+        fila.enfileirar(mensagens(1))
+
+        # O worker reivindica e morre sem registrar o resultado, três vezes
+        for _ in range(3):
+            assert len(fila.reivindicar_lote()) == 1
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE message_queue SET reivindicado_em = :antigo"),
+                             {"antigo": datetime.now() - timedelta(seconds=fila.timeout_reivindicacao + 1)})
+
+        assert fila.reivindicar_lote() == []
+        with engine.connect() as conn:
+            status, tentativas, erro = conn.execute(text(
+                "SELECT status, tentativas, erro FROM message_queue"
+            )).one()
+        print(f"Status: {status} após {tentativas} tentativas ({erro})")
+        assert status == "failed" and tentativas == 3
+
+def test_outbox_na_transacao():
+    """Testa que leitura e mensagem são gravadas no mesmo commit (ou nenhuma delas)"""
+    print("\n=== Testando Outbox na Transação ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        fila = FilaTeste(engine)
+        fabrica = sessionmaker(bind=engine)
+
+        def registrar_e_enfileirar(falhar):
+            with sessao_escopo(fabrica) as db:
+                db.add(Leitura.registrar(1, {"referencia": "Gênesis 1", "dia": 1}))
+                fila.enfileirar(mensagens(1), conexao=db.connection())
+                if falhar:
+                    raise RuntimeError("falha antes do commit")
+
+        try:
+            registrar_e_enfileirar(falhar=True)
+            assert False, "A falha deveria ser propagada"
+        except RuntimeError:
+            pass
+
+        def contar():
+            with engine.connect() as conn:
+                return (conn.execute(text("SELECT COUNT(*) FROM leituras")).scalar(),
+                        conn.execute(text("SELECT COUNT(*) FROM message_queue")).scalar())
+
+        assert contar() == (0, 0)
+        registrar_e_enfileirar(falhar=False)
+        print(f"Leituras e mensagens: {contar()}")
+        assert contar() == (1, 1)
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DA FILA DE MENSAGENS VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_enfileirar_e_enviar()
+        test_reivindicacao_atomica()
+        test_backoff_e_falha_definitiva()
+        test_reivindicacao_expirada()
+        test_outbox_na_transacao()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para a pré-renderização de leituras do VersoZap
+"""
+
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from banco_teste import url_banco_teste
+from database import sessao_escopo
+from database_manager import DatabaseManager
+from logging_system import versozap_logger
+from audio_cache import audio_cache, gerar_audio_versiculo
+from bible_service import biblia_service
+from models import Usuario, Leitura
+from prerender import PreRenderizador
+from message_queue import FilaMensagens
+import scheduler
+from scheduler import PlanejadorEnvios
+from verse_store import armazem_versiculos
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+def sintetizador_falso(texto, idioma, destino):
+    with open(destino, "wb") as f:
+        f.write(texto.encode("utf-8"))
+
+def test_prerenderizacao():
+    """Testa que as leituras são preparadas uma vez e lidas no envio"""
+    print("=== Testando Pré-renderização ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'prerender.db'))
+        assert manager.run_migrations()
+
+        # Os processos do pool recebem o cache configurado aqui (sintetizador falso, pasta temporária)
+        diretorio_original, sintetizador_original = audio_cache.diretorio, audio_cache.sintetizador
+        audio_cache.diretorio = os.path.join(diretorio, "audios")
+        os.makedirs(audio_cache.diretorio)
+        audio_cache.sintetizador = sintetizador_falso
+        try:
+            # Usuários em pontos diferentes dos planos (inclusive na virada do dia 365)
+            with manager.engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO usuarios (nome, telefone, plano_leitura, versao_biblia, proximo_dia_plano)
+                    VALUES ('Ana', '5511900000001', 'cronologico', 'ARC', 10),
+                           ('Bia', '5511900000002', 'cronologico', 'ARC', 10),
+                           ('Caio', '5511900000003', 'livros', 'NVI', 365)
+                """))
+
+            renderizador = PreRenderizador(engine_db=manager.engine)
+            combinacoes = renderizador.combinacoes(1)
+            print(f"Combinações: {combinacoes}")
+            assert combinacoes == [
+                (1, "livros", "NVI"), (10, "cronologico", "ARC"),
+                (11, "cronologico", "ARC"), (365, "livros", "NVI"),
+            ]
+
+            resumo = renderizador.prerenderizar(dias=1, processos=2)
+            print(f"Resumo: {resumo}")
+            assert resumo["renderizadas"] == len(combinacoes)
+            assert resumo["falhas"] == 0
+
+            # Uma segunda execução não renderiza novamente o que já está pronto
+            assert renderizador.prerenderizar(dias=1, processos=2)["renderizadas"] == 0
+
+            preparada = renderizador.obter_preparada(10, "cronologico", "ARC")
+            assert preparada is not None
+            leitura_info, caminho_audio = preparada
+            print(f"Leitura preparada: {leitura_info['referencia']}")
+            assert os.path.exists(caminho_audio)
+            assert renderizador.leitura_com_audio("cronologico", "ARC", 10) == preparada
+
+            # A leitura registrada guarda a referência estruturada usada no reenvio
+            registrada = Leitura.registrar(1, leitura_info)
+            assert (registrada.dia_plano, registrada.plano, registrada.versao) == (10, "cronologico", "ARC")
+            # O reenvio reconstrói pelos intervalos o mesmo texto e, portanto, o mesmo áudio
+            reenvio = biblia_service.obter_leitura_dos_intervalos(
+                json.loads(registrada.intervalos), registrada.versao, registrada.trecho
+            )
+            assert reenvio["texto"] == leitura_info["texto"]
+            assert gerar_audio_versiculo(reenvio["texto"]) == caminho_audio
+
+            # Nova importação de versão: o que foi preparado antes deixa de valer
+            geracao_original = armazem_versiculos.obter_geracao
+            armazem_versiculos.obter_geracao = lambda: geracao_original() + 1
+            try:
+                assert renderizador.obter_preparada(10, "cronologico", "ARC") is None
+                assert renderizador.prerenderizar(dias=1, processos=2)["renderizadas"] == len(combinacoes)
+                assert renderizador.obter_preparada(10, "cronologico", "ARC") is not None
+            finally:
+                armazem_versiculos.obter_geracao = geracao_original
+            assert renderizador.obter_preparada(10, "cronologico", "ARC") is None
+        finally:
+            audio_cache.diretorio, audio_cache.sintetizador = diretorio_original, sintetizador_original
+
+def test_progresso_do_plano():
+    """Testa o preenchimento do progresso na migration e o reinício ao trocar de plano"""
+    print("\n=== Testando Progresso no Plano ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'progresso.db'))
+        todas = manager.get_all_migrations()
+
+        # Banco anterior à migration, com leituras já concluídas
+        manager.get_all_migrations = lambda: {k: v for k, v in todas.items() if k != "012_add_plan_progress"}
+        assert manager.run_migrations()
+        with manager.engine.begin() as conn:
+            conn.execute(text("INSERT INTO usuarios (id, nome, telefone) VALUES (1, 'Ana', '5511900000001')"))
+            conn.execute(text("""
+                INSERT INTO leituras (usuario_id, trecho, concluido)
+                VALUES (1, 'Gênesis 1', TRUE), (1, 'Gênesis 2', TRUE), (1, 'Gênesis 3', FALSE)
+            """))
+
+        del manager.get_all_migrations
+        assert manager.run_migrations()
+        with manager.engine.connect() as conn:
+            proximo, iniciado = conn.execute(text(
+                "SELECT proximo_dia_plano, plano_iniciado_em FROM usuarios WHERE id = 1"
+            )).one()
+        print(f"Próximo dia após a migration: {proximo}")
+        assert proximo == 3
+        assert iniciado is not None
+
+    usuario = Usuario(plano_leitura="cronologico")
+    usuario.proximo_dia_plano = 42
+    usuario.plano_leitura = "cronologico"
+    assert usuario.proximo_dia_plano == 42
+    usuario.plano_leitura = "livros"
+    assert usuario.proximo_dia_plano == 1
+
+def test_confirmacao_de_leituras_do_mesmo_dia():
+    """Testa que confirmar duas leituras pendentes do mesmo dia avança o plano uma única vez"""
+    print("\n=== Testando Confirmação de Leituras do Mesmo Dia ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'confirmacao.db'))
+        assert manager.run_migrations()
+        with manager.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO usuarios (id, nome, telefone, plano_leitura, proximo_dia_plano)
+                VALUES (1, 'Ana', '5511900000001', 'cronologico', 10)
+            """))
+
+        fabrica = sessionmaker(bind=manager.engine)
+        with sessao_escopo(fabrica) as db:
+            # Sem confirmação, o scheduler envia o mesmo dia de novo na manhã seguinte
+            leituras = [Leitura.registrar(1, {"referencia": "Dia 10", "dia": 10, "plano": "cronologico"})
+                        for _ in range(2)]
+            db.add_all(leituras)
+            db.flush()
+            ids = [leitura.id for leitura in leituras]
+
+        def proximo_dia():
+            with sessao_escopo(fabrica) as db:
+                return db.query(Usuario.proximo_dia_plano).filter(Usuario.id == 1).scalar()
+
+        for id_leitura in ids + ids:
+            with sessao_escopo(fabrica) as db:
+                assert Leitura.confirmar(db, id_leitura) == 1
+            print(f"Confirmada {id_leitura}: próximo dia {proximo_dia()}")
+            assert proximo_dia() == 11
+
+        with sessao_escopo(fabrica) as db:
+            assert Leitura.confirmar(db, 999) is None
+            assert db.query(Leitura).filter(Leitura.concluido.is_(True)).count() == 2
+
+            # Último dia do plano volta para o primeiro
+            db.query(Usuario).filter(Usuario.id == 1).update({Usuario.proximo_dia_plano: 365})
+            ultima = Leitura.registrar(1, {"referencia": "Dia 365", "dia": 365, "plano": "cronologico"})
+            db.add(ultima)
+            db.flush()
+            Leitura.confirmar(db, ultima.id)
+        assert proximo_dia() == 1
+        manager.engine.dispose()
+
+def test_envios_sem_confirmacao():
+    """Testa que quem não confirma recebe o mesmo dia até o limite e depois segue o plano"""
+    print("\n=== Testando Envios sem Confirmação ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = DatabaseManager(url_banco_teste(diretorio, 'sem_confirmacao.db'))
+        assert manager.run_migrations()
+        with manager.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO usuarios (id, nome, telefone, plano_leitura, minuto_envio, proximo_dia_plano)
+                VALUES (1, 'Ana', '5511900000001', 'cronologico', 480, 10)
+            """))
+
+        class LeiturasFalsas:
+            def leitura_com_audio(self, plano, versao, dia):
+                return {"referencia": f"Dia {dia}", "texto": f"Dia {dia}", "dia": dia,
+                        "plano": plano, "versao": versao}, None
+
+        fabrica = sessionmaker(bind=manager.engine)
+        originais = (scheduler.sessao_escopo, scheduler.planejador_envios,
+                     scheduler.fila_mensagens, scheduler.pre_renderizador)
+        scheduler.sessao_escopo = lambda: sessao_escopo(fabrica)
+        scheduler.planejador_envios = PlanejadorEnvios(engine_db=manager.engine)
+        scheduler.fila_mensagens = FilaMensagens(engine_db=manager.engine)
+        scheduler.pre_renderizador = LeiturasFalsas()
+        os.environ["BIBLE_PLAN_MAX_UNCONFIRMED"] = "3"
+
+        def enviar():
+            scheduler.enviar_leituras_dos_slots([datetime(2025, 1, 1, 8, 0)])
+            with sessao_escopo(fabrica) as db:
+                ultima = db.query(Leitura).order_by(Leitura.id.desc()).first()
+                return ultima.id, ultima.dia_plano
+
+        try:
+            dias = [enviar()[1] for _ in range(5)]
+            print(f"Dias enviados sem confirmação: {dias}")
+            assert dias == [10, 10, 10, 11, 11]
+
+            # Confirmar segue do dia confirmado e zera a contagem
+            id_leitura, _ = enviar()
+            with sessao_escopo(fabrica) as db:
+                Leitura.confirmar(db, id_leitura)
+            assert [enviar()[1] for _ in range(4)] == [12, 12, 12, 13]
+
+            # Com limite 0 o ponteiro só anda com a confirmação
+            os.environ["BIBLE_PLAN_MAX_UNCONFIRMED"] = "0"
+            assert {enviar()[1] for _ in range(5)} == {13}
+        finally:
+            del os.environ["BIBLE_PLAN_MAX_UNCONFIRMED"]
+            (scheduler.sessao_escopo, scheduler.planejador_envios,
+             scheduler.fila_mensagens, scheduler.pre_renderizador) = originais
+        manager.engine.dispose()
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DA PRÉ-RENDERIZAÇÃO VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_prerenderizacao()
+        test_progresso_do_plano()
+        test_confirmacao_de_leituras_do_mesmo_dia()
+        test_envios_sem_confirmacao()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para o cache de respostas de leitura do VersoZap
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bible_service import BibliaService
+from bible_importer import ImportadorBiblia
+from reading_cache import CacheLeituras
+from verse_store import ArmazemVersiculos
+
+def test_hits_e_invalidacao():
+    """Testa que cada resposta é montada uma vez e descartada ao importar uma versão"""
+    print("=== Testando Cache de Leituras ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        armazem = ArmazemVersiculos(caminho=os.path.join(diretorio, "biblia.db"))
+        cache = CacheLeituras(
+            servico=BibliaService(armazem=armazem), armazem=armazem, intervalo_verificacao=0
+        )
+
+        corpos = [cache.obter(1, "canonico", "ARC") for _ in range(10)]
+        assert len(set(corpos)) == 1
+        assert json.loads(corpos[0])["leitura"]["referencia"] == "Gênesis 1-3"
+        assert cache.obter(1, "canonico", "XYZ") is None
+        assert cache.obter(1, "inexistente", "ARC") is None
+
+        estatisticas = cache.obter_estatisticas()
+        print(f"Estatísticas: {estatisticas}")
+        assert estatisticas["hits"] == 9
+        assert estatisticas["misses"] == 1
+        assert estatisticas["entradas"] == 1
+
+        # Importar uma versão incrementa a geração e descarta as respostas
+        caminho = os.path.join(diretorio, "obadias.jsonl")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for v in range(1, 22):
+                arquivo.write(json.dumps({"livro": "OBA", "capitulo": 1, "versiculo": v, "texto": "t"}) + "\n")
+        ImportadorBiblia(armazem=armazem).importar("ACF", "Almeida Corrigida Fiel", [caminho], parcial=True)
+
+        cache.obter(1, "canonico", "ARC")
+        estatisticas = cache.obter_estatisticas()
+        print(f"Após importação: {estatisticas}")
+        assert estatisticas["invalidacoes"] == 1
+        assert estatisticas["misses"] == 2
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DO CACHE DE LEITURAS VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_hits_e_invalidacao()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
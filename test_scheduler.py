@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de teste para o scheduler do VersoZap (lease e espalhamento de picos)
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+# Adiciona o diretório atual ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from banco_teste import url_banco_teste
+from database_manager import DatabaseManager
+from logging_system import versozap_logger
+from models import Usuario
+import scheduler
+from scheduler import SchedulerLease, PlanejadorEnvios, minutos_pendentes
+
+# Os testes não devem gravar logs no banco real
+versozap_logger.db_logging_enabled = False
+
+def criar_banco(diretorio):
+    manager = DatabaseManager(url_banco_teste(diretorio, 'scheduler.db'))
+    assert manager.run_migrations()
+    return manager.engine
+
+def test_um_dono_por_tick():
+    """Testa que apenas um processo executa cada tick"""
+    print("=== Testando Dono Único por Tick ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        worker_a = SchedulerLease("envio", engine_db=engine, ttl_segundos=120)
+        worker_b = SchedulerLease("envio", engine_db=engine, ttl_segundos=120)
+        agora = datetime(2025, 1, 1, 8, 0, 10)
+
+        assert worker_a.reivindicar_tick("2025-01-01 08:00", agora) == ""
+        assert worker_b.reivindicar_tick("2025-01-01 08:00", agora) is None
+        # Mesmo o dono não executa o mesmo tick duas vezes
+        assert worker_a.reivindicar_tick("2025-01-01 08:00", agora) is None
+
+        # Enquanto o lease do dono estiver válido, o outro worker não assume
+        agora += timedelta(minutes=1)
+        assert worker_b.reivindicar_tick("2025-01-01 08:01", agora) is None
+        assert worker_a.reivindicar_tick("2025-01-01 08:01", agora) == "2025-01-01 08:00"
+        print(f"Status: {worker_a.obter_status()}")
+
+def test_failover():
+    """Testa que outro processo assume quando o dono para de renovar o lease"""
+    print("\n=== Testando Failover ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        worker_a = SchedulerLease("envio", engine_db=engine, ttl_segundos=120)
+        worker_b = SchedulerLease("envio", engine_db=engine, ttl_segundos=120)
+        agora = datetime(2025, 1, 1, 8, 0, 10)
+
+        assert worker_a.reivindicar_tick("2025-01-01 08:00", agora) == ""
+
+        # worker_a morre; após o TTL o worker_b assume e recebe o último tick executado
+        agora += timedelta(minutes=3)
+        anterior = worker_b.reivindicar_tick("2025-01-01 08:03", agora)
+        print(f"Último tick antes do failover: {anterior}")
+        assert anterior == "2025-01-01 08:00"
+        assert minutos_pendentes(anterior, agora, limite=15) == [
+            datetime(2025, 1, 1, 8, minuto) for minuto in (1, 2, 3)
+        ]
+        assert worker_b.obter_status()["sou_dono"]
+
+        # Liberação explícita permite failover imediato
+        worker_b.liberar()
+        agora += timedelta(minutes=1)
+        assert worker_a.reivindicar_tick("2025-01-01 08:04", agora) == "2025-01-01 08:03"
+
+def test_tick_desfeito_em_falha():
+    """Testa que os minutos de um tick que falhou são recuperados no tick seguinte"""
+    print("\n=== Testando Tick Desfeito em Falha ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        lease = SchedulerLease("envio", engine_db=engine, ttl_segundos=120)
+        inicio = datetime.now() - timedelta(minutes=2)
+        assert lease.reivindicar_tick(inicio.strftime("%Y-%m-%d %H:%M"), inicio) == ""
+
+        enviados = []
+        def falhar(minutos):
+            raise RuntimeError("banco indisponível")
+
+        originais = scheduler.lease_envio, scheduler.enviar_leituras_dos_slots
+        scheduler.lease_envio = lease
+        try:
+            scheduler.enviar_leituras_dos_slots = falhar
+            try:
+                scheduler.enviar_leitura_diaria()
+                assert False, "A falha deveria ser propagada"
+            except RuntimeError:
+                pass
+            assert lease.obter_status()["ultimo_tick"] == inicio.strftime("%Y-%m-%d %H:%M")
+
+            scheduler.enviar_leituras_dos_slots = enviados.extend
+            scheduler.enviar_leitura_diaria()
+        finally:
+            scheduler.lease_envio, scheduler.enviar_leituras_dos_slots = originais
+
+        print(f"Minutos recuperados: {enviados}")
+        assert enviados[0] == inicio.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        assert len(enviados) >= 2
+
+def test_minutos_pendentes():
+    """Testa o cálculo dos minutos a recuperar"""
+    print("\n=== Testando Minutos Pendentes ===")
+
+    agora = datetime(2025, 1, 2, 0, 1, 30)
+    hhmm = lambda minutos: [minuto.strftime("%m-%d %H:%M") for minuto in minutos]
+    assert hhmm(minutos_pendentes("", agora, limite=15)) == ["01-02 00:01"]
+    # Minutos de antes da meia-noite mantêm a própria data
+    assert hhmm(minutos_pendentes("2025-01-01 23:59", agora, limite=15)) == ["01-02 00:00", "01-02 00:01"]
+    assert hhmm(minutos_pendentes("2024-12-31 08:00", agora, limite=3)) == [
+        "01-01 23:59", "01-02 00:00", "01-02 00:01"
+    ]
+
+def test_espalhamento_de_picos():
+    """Testa que slots lotados são espalhados sem perder nem duplicar usuários"""
+    print("\n=== Testando Espalhamento de Picos ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO usuarios (nome, telefone, horario_envio, minuto_envio, deslocamento_envio)
+                VALUES (:nome, :telefone, :horario, :minuto, :deslocamento)
+            """), [
+                {"nome": f"u{i}", "telefone": f"55{i}", "horario": "08:00", "minuto": 480,
+                 "deslocamento": (i * 7919) % 1000}
+                for i in range(1200)
+            ] + [
+                {"nome": f"v{i}", "telefone": f"66{i}", "horario": "08:01", "minuto": 481,
+                 "deslocamento": i}
+                for i in range(10)
+            ])
+
+        planejador = PlanejadorEnvios(engine_db=engine, capacidade=500, janela_max=30)
+        print(f"Plano do dia: {planejador.plano_do_dia()}")
+        assert planejador.plano_do_dia() == {480: 3}
+
+        db = sessionmaker(bind=engine)()
+        enviados = []
+        hoje = datetime.combine(date.today(), datetime.min.time())
+        for minuto in range(478, 486):
+            ids = [row.id for row in db.query(Usuario.id).filter(
+                planejador.filtro_dos_minutos([hoje + timedelta(minutes=minuto)])
+            )]
+            print(f"Minuto {minuto}: {len(ids)} usuário(s)")
+            assert len(ids) <= 500 + 10
+            enviados.extend(ids)
+        db.close()
+
+        assert len(enviados) == 1210
+        assert len(set(enviados)) == 1210
+
+        # A carga muda durante a janela e outro processo assume: o plano gravado do dia vale
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO usuarios (nome, telefone, horario_envio, minuto_envio, deslocamento_envio)
+                VALUES (:nome, :telefone, '08:00', 480, :deslocamento)
+            """), [{"nome": f"w{i}", "telefone": f"77{i}", "deslocamento": i % 1000} for i in range(1000)])
+        novo_dono = PlanejadorEnvios(engine_db=engine, capacidade=500, janela_max=30)
+        assert novo_dono.plano_do_dia() == {480: 3}
+        amanha = date.today() + timedelta(days=1)
+        assert novo_dono.plano_do_dia(amanha) == {480: 5}
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM usuarios WHERE nome LIKE 'w%'"))
+
+        histograma = planejador.histograma()
+        efetivos = {m["horario"]: m["efetivos"] for m in histograma["minutos"]}
+        print(f"Histograma efetivo: {efetivos}")
+        assert sum(efetivos.values()) == 1210
+        assert max(efetivos.values()) <= 510
+
+def test_janela_na_virada_do_dia():
+    """Testa que a janela que passa da meia-noite segue o plano do dia em que começou"""
+    print("\n=== Testando Janela na Virada do Dia ===")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = criar_banco(diretorio)
+        def inserir(prefixo, quantidade):
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO usuarios (nome, telefone, horario_envio, minuto_envio, deslocamento_envio)
+                    VALUES (:nome, :telefone, '23:55', 1435, :deslocamento)
+                """), [{"nome": f"{prefixo}{i}", "telefone": f"{prefixo}{i}", "deslocamento": (i * 7919) % 1000}
+                       for i in range(quantidade)])
+
+        planejador = PlanejadorEnvios(engine_db=engine, capacidade=100, janela_max=30)
+        inserir("55", 1200)
+        dia = date(2025, 1, 1)
+        assert planejador.plano_do_dia(dia) == {1435: 12}
+        # A carga cresce: o dia seguinte tem uma janela maior, mas a de 23:55 do dia 1 não muda
+        inserir("66", 800)
+        assert planejador.plano_do_dia(dia + timedelta(days=1)) == {1435: 20}
+
+        db = sessionmaker(bind=engine)()
+        enviados = {}
+        instante = datetime(2025, 1, 1, 23, 50)
+        while instante < datetime(2025, 1, 2, 0, 15):
+            ids = [row.id for row in db.query(Usuario.id).filter(planejador.filtro_dos_minutos([instante]))]
+            enviados[instante.strftime("%d %H:%M")] = ids
+            instante += timedelta(minutes=1)
+        db.close()
+
+        por_minuto = {minuto: len(ids) for minuto, ids in enviados.items() if ids}
+        print(f"Envios por minuto: {por_minuto}")
+        todos = [id_usuario for ids in enviados.values() for id_usuario in ids]
+        assert len(todos) == len(set(todos)) == 2000
+        assert sorted(por_minuto) == [f"01 23:{m}" for m in range(55, 60)] + [f"02 00:0{m}" for m in range(7)]
+
+def main():
+    """Executa todos os testes"""
+    print("INICIANDO TESTES DO SCHEDULER VERSOZAP")
+    print("=" * 50)
+
+    try:
+        test_um_dono_por_tick()
+        test_failover()
+        test_tick_desfeito_em_falha()
+        test_minutos_pendentes()
+        test_espalhamento_de_picos()
+        test_janela_na_virada_do_dia()
+
+        print("\nTODOS OS TESTES CONCLUIDOS COM SUCESSO!")
+
+    except Exception as e:
+        print(f"\nERRO DURANTE OS TESTES: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Armazém de versículos da Bíblia para VersoZap
+Os versículos ficam numa tabela SQLite própria (BIBLE_DB_PATH), ordenada por
+(versão, id do versículo). O id codifica livro/capítulo/versículo em um inteiro,
+então uma passagem contínua é um único intervalo do índice. O arquivo é lido via
+mmap: os workers compartilham as páginas do cache do sistema operacional.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from bible_data import LIVROS_BIBLIA, NUMERO_LIVRO, CODIGO_LIVRO, VERSOES_BIBLIA
+
+def codificar_versiculo(livro, capitulo, versiculo):
+    """Id inteiro do versículo: livro * 1.000.000 + capítulo * 1.000 + versículo"""
+    return livro * 1_000_000 + capitulo * 1_000 + versiculo
+
+def decodificar_versiculo(vid):
+    """Retorna (livro, capítulo, versículo) de um id de versículo"""
+    return vid // 1_000_000, vid // 1_000 % 1_000, vid % 1_000
+
+def numero_do_livro(livro):
+    """Número do livro (1-66) a partir do número, nome em português ou código USFM; None se desconhecido"""
+    if isinstance(livro, int) or str(livro).strip().isdigit():
+        numero = int(livro)
+        return numero if 1 <= numero <= len(LIVROS_BIBLIA) else None
+    livro = str(livro).strip()
+    return NUMERO_LIVRO.get(livro) or CODIGO_LIVRO.get(livro.upper())
+
+_TERMO_BUSCA = re.compile(r'"([^"]*)"|(\S+)')
+
+def montar_consulta_fts(consulta):
+    """
+    Converte a consulta do usuário numa expressão FTS5: palavras viram termos
+    obrigatórios, "entre aspas" vira frase e palavra* vira prefixo
+
+    Returns:
+        str ou None se não sobrar nenhum termo
+    """
+    termos = []
+    for frase, palavra in _TERMO_BUSCA.findall(consulta or ""):
+        prefixo = bool(palavra) and palavra.endswith("*")
+        # Apenas letras e números chegam ao FTS (sem operadores nem sintaxe de coluna)
+        texto = " ".join(re.findall(r"\w+", frase or palavra))
+        if texto:
+            termos.append(f'"{texto}"' + ("*" if prefixo else ""))
+    return " ".join(termos) or None
+
+def versiculos_no_capitulo(livro, capitulo):
+    """Quantidade de versículos de um capítulo ou None se não existir"""
+    if not 1 <= livro <= len(LIVROS_BIBLIA):
+        return None
+    versiculos = LIVROS_BIBLIA[livro - 1]["versiculos"]
+    if not 1 <= capitulo <= len(versiculos):
+        return None
+    return versiculos[capitulo - 1]
+
+_REFERENCIA = re.compile(r"^\s*(.+?)\s+(\d+)(?::(\d+)(?:-(\d+))?)?\s*$")
+
+def analisar_referencia(referencia):
+    """
+    Converte uma referência (ex: "Gênesis 24:1-67", "João 3:16", "Salmos 23")
+    em (livro, capítulo, versículo inicial, versículo final)
+
+    Returns:
+        tuple ou None se a referência for inválida
+    """
+    encontrado = _REFERENCIA.match(referencia or "")
+    if not encontrado:
+        return None
+
+    nome, capitulo, inicio, fim = encontrado.groups()
+    livro = NUMERO_LIVRO.get(nome)
+    capitulo = int(capitulo)
+    total = versiculos_no_capitulo(livro, capitulo) if livro else None
+    if total is None:
+        return None
+
+    inicio = int(inicio) if inicio else 1
+    fim = int(fim) if fim else (inicio if encontrado.group(3) else total)
+    if not 1 <= inicio <= fim <= total:
+        return None
+    return livro, capitulo, inicio, fim
+
+class ArmazemVersiculos:
+
+    def __init__(self, caminho=None, mmap_bytes=None):
+        self.caminho = caminho or os.getenv("BIBLE_DB_PATH", "biblia.db")
+        self.mmap_bytes = mmap_bytes if mmap_bytes is not None else \
+            int(os.getenv("BIBLE_DB_MMAP_MB", "256")) * 1024 * 1024
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pronto = False
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_bytes)}")
+        return conn
+
+    def conexao_escrita(self):
+        """Nova conexão de escrita (importações); o chamador deve fechá-la"""
+        self.garantir_esquema()
+        return self._conectar()
+
+    def _conexao(self):
+        """Conexão de leitura por thread (reaberta após fork)"""
+        self.garantir_esquema()
+        atual = getattr(self._local, "conexao", None)
+        if atual is None or atual[0] != os.getpid():
+            conn = self._conectar()
+            conn.execute("PRAGMA query_only = 1")
+            self._local.conexao = atual = (os.getpid(), conn)
+        return atual[1]
+
+    def garantir_esquema(self):
+        """Cria a tabela de versículos e semeia os versículos de exemplo se estiver vazia"""
+        if self._pronto:
+            return
+        with self._lock:
+            if self._pronto:
+                return
+            conn = self._conectar()
+            try:
+                # WAL: leitores continuam atendendo enquanto uma versão é importada
+                conn.execute("PRAGMA journal_mode = WAL")
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS versiculos (
+                            versao TEXT NOT NULL,
+                            vid INTEGER NOT NULL,
+                            texto TEXT NOT NULL,
+                            PRIMARY KEY (versao, vid)
+                        ) WITHOUT ROWID
+                    """)
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS versoes (
+                            codigo TEXT PRIMARY KEY,
+                            nome TEXT NOT NULL,
+                            versiculos INTEGER NOT NULL,
+                            fonte TEXT,
+                            geracao INTEGER NOT NULL,
+                            importado_em TIMESTAMP
+                        )
+                    """)
+                    # Índice invertido para a busca; remove_diacritics ignora acentos
+                    conn.execute("""
+                        CREATE VIRTUAL TABLE IF NOT EXISTS versiculos_busca USING fts5(
+                            texto, versao, livro, vid UNINDEXED,
+                            tokenize = 'unicode61 remove_diacritics 2'
+                        )
+                    """)
+                    if conn.execute("SELECT 1 FROM versiculos LIMIT 1").fetchone() is None:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO versiculos (versao, vid, texto) VALUES (?, ?, ?)",
+                            self._versiculos_de_exemplo()
+                        )
+                    if conn.execute("SELECT 1 FROM versiculos_busca LIMIT 1").fetchone() is None:
+                        self.reindexar_busca(conn)
+            finally:
+                conn.close()
+            self._pronto = True
+
+    @staticmethod
+    def reindexar_busca(conn):
+        """
+        Reconstrói o índice de busca dentro da transação de 'conn'. As linhas entram
+        em ordem canônica (versículo, versão), então a ordem do rowid já é a ordem
+        dos resultados e a busca para assim que tiver o suficiente.
+        """
+        conn.execute("DELETE FROM versiculos_busca")
+        conn.execute("""
+            INSERT INTO versiculos_busca (texto, versao, livro, vid)
+            SELECT texto, versao, 'L' || (vid / 1000000), vid FROM versiculos
+            WHERE versao NOT LIKE '%.__importando'
+            ORDER BY vid, versao
+        """)
+
+    @staticmethod
+    def _versiculos_de_exemplo():
+        for versao, dados in VERSOES_BIBLIA.items():
+            for referencia, texto in dados["versos"].items():
+                analisada = analisar_referencia(referencia)
+                if analisada:
+                    livro, capitulo, versiculo, _ = analisada
+                    yield versao, codificar_versiculo(livro, capitulo, versiculo), texto
+
+    def intervalo(self, versao, vid_inicio, vid_fim):
+        """Versículos [(vid, texto)] de uma versão entre dois ids, numa única busca no índice"""
+        return self._conexao().execute(
+            "SELECT vid, texto FROM versiculos WHERE versao = ? AND vid BETWEEN ? AND ? ORDER BY vid",
+            (versao, vid_inicio, vid_fim)
+        ).fetchall()
+
+    def intervalo_versoes(self, versoes, vid_inicio, vid_fim):
+        """Versículos [(vid, versao, texto)] de várias versões entre dois ids, numa única consulta"""
+        marcadores = ", ".join("?" * len(versoes))
+        return self._conexao().execute(
+            f"SELECT vid, versao, texto FROM versiculos WHERE versao IN ({marcadores}) "
+            "AND vid BETWEEN ? AND ? ORDER BY vid",
+            (*versoes, vid_inicio, vid_fim)
+        ).fetchall()
+
+    def passagem(self, versao, livro, capitulo, versiculo_inicio, versiculo_fim):
+        """Versículos de um trecho de capítulo; None se a versão não tiver o trecho completo"""
+        versiculos = self.intervalo(
+            versao,
+            codificar_versiculo(livro, capitulo, versiculo_inicio),
+            codificar_versiculo(livro, capitulo, versiculo_fim),
+        )
+        if len(versiculos) != versiculo_fim - versiculo_inicio + 1:
+            return None
+        return versiculos
+
+    def buscar(self, consulta, versao=None, livro=None, limite=20, deslocamento=0):
+        """
+        Busca versículos por palavras, frases ("...") ou prefixos (palavra*)
+
+        Args:
+            consulta (str): Texto da busca (acentos e maiúsculas são ignorados)
+            versao (str): Restringe a uma versão
+            livro (int): Restringe a um livro (1-66)
+
+        Returns:
+            list: [(versao, vid, texto, trecho destacado)] em ordem canônica
+        """
+        expressao = montar_consulta_fts(consulta)
+        if not expressao:
+            return []
+        # Versão e livro também são colunas indexadas: o filtro acontece no próprio índice
+        expressao = "texto : (" + expressao + ")"
+        if versao:
+            expressao += ' AND versao : "' + versao.replace('"', '') + '"'
+        if livro:
+            expressao += f' AND livro : "L{int(livro)}"'
+
+        return self._conexao().execute("""
+            SELECT versao, vid, texto, highlight(versiculos_busca, 0, '*', '*')
+            FROM versiculos_busca WHERE versiculos_busca MATCH ?
+            ORDER BY rowid LIMIT ? OFFSET ?
+        """, (expressao, limite, deslocamento)).fetchall()
+
+    def palavras_por_capitulo(self, versao):
+        """Quantidade de palavras de cada capítulo de uma versão: {(livro, capítulo): palavras}"""
+        resultado = self._conexao().execute("""
+            SELECT vid / 1000 AS capitulo,
+                   SUM(LENGTH(TRIM(texto)) - LENGTH(REPLACE(TRIM(texto), ' ', '')) + 1)
+            FROM versiculos WHERE versao = ? GROUP BY vid / 1000
+        """, (versao,))
+        return {(capitulo // 1000, capitulo % 1000): palavras for capitulo, palavras in resultado}
+
+    def obter_geracao(self):
+        """Contador incrementado a cada versão importada (invalidação de caches)"""
+        return self._conexao().execute("SELECT COALESCE(MAX(geracao), 0) FROM versoes").fetchone()[0]
+
+    def versoes_importadas(self):
+        """Metadados das versões importadas"""
+        cursor = self._conexao().execute(
+            "SELECT codigo, nome, versiculos, fonte, geracao, importado_em FROM versoes ORDER BY codigo"
+        )
+        colunas = [c[0] for c in cursor.description]
+        return [dict(zip(colunas, row)) for row in cursor.fetchall()]
+
+    def contar(self, versao=None):
+        """Quantidade de versículos armazenados (por versão ou no total)"""
+        if versao:
+            return self._conexao().execute(
+                "SELECT COUNT(*) FROM versiculos WHERE versao = ?", (versao,)
+            ).fetchone()[0]
+        return self._conexao().execute("SELECT COUNT(*) FROM versiculos").fetchone()[0]
+
+# Instância global do armazém
+armazem_versiculos = ArmazemVersiculos()
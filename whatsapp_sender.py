@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Disparador de mensagens para o serviço de WhatsApp (SENDER_URL)
+Envia lotes em paralelo com concorrência e taxa limitadas, sessão HTTP com
+keep-alive e métricas de vazão/latência por tick
+"""
+
+import os
+import time
+import threading
+import requests
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+def percentil(valores_ordenados, p):
+    """Percentil pelo método nearest-rank (lista já ordenada)"""
+    if not valores_ordenados:
+        return None
+    indice = max(0, min(len(valores_ordenados) - 1, int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+class LimitadorTaxa:
+    """Espaça os envios para no máximo 'por_segundo' por segundo entre todas as threads"""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo and por_segundo > 0 else 0
+        self._proximo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            horario = max(self._proximo, agora)
+            self._proximo = horario + self.intervalo
+        if horario > agora:
+            time.sleep(horario - agora)
+
+class DisparadorWhatsApp:
+
+    def __init__(self, sender_url=None, concorrencia=None, timeout_conexao=None, timeout_leitura=None,
+                 max_por_segundo=None):
+        self.sender_url = sender_url or os.getenv("SENDER_URL")
+        self.concorrencia = concorrencia or int(os.getenv("SENDER_CONCURRENCY", "16"))
+        # Limite por processo (0 = sem limite)
+        self.limitador = LimitadorTaxa(
+            max_por_segundo if max_por_segundo is not None else float(os.getenv("SENDER_MAX_PER_SECOND", "20"))
+        )
+        self.timeout = (
+            timeout_conexao or float(os.getenv("SENDER_CONNECT_TIMEOUT", "5")),
+            timeout_leitura or float(os.getenv("SENDER_TIMEOUT", "30")),
+        )
+
+        # Pool de conexões do tamanho da concorrência: uma conexão keep-alive por worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concorrencia)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concorrencia,
+            thread_name_prefix="whatsapp-sender",
+        )
+        self.historico = deque(maxlen=int(os.getenv("SENDER_METRICS_HISTORY", "60")))
+        self._tick_local = threading.local()
+
+    def enviar(self, mensagem):
+        """Envia uma mensagem ao sender; lança exceção em caso de falha"""
+        response = self.session.post(
+            self.sender_url,
+            json={
+                "telefone": mensagem["telefone"],
+                "mensagem": mensagem["mensagem"],
+                "audio": mensagem.get("audio_path"),
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+    def _enviar_medindo(self, mensagem):
+        self.limitador.aguardar()
+        inicio = time.perf_counter()
+        try:
+            self.enviar(mensagem)
+            return None, time.perf_counter() - inicio
+        except Exception as e:
+            return e, time.perf_counter() - inicio
+
+    def enviar_lote(self, mensagens):
+        """
+        Envia as mensagens em paralelo (até 'concorrencia' simultâneas)
+
+        Returns:
+            tuple: (mensagens enviadas, lista de (mensagem, erro))
+        """
+        enviadas, falhas = [], []
+        resultados = self.executor.map(self._enviar_medindo, mensagens)
+
+        tick = getattr(self._tick_local, "atual", None)
+        for mensagem, (erro, latencia) in zip(mensagens, resultados):
+            if erro is None:
+                enviadas.append(mensagem)
+            else:
+                falhas.append((mensagem, erro))
+            if tick is not None:
+                tick["latencias"].append(latencia)
+
+        if tick is not None:
+            tick["falhas"] += len(falhas)
+        return enviadas, falhas
+
+    @contextmanager
+    def tick(self):
+        """Agrupa os lotes enviados dentro do bloco em uma única métrica de tick"""
+        self._tick_local.atual = {"latencias": [], "falhas": 0, "inicio": time.perf_counter()}
+        try:
+            yield
+        finally:
+            tick = self._tick_local.atual
+            self._tick_local.atual = None
+            if tick["latencias"]:
+                self.historico.append(self._resumir_tick(tick))
+
+    def _resumir_tick(self, tick):
+        duracao = time.perf_counter() - tick["inicio"]
+        latencias = sorted(tick["latencias"])
+        total = len(latencias)
+
+        def em_ms(valor):
+            return round(valor * 1000, 1) if valor is not None else None
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "total": total,
+            "enviadas": total - tick["falhas"],
+            "falhas": tick["falhas"],
+            "duracao_s": round(duracao, 3),
+            "vazao_msg_s": round(total / duracao, 2) if duracao > 0 else None,
+            "latencia_ms": {
+                "p50": em_ms(percentil(latencias, 50)),
+                "p90": em_ms(percentil(latencias, 90)),
+                "p99": em_ms(percentil(latencias, 99)),
+                "max": em_ms(latencias[-1]),
+            },
+        }
+
+    def obter_metricas(self):
+        """Retorna a métrica do último tick e o histórico recente"""
+        historico = list(self.historico)
+        return {
+            "concorrencia": self.concorrencia,
+            "max_por_segundo": round(1 / self.limitador.intervalo, 2) if self.limitador.intervalo else None,
+            "ultimo_tick": historico[-1] if historico else None,
+            "historico": historico,
+        }
+
+# Instância global do disparador
+disparador_whatsapp = DisparadorWhatsApp()